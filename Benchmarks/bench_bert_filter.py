@@ -0,0 +1,100 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+import torch
+from transformers import BertConfig, BertForSequenceClassification, BertTokenizerFast
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Pipeline'))
+
+from filter_bert import filter_sentences, get_esg_score, load_model
+
+words = [
+    "climate", "emissions", "energy", "employees", "waste", "water", "policy", "board",
+    "governance", "training", "the", "company", "reduced", "increased", "our", "in",
+    "year", "total", "sites", "suppliers", "and", "of", "per", "cent", "scope", "1", "2",
+    "3", "tonnes", "co2", "human", "rights", "bribery", "whistleblowing", "accidents",
+]
+
+
+def make_tiny_checkpoint(directory, num_labels=26, seed=0):
+    """
+    Writes a randomly initialised two-layer BERT classifier, needs no network.
+    """
+    torch.manual_seed(seed)
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", "."] + words
+    vocab_file = os.path.join(directory, 'vocab.txt')
+    with open(vocab_file, 'w') as file:
+        file.write("\n".join(vocab) + "\n")
+    BertTokenizerFast(vocab_file=vocab_file).save_pretrained(directory)
+    config = BertConfig(
+        vocab_size=len(vocab), hidden_size=32, num_hidden_layers=2, num_attention_heads=2,
+        intermediate_size=64, max_position_embeddings=512, num_labels=num_labels,
+    )
+    BertForSequenceClassification(config).save_pretrained(directory)
+    return directory
+
+
+def make_sentences(n, rng):
+    return [
+        " ".join(rng.choice(words) for _ in range(rng.randint(3, 60))).capitalize() + "."
+        for _ in range(n)
+    ]
+
+
+def filter_sentences_sequential(sentences, tokenizer, model, threshold):
+    # the original one-sentence-per-forward-pass loop, kept as the reference
+    filtered_sentences = []
+    esg_scores = []
+    for sentence in sentences:
+        probabilities = get_esg_score(sentence, tokenizer, model)
+        esg_score = np.max(probabilities)
+        esg_scores.append(esg_score)
+        if esg_score >= threshold:
+            filtered_sentences.append(sentence)
+    return filtered_sentences, esg_scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched ESG-BERT scoring against one sentence per pass.")
+    parser.add_argument('--model', default=None, help="checkpoint to use (default: tiny random BERT)")
+    parser.add_argument('--sentences', type=int, default=2000)
+    parser.add_argument('--threshold', type=float, default=None,
+                        help="default: 0.80 for a real model, the median score for the tiny model")
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--bucket-width', type=int, default=1)
+    parser.add_argument('--threads', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        checkpoint = args.model or make_tiny_checkpoint(directory, seed=args.seed)
+        tokenizer, model = load_model(checkpoint, num_threads=args.threads)
+    sentences = make_sentences(args.sentences, random.Random(args.seed))
+
+    start = time.perf_counter()
+    threshold = args.threshold if args.threshold is not None else 0.80
+    expected, esg_scores = filter_sentences_sequential(sentences, tokenizer, model, threshold)
+    sequential_seconds = time.perf_counter() - start
+    if args.threshold is None and args.model is None:
+        threshold = float(np.median(esg_scores))
+        expected = [sentence for sentence, esg_score in zip(sentences, esg_scores) if esg_score >= threshold]
+
+    start = time.perf_counter()
+    result = filter_sentences(sentences, tokenizer, model, threshold, args.batch_size, args.bucket_width)
+    batched_seconds = time.perf_counter() - start
+
+    print(f"{len(sentences)} sentences, threshold {threshold:.6f}, {torch.get_num_threads()} threads")
+    print(f"one per pass: {sequential_seconds:8.3f} s  ({len(sentences) / sequential_seconds:8.1f} sentences/s)")
+    print(f"batched:      {batched_seconds:8.3f} s  ({len(sentences) / batched_seconds:8.1f} sentences/s)")
+    print(f"kept sentences identical: {result == expected} ({len(result)} kept)")
+    if result != expected:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+import argparse
+import contextlib
+import filecmp
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Pipeline'))
+
+from calculate import calculate, load_lookups, match_company_id
+
+indicator_aliases_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Dashboards', 'esg_indicator_aliases.csv')
+columns = ['Input', 'Category', 'Indicator', 'Topic', 'Trend', 'Units', 'Value', 'Company', 'published_year', 'Year']
+
+
+def calculate_reference(input_folder_path, lookup_file_path, company_id_lookup_file_path, quantitative_output_file_path, indicator_output_file_path):
+    # the notebook's per-file loop, kept as the reference
+    lookup_dict, company_id_lookup_dict = load_lookups(lookup_file_path, company_id_lookup_file_path)
+
+    all_quantitative_counts = pd.DataFrame()
+    all_indicator_counts = pd.DataFrame()
+
+    for filename in os.listdir(input_folder_path):
+        if filename.endswith('.csv'):
+            file_path = os.path.join(input_folder_path, filename)
+
+            df = pd.read_csv(file_path)
+
+            df.columns = df.columns.str.strip()
+
+            df.rename(columns={'published_year': 'Published Year'}, inplace=True)
+
+            df['company_id'] = df['Company'].str.lower().apply(lambda x: match_company_id(x, company_id_lookup_dict))
+
+            df['Indicator'] = df['Indicator'].str.lower().map(lookup_dict)
+
+            df.dropna(subset=['company_id', 'Indicator'], inplace=True)
+
+            quantitative_df = df.copy()
+
+            quantitative_df['quantitative_sentences'] = quantitative_df.apply(lambda row: 1 if pd.notna(row['Value']) and pd.notna(row['Units']) else 0, axis=1)
+
+            quantitative_counts = quantitative_df.groupby(['company_id', 'Company', 'Published Year'])['quantitative_sentences'].sum().reset_index()
+
+            all_quantitative_counts = pd.concat([all_quantitative_counts, quantitative_counts], ignore_index=True)
+
+            indicator_counts = df.groupby(['company_id', 'Company', 'Published Year', 'Indicator']).size().reset_index(name='Count')
+
+            pivot_table = indicator_counts.pivot_table(index=['company_id', 'Company', 'Published Year'], columns='Indicator', values='Count', fill_value=0).reset_index()
+
+            pivot_table = pivot_table[['company_id', 'Company', 'Published Year'] + [col for col in pivot_table.columns if col not in ['company_id', 'Company', 'Published Year']]]
+
+            all_indicator_counts = pd.concat([all_indicator_counts, pivot_table], ignore_index=True)
+
+    all_quantitative_counts.to_csv(quantitative_output_file_path, index=False)
+    all_indicator_counts.to_csv(indicator_output_file_path, index=False)
+
+
+def make_inputs(directory, n_companies, n_aliases, rows_per_file, unmatched, rng):
+    def word(length):
+        return ''.join(rng.choice(string.ascii_lowercase) for _ in range(length))
+
+    companies = [word(rng.randint(5, 10)).capitalize() for _ in range(n_companies)]
+    aliases = [company.lower() for company in companies]
+    aliases += [word(rng.randint(4, 12)) for _ in range(max(0, n_aliases - len(aliases)))]
+    rng.shuffle(aliases)
+    company_aliases_path = os.path.join(directory, 'company_id_alias.csv')
+    pd.DataFrame({
+        'company_id': range(1, len(aliases) + 1),
+        'company_alias': aliases,
+        'industry': [rng.choice(['Manufacturing', 'Finance', 'Retail']) for _ in aliases],
+        'company_name': [f"{alias.capitalize()} SE" for alias in aliases],
+    }).to_csv(company_aliases_path, index=False, encoding='latin1')
+
+    indicators = pd.read_csv(indicator_aliases_path)['indicator'].tolist()
+    merged_directory = os.path.join(directory, 'merged')
+    os.makedirs(merged_directory)
+    for company in companies:
+        # each file mentions its own subset of indicators, plus some that are not in the alias file
+        mentioned = rng.sample(indicators, rng.randint(3, len(indicators))) + ['Unknown Indicator']
+        names = [company, f"{company} Group"]
+        if rng.random() < unmatched:
+            names.append("Unlisted Holding")
+        rows = []
+        for _ in range(rows_per_file):
+            year = rng.randint(2016, 2023)
+            has_value = rng.random() < 0.4
+            rows.append({
+                'Input': 'sentence', 'Category': rng.choice('ESG'), 'Indicator': rng.choice(mentioned).lower() if rng.random() < 0.3 else rng.choice(mentioned),
+                'Topic': 'topic', 'Trend': '', 'Units': 't' if has_value or rng.random() < 0.2 else None,
+                'Value': round(rng.random() * 100, 1) if has_value else None,
+                'Company': rng.choice(names), 'published_year': year, 'Year': year - rng.randint(0, 2),
+            })
+        pd.DataFrame(rows, columns=columns).to_csv(os.path.join(merged_directory, f"{company}.csv"), index=False)
+    return merged_directory, company_aliases_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the batched calculate step against the notebook's per-file loop.")
+    parser.add_argument('--companies', type=int, default=100)
+    parser.add_argument('--aliases', type=int, default=2000)
+    parser.add_argument('--rows', type=int, default=2000, help="rows per merged company CSV")
+    parser.add_argument('--unmatched', type=float, default=0.2, help="share of files with rows no alias matches")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        merged_directory, company_aliases_path = make_inputs(
+            directory, args.companies, args.aliases, args.rows, args.unmatched, random.Random(args.seed))
+        print(f"inputs: {args.companies} files x {args.rows} rows, {args.aliases} company aliases")
+
+        outputs = {}
+        timings = {}
+        for name, function in [("per-file loop", calculate_reference), ("batched", calculate)]:
+            paths = [os.path.join(directory, f"{name.replace(' ', '_')}_{kind}.csv") for kind in ['quantitative', 'indicators']]
+            start = time.perf_counter()
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                function(merged_directory, indicator_aliases_path, company_aliases_path, *paths)
+            timings[name] = time.perf_counter() - start
+            outputs[name] = paths
+            print(f"{name + ':':15s}{timings[name]:8.3f} s  ({timings['per-file loop'] / timings[name]:.1f}x)")
+
+        identical = all(filecmp.cmp(reference, result, shallow=False)
+                        for reference, result in zip(outputs["per-file loop"], outputs["batched"]))
+        print(f"identical quantitative_counts.csv and indicator_counts.csv: {identical}")
+        if not identical:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
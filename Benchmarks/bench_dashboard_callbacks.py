@@ -0,0 +1,197 @@
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Dashboards'))
+
+from esg_aggregates import (company_esg_tables, difference_matrix, empty_company_table, prevalence_cube,
+                            prevalence_for_year, year_over_year_differences)
+from esg_indicators import load_indicator_registry
+
+dashboards_directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Dashboards')
+
+
+def make_database(n_companies, years, n_industries, seed):
+    # one row per company and year; about half of the indicator cells are empty, as in database.csv
+    rng = np.random.default_rng(seed)
+    registry = load_indicator_registry(dashboards_directory)
+    indicators = registry.columns
+    e_indicators, s_indicators, g_indicators = (registry.by_category(category) for category in 'ESG')
+    industries = [f"Industry {index:02d}" for index in range(n_industries)]
+    company_industry = rng.choice(industries, n_companies)
+    rows = []
+    for year in years:
+        # not every company reports every year
+        reporting = np.flatnonzero(rng.random(n_companies) < 0.85)
+        rows.append(pd.DataFrame({
+            'company_name': [f"Company {index:05d} SE" for index in reporting],
+            'year': year,
+            'industry': company_industry[reporting],
+        }))
+    df = pd.concat(rows, ignore_index=True)
+    counts = rng.poisson(1.5, (len(df), len(indicators))).astype(float)
+    counts[rng.random(counts.shape) < 0.5] = np.nan
+    df = pd.concat([df, pd.DataFrame(counts, columns=indicators)], axis=1)
+    return df, e_indicators, s_indicators, g_indicators
+
+
+def heatmap_data_reference(df, selected_year1, selected_year2, category, e_indicators, s_indicators, g_indicators):
+    # compare_heatmap.update_heatmaps before the cube: six groupbys per click, two of them used
+    df_year1 = df[df['year'] == selected_year1]
+    df_year2 = df[df['year'] == selected_year2]
+
+    industry_prevalence_e1 = df_year1.groupby('industry')[e_indicators].apply(lambda x: (x > 0).mean()).reset_index()
+    industry_prevalence_s1 = df_year1.groupby('industry')[s_indicators].apply(lambda x: (x > 0).mean()).reset_index()
+    industry_prevalence_g1 = df_year1.groupby('industry')[g_indicators].apply(lambda x: (x > 0).mean()).reset_index()
+
+    industry_prevalence_e2 = df_year2.groupby('industry')[e_indicators].apply(lambda x: (x > 0).mean()).reset_index()
+    industry_prevalence_s2 = df_year2.groupby('industry')[s_indicators].apply(lambda x: (x > 0).mean()).reset_index()
+    industry_prevalence_g2 = df_year2.groupby('industry')[g_indicators].apply(lambda x: (x > 0).mean()).reset_index()
+
+    return {
+        'environmental': (industry_prevalence_e1, industry_prevalence_e2),
+        'social': (industry_prevalence_s1, industry_prevalence_s2),
+        'governance': (industry_prevalence_g1, industry_prevalence_g2),
+    }[category]
+
+
+def leaders_data_reference(df, selected_industry, e_indicators, s_indicators, g_indicators):
+    # IndustryLeaders.update_graph before the precomputed tables
+    industry_data = df[df['industry'] == selected_industry].copy()
+
+    industry_data['E'] = industry_data[e_indicators].notnull().sum(axis=1)
+    industry_data['S'] = industry_data[s_indicators].notnull().sum(axis=1)
+    industry_data['G'] = industry_data[g_indicators].notnull().sum(axis=1)
+
+    company_totals = industry_data.groupby('company_name').agg(
+        E=('E', 'mean'),
+        S=('S', 'mean'),
+        G=('G', 'mean'),
+        years_reported=('year', 'count')
+    )
+
+    company_totals = company_totals[company_totals['years_reported'] >= 3]
+
+    company_totals = company_totals.round(0).astype(int)
+
+    company_totals['Total'] = company_totals[['E', 'S', 'G']].sum(axis=1)
+    return company_totals.sort_values(by=['Total', 'E', 'years_reported'], ascending=[False, False, False])
+
+
+def difference_reference(data1, data2):
+    # generate_difference_heatmap before the aligned reindex: one concat per missing industry
+    all_industries = set(data1['industry']).union(set(data2['industry']))
+
+    for industry in all_industries:
+        if industry not in data1['industry'].values:
+            missing_row = pd.DataFrame([[industry] + [0] * (data1.shape[1] - 1)], columns=data1.columns)
+            data1 = pd.concat([data1, missing_row], ignore_index=True)
+
+    for industry in all_industries:
+        if industry not in data2['industry'].values:
+            missing_row = pd.DataFrame([[industry] + [0] * (data2.shape[1] - 1)], columns=data2.columns)
+            data2 = pd.concat([data2, missing_row], ignore_index=True)
+
+    data1 = data1.sort_values('industry').reset_index(drop=True)
+    data2 = data2.sort_values('industry').reset_index(drop=True)
+
+    return data2.set_index('industry') - data1.set_index('industry')
+
+
+def timed(function, calls):
+    latencies = []
+    results = []
+    for args in calls:
+        start = time.perf_counter()
+        results.append(function(*args))
+        latencies.append(time.perf_counter() - start)
+    return results, latencies
+
+
+def report(label, latencies):
+    print(f"  {label:22s} median {statistics.median(latencies) * 1000:9.3f} ms   max {max(latencies) * 1000:9.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dashboard callback data preparation with and without precomputed aggregates.")
+    parser.add_argument('--companies', type=int, default=10000)
+    parser.add_argument('--industries', type=int, default=20)
+    parser.add_argument('--diff-industries', type=int, default=600, help="industries for the difference heatmap test")
+    parser.add_argument('--first-year', type=int, default=2016)
+    parser.add_argument('--last-year', type=int, default=2023)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    years = list(range(args.first_year, args.last_year + 1))
+    df, e_indicators, s_indicators, g_indicators = make_database(args.companies, years, args.industries, args.seed)
+    print(f"database: {len(df)} rows, {args.companies} companies, {args.industries} industries, {len(years)} years")
+    heatmap_df = df.copy()
+    heatmap_df[e_indicators + s_indicators + g_indicators] = heatmap_df[e_indicators + s_indicators + g_indicators].fillna(0)
+
+    start = time.perf_counter()
+    cube = prevalence_cube(heatmap_df, e_indicators + s_indicators + g_indicators)
+    cube_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    company_tables = company_esg_tables(df, e_indicators, s_indicators, g_indicators)
+    tables_seconds = time.perf_counter() - start
+    print(f"precomputation at load: prevalence cube {cube_seconds:.3f} s, company tables {tables_seconds:.3f} s")
+
+    categories = {'environmental': e_indicators, 'social': s_indicators, 'governance': g_indicators}
+    heatmap_calls = [(year1, year2, category) for year1, year2 in zip(years, years[1:]) for category in categories]
+    reference, reference_latencies = timed(
+        lambda year1, year2, category: heatmap_data_reference(heatmap_df, year1, year2, category, e_indicators, s_indicators, g_indicators),
+        heatmap_calls)
+    sliced, sliced_latencies = timed(
+        lambda year1, year2, category: (prevalence_for_year(cube, year1, categories[category]),
+                                        prevalence_for_year(cube, year2, categories[category])),
+        heatmap_calls)
+    print(f"compare_heatmap.update_heatmaps data ({len(heatmap_calls)} clicks):")
+    report("groupby per click", reference_latencies)
+    report("cube slice", sliced_latencies)
+    for expected, result in zip(reference, sliced):
+        for expected_frame, result_frame in zip(expected, result):
+            pd.testing.assert_frame_equal(expected_frame, result_frame, check_names=False)
+
+    industries = sorted(df['industry'].unique())
+    reference, reference_latencies = timed(
+        lambda industry: leaders_data_reference(df, industry, e_indicators, s_indicators, g_indicators),
+        [(industry,) for industry in industries])
+    looked_up, lookup_latencies = timed(
+        lambda industry: company_tables.get(industry, empty_company_table()),
+        [(industry,) for industry in industries])
+    print(f"IndustryLeaders.update_graph data ({len(industries)} dropdown changes):")
+    report("groupby per change", reference_latencies)
+    report("table lookup", lookup_latencies)
+    for expected, result in zip(reference, looked_up):
+        pd.testing.assert_frame_equal(expected, result)
+
+    # year-over-year differences; about a tenth of the industries is missing from each year
+    wide_df, _, _, _ = make_database(args.companies, years, args.diff_industries, args.seed)
+    wide_df = wide_df[pd.util.hash_pandas_object(wide_df[['year', 'industry']], index=False) % 10 != 0].copy()
+    wide_df[e_indicators] = wide_df[e_indicators].fillna(0)
+    wide_cube = prevalence_cube(wide_df, e_indicators)
+    pairs = [(prevalence_for_year(wide_cube, year1, e_indicators), prevalence_for_year(wide_cube, year2, e_indicators))
+             for year1, year2 in zip(years, years[1:])]
+    reference, reference_latencies = timed(difference_reference, pairs)
+    aligned, aligned_latencies = timed(difference_matrix, pairs)
+    print(f"difference heatmap data ({args.diff_industries} industries, {len(pairs)} year pairs):")
+    report("padding loop", reference_latencies)
+    report("reindex", aligned_latencies)
+    for expected, result in zip(reference, aligned):
+        pd.testing.assert_frame_equal(expected, result, check_index_type=False)
+    start = time.perf_counter()
+    deltas = year_over_year_differences(wide_cube, years, e_indicators)
+    print(f"  {'all years in one call':22s} {(time.perf_counter() - start) * 1000:16.3f} ms")
+    for (year1, year2), expected in zip(zip(years, years[1:]), reference):
+        result = deltas.xs(year2, level='year')
+        pd.testing.assert_frame_equal(expected.reindex(result.index, fill_value=0), result, check_index_type=False, check_names=False)
+    print("same data as the per-click computation: True")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Pipeline'))
+
+from database import build_database, clean_company_name, peak_memory_mb, rename_columns
+
+indicator_aliases_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Dashboards', 'esg_indicator_aliases.csv')
+
+
+def make_inputs(directory, n_companies, years, seed):
+    # calculate/extract outputs for n_companies over the years; some companies have no ID,
+    # some reports have no counts and some counts have no report
+    rng = np.random.default_rng(seed)
+    indicators = pd.read_csv(indicator_aliases_path)['Alias'].str.lower().tolist()
+    names = np.array([f"Company{index:06d}" for index in range(n_companies)])
+    company_ids = np.arange(1, n_companies + 1, dtype=float)
+    company_ids[rng.random(n_companies) < 0.02] = np.nan
+
+    company_index = np.repeat(np.arange(n_companies), len(years))
+    year = np.tile(years, n_companies)
+    reported = rng.random(len(company_index)) < 0.9
+    company_index, year = company_index[reported], year[reported]
+    counts = rng.poisson(3, (len(year), len(indicators))).astype(float)
+    counts[rng.random(counts.shape) < 0.4] = np.nan
+
+    indicator_counts = pd.DataFrame({'company_id': company_ids[company_index], 'Company': names[company_index], 'Published Year': year})
+    indicator_counts = pd.concat([indicator_counts, pd.DataFrame(counts, columns=indicators)], axis=1)
+    indicator_counts['qualitative_sentences'] = counts.sum(axis=1)
+    has_quantitative = rng.random(len(year)) < 0.95
+    quantitative_counts = indicator_counts.loc[has_quantitative, ['company_id', 'Company', 'Published Year']].copy()
+    quantitative_counts['quantitative_sentences'] = rng.integers(0, 50, len(quantitative_counts))
+    has_report = rng.random(len(year)) < 0.97
+    esg_report = pd.DataFrame({
+        'Company': [f"{name}_{'ESG' if index % 3 else 'IR'}_EN" for index, name in enumerate(names[company_index][has_report])],
+        'Year': year[has_report],
+        'Total Sentences': rng.integers(100, 5000, has_report.sum()),
+        'ESG Sentences': rng.integers(10, 100, has_report.sum()),
+    })
+    # reports of companies the counts do not know
+    esg_report = pd.concat([esg_report, pd.DataFrame({'Company': [f"Unknown{index:04d}_ESG_EN" for index in range(50)],
+                                                      'Year': years[0], 'Total Sentences': 100, 'ESG Sentences': 10})])
+    lookup = pd.DataFrame({'company_id': np.arange(1, n_companies + 1), 'company_alias': [name.lower() for name in names],
+                           'industry': rng.choice(['Manufacturing', 'Finance', 'Energy', 'Retail'], n_companies),
+                           'company_name': [f"{name} SE" for name in names]})
+
+    paths = {name: os.path.join(directory, f"{name}.csv")
+             for name in ['indicator_counts_with_sum', 'quantitative_counts', 'esg_report', 'company_id_alias']}
+    indicator_counts.to_csv(paths['indicator_counts_with_sum'], index=False)
+    quantitative_counts.to_csv(paths['quantitative_counts'], index=False)
+    esg_report.to_csv(paths['esg_report'], index=False)
+    lookup.to_csv(paths['company_id_alias'], index=False, encoding='latin1')
+    return paths
+
+
+def build_database_reference(indicator_counts_path, quantitative_counts_path, esg_report_path, lookup_file_path, output_file_path):
+    # 07database before the streaming build: whole files in memory, joined on the inferred common columns
+    indicator_counts_df = rename_columns(pd.read_csv(indicator_counts_path))
+    quantitative_counts_df = rename_columns(pd.read_csv(quantitative_counts_path))
+    esg_report_df = pd.read_csv(esg_report_path)
+    esg_report_df['Company'] = esg_report_df['Company'].apply(clean_company_name)
+    esg_report_df = rename_columns(esg_report_df)
+
+    common_columns = sorted(set(indicator_counts_df.columns) & set(quantitative_counts_df.columns) & set(esg_report_df.columns))
+    merged_df = indicator_counts_df.merge(quantitative_counts_df, on=common_columns, how='outer', suffixes=('', '_duplicate'))
+    merged_df = merged_df.merge(esg_report_df, on=common_columns, how='outer', suffixes=('', '_duplicate'))
+    merged_df = merged_df.loc[:, ~merged_df.columns.str.endswith('_duplicate')]
+    merged_df.to_csv(output_file_path, index=False)
+
+    main_df = pd.read_csv(output_file_path)
+    lookup_df = pd.read_csv(lookup_file_path, encoding='latin1')[['company_id', 'industry', 'company_name']]
+    main_df['qualitative_score'] = main_df['qualitative_sentences'] / main_df['total sentences']
+    main_df['quantitative_score'] = main_df['quantitative_sentences'] / main_df['total sentences']
+    main_df.merge(lookup_df, on='company_id', how='left').to_csv(output_file_path, index=False)
+
+
+def run_build(mode, directory, chunk_rows, partition_mb):
+    # one build in this process; prints time and peak memory as JSON for the parent
+    paths = {name: os.path.join(directory, f"{name}.csv")
+             for name in ['indicator_counts_with_sum', 'quantitative_counts', 'esg_report', 'company_id_alias']}
+    output_path = os.path.join(directory, f"database_{mode}.csv")
+    start = time.perf_counter()
+    if mode == 'reference':
+        build_database_reference(paths['indicator_counts_with_sum'], paths['quantitative_counts'], paths['esg_report'],
+                                 paths['company_id_alias'], output_path)
+    else:
+        build_database(paths['indicator_counts_with_sum'], paths['quantitative_counts'], paths['esg_report'],
+                       paths['company_id_alias'], output_path, None, 'year',
+                       chunk_rows, int(partition_mb * 1024 * 1024))
+    seconds = time.perf_counter() - start
+    print(json.dumps({'seconds': seconds, 'peak_mb': peak_memory_mb()}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the streaming database build with the in-memory 07database join on synthetic inputs.")
+    parser.add_argument('--companies', type=int, default=20000)
+    parser.add_argument('--first-year', type=int, default=2014)
+    parser.add_argument('--last-year', type=int, default=2023)
+    parser.add_argument('--chunk-rows', type=int, default=50_000)
+    parser.add_argument('--partition-mb', type=float, default=16)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--run', choices=['reference', 'streaming'], help=argparse.SUPPRESS)
+    parser.add_argument('--directory', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        run_build(args.run, args.directory, args.chunk_rows, args.partition_mb)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = make_inputs(directory, args.companies, np.arange(args.first_year, args.last_year + 1), args.seed)
+        input_mb = sum(os.path.getsize(path) for path in paths.values()) / 1024 / 1024
+        print(f"inputs: {args.companies} companies x {args.last_year - args.first_year + 1} years, {input_mb:.0f} MB of CSV")
+
+        results = {}
+        for mode in ['reference', 'streaming']:
+            output = subprocess.run([sys.executable, os.path.abspath(__file__), '--run', mode, '--directory', directory,
+                                     '--chunk-rows', str(args.chunk_rows), '--partition-mb', str(args.partition_mb)],
+                                    capture_output=True, text=True, check=True).stdout
+            results[mode] = json.loads(output.strip().splitlines()[-1])
+            rows = len(pd.read_csv(os.path.join(directory, f"database_{mode}.csv"), usecols=['year']))
+            print(f"{mode:10s} {results[mode]['seconds']:7.2f} s  {rows / results[mode]['seconds']:10,.0f} rows/s  "
+                  f"peak memory {results[mode]['peak_mb']:7.0f} MB")
+
+        reference = pd.read_csv(os.path.join(directory, 'database_reference.csv'), low_memory=False)
+        streaming = pd.read_csv(os.path.join(directory, 'database_streaming.csv'), low_memory=False)
+        same_order = streaming[['company', 'year']].equals(reference[['company', 'year']])
+        reference = reference.sort_values(list(reference.columns), kind='stable').reset_index(drop=True)
+        streaming = streaming.sort_values(list(streaming.columns), kind='stable').reset_index(drop=True)
+        pd.testing.assert_frame_equal(reference, streaming, check_dtype=False)
+        print(f"same rows as the in-memory join: True, same (company, year) order: {same_order}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import plotly.utils
+
+dashboards_directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Dashboards')
+sys.path.insert(0, dashboards_directory)
+
+from bench_dashboard_callbacks import make_database
+
+indicator_types = ['top_5', 'top_5_environmental', 'top_5_social', 'top_5_governance']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the per-click server callback of ESGIndicatorFrequecny with the store shipped once for the clientside chart.")
+    parser.add_argument('--companies', type=int, default=2000)
+    parser.add_argument('--industries', type=int, default=20)
+    parser.add_argument('--first-year', type=int, default=2016)
+    parser.add_argument('--last-year', type=int, default=2023)
+    parser.add_argument('--clicks', type=int, default=400)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    years = list(range(args.first_year, args.last_year + 1))
+    df, _, _, _ = make_database(args.companies, years, args.industries, args.seed)
+    df.insert(0, 'company', df['company_name'].str.removesuffix(' SE'))
+
+    with tempfile.TemporaryDirectory() as directory:
+        df.to_csv(os.path.join(directory, 'database.csv'), index=False)
+        shutil.copy(os.path.join(dashboards_directory, 'esg_indicator_aliases.csv'), directory)
+        os.chdir(directory)
+        import ESGIndicatorFrequecny as frequency
+    print(f"database: {len(df)} rows, {args.companies} companies, {len(years)} years")
+
+    companies = list(frequency.companies)
+    clicks = [(companies[index * 7919 % len(companies)], indicator_types[index % len(indicator_types)]) for index in range(args.clicks)]
+    latencies = []
+    response_bytes = []
+    for company, indicator_type in clicks:
+        start = time.perf_counter()
+        graph = frequency.update_graph(1, company, indicator_type)
+        response = json.dumps(graph.to_plotly_json(), cls=plotly.utils.PlotlyJSONEncoder)
+        latencies.append(time.perf_counter() - start)
+        response_bytes.append(len(response))
+    print(f"server callback ({len(clicks)} clicks): median {statistics.median(latencies) * 1000:.3f} ms, "
+          f"{statistics.mean(response_bytes) / 1024:.1f} KB per response, {sum(response_bytes) / 1024:.0f} KB in total")
+
+    for compress in (False, True):
+        start = time.perf_counter()
+        store = frequency.company_series_store(compress)
+        seconds = time.perf_counter() - start
+        size = len(json.dumps(store, separators=(',', ':')))
+        print(f"clientside store ({store['encoding']:4s}): built once in {seconds * 1000:.1f} ms, {size / 1024:.1f} KB "
+              f"shipped once, 0 requests per click")
+
+
+if __name__ == '__main__':
+    main()
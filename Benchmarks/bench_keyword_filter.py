@@ -0,0 +1,49 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Pipeline'))
+
+from extract_pdf import esg_keywords, iter_keyword_sentences, keyword_matcher, keywords_pattern
+from generators import make_sentences
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the keyword matcher of extract_pdf.py against the plain keyword regex on a synthetic sentence corpus.")
+    parser.add_argument('--sentences', type=int, default=1_000_000)
+    parser.add_argument('--esg-share', type=float, default=0.4, help="share of sentences with a keyword")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    sentences = make_sentences(args.sentences, np.random.default_rng(args.seed), args.esg_share)
+    # a few sentences the generator does not write: mixed case, keywords inside words and non-ASCII text
+    sentences += ["Anti-Corruption and BRIBERY training.", "Carbonated drinks and fineness.", "Straße: ſcope 1 Émissions."]
+    print(f"corpus: {len(sentences):,} sentences, {len(esg_keywords)} keywords")
+
+    start = time.perf_counter()
+    reference = [sentence for sentence in sentences if keywords_pattern.search(sentence)]
+    reference_seconds = time.perf_counter() - start
+    print(f"keywords_pattern.search {reference_seconds:7.2f} s  {len(sentences) / reference_seconds:10,.0f} sentences/s")
+
+    start = time.perf_counter()
+    matches = [keyword_matcher.find(sentence) for sentence in sentences]
+    matcher_seconds = time.perf_counter() - start
+    print(f"keyword_matcher.find    {matcher_seconds:7.2f} s  {len(sentences) / matcher_seconds:10,.0f} sentences/s "
+          f"({reference_seconds / matcher_seconds:.1f}x, with keyword IDs)")
+
+    start = time.perf_counter()
+    counts = {}
+    kept = list(iter_keyword_sentences(iter(sentences), counts))
+    print(f"iter_keyword_sentences  {time.perf_counter() - start:7.2f} s  (with the hit histogram)")
+
+    print(f"same sentences kept: {kept == reference and [sentence for sentence, ids in zip(sentences, matches) if ids] == reference} "
+          f"({len(kept):,} of {len(sentences):,})")
+    top = sorted(range(len(esg_keywords)), key=counts["keyword_hits"].__getitem__, reverse=True)[:5]
+    print("most frequent keywords: " + ", ".join(f"{esg_keywords[keyword_id]} {counts['keyword_hits'][keyword_id]:,}" for keyword_id in top))
+
+
+if __name__ == '__main__':
+    main()
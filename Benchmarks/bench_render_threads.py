@@ -0,0 +1,116 @@
+import argparse
+import base64
+import gc
+import io
+import os
+import random
+import resource
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import matplotlib
+from matplotlib.figure import Figure
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Dashboards'))
+
+from bench_dashboard_callbacks import make_database
+from esg_aggregates import company_esg_tables, prevalence_cube, prevalence_for_year
+from esg_figures import company_chart_image, heatmap_image
+
+colors = {'E': 'mediumseagreen', 'S': 'dodgerblue', 'G': 'orange'}
+
+
+def heatmap_image_pyplot(data, title, xlabel, ylabel, **heatmap_options):
+    # the dashboards' rendering before the Figure/Agg layer, through the pyplot state machine
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    plt.figure(figsize=(10, 7))
+    sns.heatmap(data, annot=True, cbar=True, linewidths=.5, **heatmap_options)
+    plt.title(title, fontsize=16)
+    plt.xlabel(xlabel, fontsize=12)
+    plt.ylabel(ylabel, fontsize=12)
+
+    plt.xticks(rotation=45, ha='right')
+    plt.yticks(rotation=0)
+    plt.tight_layout()
+
+    buf = io.BytesIO()
+    plt.savefig(buf, format="png")
+    plt.close()
+    return base64.b64encode(buf.getvalue()).decode("utf-8")
+
+
+def make_jobs(n_companies, n_industries, seed, heatmap):
+    years = list(range(2019, 2024))
+    df, e_indicators, s_indicators, g_indicators = make_database(n_companies, years, n_industries, seed)
+    indicators = e_indicators + s_indicators + g_indicators
+    filled = df.copy()
+    filled[indicators] = filled[indicators].fillna(0)
+    cube = prevalence_cube(filled, indicators)
+    categories = {'environmental': e_indicators, 'social': s_indicators, 'governance': g_indicators}
+
+    jobs = {}
+    for year in years:
+        for category, category_indicators in categories.items():
+            data = prevalence_for_year(cube, year, category_indicators).set_index('industry').T
+            jobs[('heatmap', year, category)] = (heatmap, (data, f"Year {year} - {category}", "Industry", "Indicators"),
+                                                 {'cmap': "YlGnBu"})
+    if heatmap is heatmap_image:
+        for industry, company_totals in company_esg_tables(df, e_indicators, s_indicators, g_indicators).items():
+            jobs[('company_chart', industry)] = (company_chart_image, (company_totals, industry, colors), {})
+    return jobs
+
+
+def render(job):
+    function, args, kwargs = job
+    return function(*args, **kwargs)
+
+
+def open_figures():
+    gc.collect()
+    return sum(1 for obj in gc.get_objects() if isinstance(obj, Figure))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test: render dashboard figures from many threads at once and check images and memory.")
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--companies', type=int, default=120)
+    parser.add_argument('--industries', type=int, default=6)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--pyplot', action='store_true', help="load test the old pyplot-based heatmap rendering instead")
+    args = parser.parse_args()
+
+    matplotlib.use('Agg')
+    jobs = make_jobs(args.companies, args.industries, args.seed, heatmap_image_pyplot if args.pyplot else heatmap_image)
+    keys = list(jobs)
+    print(f"{len(keys)} figures ({'pyplot' if args.pyplot else 'Figure/Agg'}), {args.threads} threads, {args.rounds} rounds")
+
+    start = time.perf_counter()
+    expected = {key: render(jobs[key]) for key in keys}
+    print(f"serial reference: {len(keys) / (time.perf_counter() - start):6.1f} figures/s")
+
+    rng = random.Random(args.seed)
+    mismatches = 0
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        for round_index in range(args.rounds):
+            order = keys * args.threads
+            rng.shuffle(order)
+            start = time.perf_counter()
+            images = list(executor.map(lambda key: render(jobs[key]), order))
+            seconds = time.perf_counter() - start
+            wrong = sum(image != expected[key] for key, image in zip(order, images))
+            mismatches += wrong
+            peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+            print(f"round {round_index + 1}: {len(order) / seconds:6.1f} figures/s, {wrong} of {len(order)} images differ, "
+                  f"{open_figures()} figures alive, peak RSS {peak_mb:7.1f} MB")
+
+    print(f"all concurrent images identical to the serial ones: {mismatches == 0}")
+    if mismatches and not args.pyplot:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
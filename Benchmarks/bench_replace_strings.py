@@ -0,0 +1,130 @@
+import argparse
+import contextlib
+import filecmp
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Pipeline'))
+
+from replace_strings import get_company_name_and_year_from_filename, parse_filename, process_directory
+
+companies = ["Aixtron", "BigCorp", "Siemens", "Bayer", "Henkel", "Zalando", "Puma", "Covestro", "Symrise", "Nemetschek"]
+phrases = [
+    "this year", "next year", "last year", "previous year", "This Year", "in the previous year",
+    "AG", "GmbH", "AG’s", "group", "subsidiary",
+]
+words = ["emissions", "energy", "employees", "waste", "water", "policy", "board", "the", "reduced", "by", "our", "in", "and"]
+
+
+def replace_text_reference(file_path, company_name, year):
+    # the notebook's line-by-line implementation, kept as the reference
+    with open(file_path, 'r') as file:
+        content = file.readlines()
+
+    updated_content = []
+    for line in content:
+        updated_line = re.sub(re.escape(company_name), 'Company', line, flags=re.IGNORECASE)
+        if re.search(r'\bprevious year\b', updated_line, flags=re.IGNORECASE):
+            print(f'Found "previous year" in {file_path}: {line.strip()}')
+        if re.search(r'\bnext year\b', updated_line, flags=re.IGNORECASE):
+            print(f'Found "next year" in {file_path}: {line.strip()}')
+        if re.search(r'\blast year\b|\bprevious year\b', updated_line, flags=re.IGNORECASE):
+            print(f'Found "last year or previous year" in {file_path}: {line.strip()}')
+        updated_line = re.sub(r'\bthis year\b', str(year), updated_line, flags=re.IGNORECASE)
+        updated_line = re.sub(r'\bnext year\b', str(year + 1), updated_line, flags=re.IGNORECASE)
+        updated_line = re.sub(r'\blast year\b|\bprevious year\b', str(year - 1), updated_line, flags=re.IGNORECASE)
+        updated_line = re.sub(r'\b(AG|AG’s|GmbH)\b', '', updated_line, flags=re.IGNORECASE)
+        updated_content.append(updated_line)
+
+    with open(file_path, 'w') as file:
+        file.writelines(updated_content)
+    print(f'Updated {file_path} with company name and year references.')
+
+
+def make_corpus(directory, n_files, lines_per_file, rng):
+    # returns {filename: (company, year)}; the year is last, where parse_filename reads it
+    expected = {}
+    for index in range(n_files):
+        company = rng.choice(companies)
+        year = rng.randint(2015, 2024)
+        kind = rng.choice(["ESG", "IR"])
+        filename = f"{company}_{kind}_EN_{index}_{year}.txt"
+        expected[filename] = (company, year)
+        with open(os.path.join(directory, filename), 'w') as file:
+            file.write(f"Total sentences in the PDF after removing tables: {lines_per_file * 3}\n")
+            file.write("ESG-related sentences:\n")
+            # every file has at least one phrase to replace
+            file.write(f"{company} reduced emissions this year.\n")
+            for _ in range(lines_per_file):
+                tokens = [rng.choice(words) for _ in range(rng.randint(6, 18))]
+                for _ in range(rng.randint(0, 3)):
+                    tokens.insert(rng.randint(0, len(tokens)), rng.choice(phrases + [company, company.upper()]))
+                file.write(" ".join(tokens).capitalize() + ".\n")
+    # a file name without company and year is left unchanged
+    with open(os.path.join(directory, "notes.txt"), 'w') as file:
+        file.write("This year AG.\n")
+    return expected
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the single-pass text normaliser against the per-line regex chain.")
+    parser.add_argument('--files', type=int, default=2000)
+    parser.add_argument('--lines', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        corpus = os.path.join(directory, 'corpus')
+        reference = os.path.join(directory, 'reference')
+        os.makedirs(corpus)
+        expected = make_corpus(corpus, args.files, args.lines, random.Random(args.seed))
+        shutil.copytree(corpus, reference)
+        print(f"corpus: {args.files} files x {args.lines} lines")
+        parsed = {filename: parse_filename(filename) for filename in expected}
+        wrong = {filename: names for filename, names in parsed.items()
+                 if names[0] is None or names[0].replace(' ', '') != expected[filename][0] or names[1] != expected[filename][1]}
+        assert not wrong, f"{len(wrong)} corpus files are not parsed to their company and year, e.g. {next(iter(wrong))}"
+
+        start = time.perf_counter()
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            for filename in sorted(os.listdir(reference)):
+                company_name, year = get_company_name_and_year_from_filename(filename)
+                if company_name and year:
+                    replace_text_reference(os.path.join(reference, filename), company_name, year)
+        reference_seconds = time.perf_counter() - start
+        print(f"per-line regex chain:        {reference_seconds:8.3f} s")
+
+        results = {}
+        for workers in [1, args.workers]:
+            output = os.path.join(directory, f'normalised_{workers}')
+            start = time.perf_counter()
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                process_directory(corpus, output, workers=workers)
+            seconds = time.perf_counter() - start
+            label = f"single pass, {workers or os.cpu_count()} worker(s):"
+            print(f"{label:29s}{seconds:8.3f} s  ({reference_seconds / seconds:.1f}x)")
+            results[workers] = output
+
+        for output in results.values():
+            unchanged = [filename for filename in expected
+                         if filecmp.cmp(os.path.join(corpus, filename), os.path.join(output, filename), shallow=False)]
+            assert not unchanged, f"{len(unchanged)} corpus files were copied, not normalised, e.g. {unchanged[0]}"
+        print(f"files normalised:            {len(expected)} of {len(expected)}")
+
+        identical = True
+        for output in results.values():
+            _, mismatch, errors = filecmp.cmpfiles(reference, output, sorted(os.listdir(reference)), shallow=False)
+            identical = identical and not mismatch and not errors
+        print(f"byte-identical output:       {identical}")
+        if not identical:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
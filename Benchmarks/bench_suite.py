@@ -0,0 +1,384 @@
+import argparse
+import base64
+import contextlib
+import hashlib
+import importlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+import plotly.utils
+
+benchmarks_directory = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(benchmarks_directory, '..', 'Pipeline'))
+sys.path.insert(0, os.path.join(benchmarks_directory, '..', 'Dashboards'))
+
+from generators import (indicator_aliases_path, make_company_aliases, make_database_csv, make_esg_report, make_llm_csvs,
+                        make_report_pdf, make_sentence_file)
+from instrumentation import RunReport, compare_runs, load_runs
+
+baseline_path = os.path.join(benchmarks_directory, 'baselines', 'suite.jsonl')
+cases = ['extract', 'replace', 'filter', 'postprocess', 'calculate', 'database', 'dashboards']
+
+
+def fingerprint_files(paths):
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        digest.update(os.path.basename(path).encode('utf-8'))
+        with open(path, 'rb') as file:
+            digest.update(file.read())
+    return digest.hexdigest()[:16]
+
+
+def fingerprint_values(values):
+    # frames, lists and dicts, through their JSON form
+    digest = hashlib.sha256()
+    for value in values:
+        if isinstance(value, pd.DataFrame):
+            value = {'columns': [str(column) for column in value.columns], 'index': value.index.tolist(),
+                     'values': value.to_numpy().tolist()}
+        digest.update(json.dumps(value, sort_keys=True, default=str).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+@contextlib.contextmanager
+def quiet():
+    # the pipeline modules print a line per file
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def bench_extract(report, directory, args):
+    try:
+        from extract_pdf import read_tables, write_report
+        rng = np.random.default_rng(args.seed)
+        pdf_paths = []
+        for index in range(args.pdfs):
+            pdf_paths.append(os.path.join(directory, f"Company{chr(ord('a') + index)}_ESG_EN_2023.pdf"))
+            make_report_pdf(pdf_paths[-1], args.pages, args.table_density, rng)
+        # tabula needs Java; find out before timing
+        read_tables(pdf_paths[0])
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+    output_directory = os.path.join(directory, 'output_texts')
+    os.makedirs(output_directory)
+    output_paths = [os.path.join(output_directory, os.path.basename(path)[:-4] + '.txt') for path in pdf_paths]
+    with report.stage('extract', 'pages', 'sentences') as counts:
+        for pdf_path, output_path in zip(pdf_paths, output_paths):
+            report_counts = write_report(pdf_path, output_path)
+            counts['in'] += report_counts['pages']
+            counts['out'] += report_counts['esg_sentences']
+        counts['params'] = {'pdfs': args.pdfs, 'pages': args.pages, 'table_density': args.table_density, 'seed': args.seed}
+        counts['fingerprint'] = fingerprint_files(output_paths)
+
+
+def make_sentence_files(directory, args):
+    os.makedirs(directory, exist_ok=True)
+    rng = np.random.default_rng(args.seed)
+    paths = [os.path.join(directory, f"Company{chr(ord('a') + index % 26) * (1 + index // 26)}_ESG_EN_{2015 + index % 9}.txt")
+             for index in range(args.sentence_files)]
+    for path in paths:
+        make_sentence_file(path, args.sentences, rng)
+    return paths
+
+
+def bench_replace(report, directory, args):
+    from replace_strings import process_directory
+
+    input_paths = make_sentence_files(os.path.join(directory, 'sentences'), args)
+    output_directory = os.path.join(directory, 'cleaned_texts')
+    with report.stage('replace', 'MB', 'files') as counts, quiet():
+        process_directory(os.path.dirname(input_paths[0]), output_directory, workers=1)
+        counts['in'] = sum(os.path.getsize(path) for path in input_paths) / 1024 / 1024
+        counts['out'] = len(os.listdir(output_directory))
+        counts['params'] = {'sentence_files': args.sentence_files, 'sentences': args.sentences, 'seed': args.seed}
+        counts['fingerprint'] = fingerprint_files(os.path.join(output_directory, name) for name in os.listdir(output_directory))
+
+
+def bench_filter(report, directory, args):
+    try:
+        from bench_bert_filter import make_tiny_checkpoint
+        from filter_bert import filter_sentences, load_model, load_sentences
+    except ImportError as e:
+        return f"{type(e).__name__}: {e}"
+    input_paths = make_sentence_files(os.path.join(directory, 'sentences'), args)
+    os.makedirs(os.path.join(directory, 'tiny-bert'))
+    checkpoint = make_tiny_checkpoint(os.path.join(directory, 'tiny-bert'), seed=args.seed)
+    tokenizer, model = load_model(checkpoint, num_threads=1)
+    with report.stage('filter', 'sentences', 'sentences') as counts:
+        kept = []
+        for path in input_paths:
+            sentences = load_sentences(path)
+            kept.append(filter_sentences(sentences, tokenizer, model, args.threshold))
+            counts['in'] += len(sentences)
+            counts['out'] += len(kept[-1])
+        counts['params'] = {'sentence_files': args.sentence_files, 'sentences': args.sentences, 'threshold': args.threshold,
+                            'seed': args.seed}
+        counts['fingerprint'] = fingerprint_values(kept)
+
+
+def bench_postprocess(report, directory, args):
+    from postprocessing import group_files_by_company, merge_companies
+
+    input_directory = os.path.join(directory, 'llm')
+    os.makedirs(input_directory)
+    make_llm_csvs(input_directory, args.companies, args.reports, args.rows, np.random.default_rng(args.seed))
+    output_directory = os.path.join(directory, 'merged')
+    os.makedirs(output_directory)
+    file_names = sorted(os.listdir(input_directory))
+    with report.stage('postprocess', 'files', 'rows') as counts, quiet():
+        jobs = [(file_paths, os.path.join(output_directory, f"{company_name}.csv")) for company_name, file_paths in
+                group_files_by_company([os.path.join(input_directory, name) for name in file_names]).items()]
+        for file_paths, output_path, rows in merge_companies(jobs, args.workers):
+            counts['in'] += len(file_paths)
+            counts['out'] += rows
+        counts['params'] = {'companies': args.companies, 'reports': args.reports, 'rows': args.rows, 'seed': args.seed}
+        counts['fingerprint'] = fingerprint_files(output_path for _, output_path in jobs)
+    return None if counts['out'] else "no rows merged"
+
+
+def bench_calculate(report, directory, args):
+    from calculate import count_files, load_lookups
+
+    merged_directory = os.path.join(directory, 'merged')
+    if not os.path.isdir(merged_directory):
+        bench_postprocess(RunReport(), directory, args)
+    company_aliases_path = os.path.join(directory, 'company_id_alias.csv')
+    make_company_aliases(company_aliases_path, args.companies, np.random.default_rng(args.seed))
+    file_paths = sorted(os.path.join(merged_directory, name) for name in os.listdir(merged_directory))
+    with report.stage('calculate', 'files', 'rows') as counts:
+        quantitative_counts, indicator_counts = count_files(file_paths, *load_lookups(indicator_aliases_path, company_aliases_path))
+        quantitative_counts.to_csv(os.path.join(directory, 'quantitative_counts.csv'), index=False)
+        indicator_counts.to_csv(os.path.join(directory, 'indicator_counts.csv'), index=False)
+        counts['in'] = len(file_paths)
+        counts['out'] = len(indicator_counts)
+        counts['params'] = {'companies': args.companies, 'reports': args.reports, 'rows': args.rows, 'seed': args.seed}
+        counts['fingerprint'] = fingerprint_values([quantitative_counts, indicator_counts])
+
+
+def bench_database(report, directory, args):
+    from database import add_qualitative_sum, build_database
+
+    if not os.path.exists(os.path.join(directory, 'indicator_counts.csv')):
+        bench_calculate(RunReport(), directory, args)
+    esg_report_path = os.path.join(directory, 'esg_report.csv')
+    make_esg_report(esg_report_path, args.companies, args.reports, np.random.default_rng(args.seed))
+    output_path = os.path.join(directory, 'database.csv')
+    with report.stage('database', 'files', 'rows') as counts, quiet():
+        with_sum_path = os.path.join(directory, 'indicator_counts_with_sum.csv')
+        add_qualitative_sum(os.path.join(directory, 'indicator_counts.csv'), with_sum_path)
+        stats = build_database(with_sum_path, os.path.join(directory, 'quantitative_counts.csv'), esg_report_path,
+                               os.path.join(directory, 'company_id_alias.csv'), output_path)
+        counts['in'] = 4
+        counts['out'] = stats['rows']
+        counts['params'] = {'companies': args.companies, 'reports': args.reports, 'rows': args.rows, 'seed': args.seed}
+        counts['fingerprint'] = fingerprint_files([output_path])
+
+
+@contextlib.contextmanager
+def recorded_heatmaps(heatmap):
+    """
+    Records the frame and title of every heatmap the page renders while the block runs.
+
+    The PNG bytes depend on the matplotlib version, so the suite fingerprints the
+    data handed to the renderer instead, plus the pixel size of each image (``png_sizes``).
+    """
+    rendered = []
+    heatmap_image = heatmap.heatmap_image
+
+    def record(data, title, *args, **kwargs):
+        rendered.append([title, data])
+        return heatmap_image(data, title, *args, **kwargs)
+
+    heatmap.heatmap_image = record
+    try:
+        yield rendered
+    finally:
+        heatmap.heatmap_image = heatmap_image
+
+
+def png_sizes(images):
+    sizes = []
+    for image in images:
+        png = base64.b64decode(image.removeprefix('data:image/png;base64,'))
+        if not png.startswith(b'\x89PNG'):
+            raise ValueError("a heatmap is not a PNG")
+        # width and height from the IHDR chunk
+        sizes.append([int.from_bytes(png[16:20], 'big'), int.from_bytes(png[20:24], 'big')])
+    return sizes
+
+
+def bench_dashboards(report, directory, args):
+    import esg_data
+    import esg_indicators
+    # the pages' own imports, so that the load stages time the data and not the libraries
+    import dash_bootstrap_components
+    import esg_aggregates
+    import esg_figures
+
+    working_directory = os.getcwd()
+    for rows in args.database_rows:
+        data_directory = os.path.join(directory, f"dashboards_{rows}")
+        os.makedirs(data_directory)
+        make_database_csv(os.path.join(data_directory, 'database.csv'), rows, args.seed)
+        shutil.copy(indicator_aliases_path, data_directory)
+        params = {'rows': rows, 'clicks': args.clicks, 'seed': args.seed}
+
+        # the pages load the shared database and precompute their tables when imported
+        os.chdir(data_directory)
+        try:
+            esg_data.shared_database.cache_clear()
+            esg_indicators.load_indicator_registry.cache_clear()
+            with report.stage(f"dashboard_load_{rows}", 'rows', 'pages') as counts:
+                pages = []
+                for name in ['compare_heatmap', 'IndustryLeaders', 'ESGIndicatorFrequecny']:
+                    pages.append(importlib.reload(sys.modules[name]) if name in sys.modules else importlib.import_module(name))
+                heatmap, leaders, frequency = pages
+                counts['in'] = len(esg_data.shared_database())
+                counts['out'] = len(pages)
+                counts['params'] = params
+                counts['fingerprint'] = fingerprint_values([heatmap.industry_prevalence]
+                                                           + [leaders.company_tables[industry] for industry in sorted(leaders.company_tables)])
+        finally:
+            os.chdir(working_directory)
+
+        # clicks go through each page's render cache, as on the server: a figure is drawn on its first request only
+        years = [int(year) for year in heatmap.years]
+        with report.stage(f"dashboard_heatmap_{rows}", 'clicks', 'images') as counts, recorded_heatmaps(heatmap) as rendered:
+            images = []
+            for index in range(args.clicks):
+                images += heatmap.update_heatmaps(1, years[index % len(years)], years[(index * 7 + 1) % len(years)],
+                                                  list(heatmap.categories)[index % 3])
+            counts['in'] = args.clicks
+            counts['out'] = len(images)
+            counts['params'] = params
+            counts['fingerprint'] = fingerprint_values([value for title, data in rendered for value in (title, data)]
+                                                       + png_sizes(images))
+
+        industries = sorted(leaders.company_tables)
+        with report.stage(f"dashboard_leaders_{rows}", 'clicks', 'tables') as counts:
+            responses = []
+            for index in range(args.clicks):
+                _, table = leaders.update_graph(industries[index * 7919 % len(industries)])
+                responses.append(json.dumps(table.to_plotly_json(), cls=plotly.utils.PlotlyJSONEncoder))
+            counts['in'] = counts['out'] = args.clicks
+            counts['params'] = params
+            counts['fingerprint'] = fingerprint_values(responses)
+
+        companies = list(frequency.companies)
+        indicator_types = ['top_5', 'top_5_environmental', 'top_5_social', 'top_5_governance']
+        with report.stage(f"dashboard_frequency_{rows}", 'clicks', 'figures') as counts:
+            responses = []
+            for index in range(args.clicks):
+                graph = frequency.update_graph(1, companies[index * 7919 % len(companies)], indicator_types[index % 4])
+                responses.append(json.dumps(graph.figure, cls=plotly.utils.PlotlyJSONEncoder))
+            counts['in'] = counts['out'] = args.clicks
+            counts['params'] = params
+            counts['fingerprint'] = fingerprint_values(responses)
+
+
+def check_baseline(records, baseline, threshold):
+    """
+    Compares the suite's stage records with the baseline run.
+
+    Returns:
+        int: The number of result mismatches and timing regressions.
+    """
+    failures = 0
+    comparable = {}
+    for record in records:
+        expected = baseline.get(record['stage'])
+        if expected is None:
+            print(f"{record['stage']:28s} no baseline yet (--update-baseline records one)")
+        elif expected.get('params') != record.get('params'):
+            print(f"{record['stage']:28s} baseline has other parameters, not compared")
+        elif expected.get('fingerprint') != record.get('fingerprint'):
+            print(f"{record['stage']:28s} RESULT MISMATCH: {record.get('fingerprint')} != {expected.get('fingerprint')}")
+            failures += 1
+        else:
+            result = "same result as the baseline" if record.get('fingerprint') else "timed only"
+            print(f"{record['stage']:28s} {result}")
+            comparable[record['stage']] = record
+    # stages under half a second vary too much between runs to judge their timing
+    regressions = [row for row in compare_runs({stage: baseline[stage] for stage in comparable}, comparable, threshold,
+                                               min_seconds=0.5)
+                   if row['regression']]
+    for row in regressions:
+        print(f"{row['stage']:28s} SLOWER: {row['metric']} {row['base']:.3f} -> {row['new']:.3f} ({row['change']:+.0%})")
+    return failures + len(regressions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run every pipeline and dashboard hot path on synthetic data, time it and "
+                                                 "check its results against the stored baseline.")
+    parser.add_argument('--cases', default=",".join(cases), help=f"comma-separated subset of {','.join(cases)}")
+    parser.add_argument('--pdfs', type=int, default=4, help="extract: reports")
+    parser.add_argument('--pages', type=int, default=20, help="extract: pages per report")
+    parser.add_argument('--table-density', type=float, default=0.5, help="extract: tables per page")
+    parser.add_argument('--sentence-files', type=int, default=8, help="replace/filter: text files")
+    parser.add_argument('--sentences', type=int, default=2000, help="replace/filter: sentences per file")
+    parser.add_argument('--threshold', type=float, default=0.0395188,
+                        help="filter: class probability; the default keeps about half the sentences with the tiny random model")
+    parser.add_argument('--companies', type=int, default=50, help="postprocess/calculate/database: companies")
+    parser.add_argument('--reports', type=int, default=5, help="postprocess/calculate/database: reports per company")
+    parser.add_argument('--rows', type=int, default=200, help="postprocess: rows per LLM output CSV")
+    parser.add_argument('--workers', type=int, default=1, help="postprocess: worker processes")
+    parser.add_argument('--database-rows', default="1000,100000",
+                        help="dashboards: comma-separated database.csv sizes, e.g. 1000,100000,1000000")
+    parser.add_argument('--clicks', type=int, default=10, help="dashboards: callback calls per page")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--report', default=None, help="also append the run to this JSON-lines report")
+    parser.add_argument('--baseline', default=baseline_path)
+    parser.add_argument('--update-baseline', action='store_true', help="store this run as the baseline instead of checking")
+    parser.add_argument('--regression-threshold', type=float, default=0.5,
+                        help="relative slowdown against the baseline that fails the suite")
+    args = parser.parse_args()
+    args.database_rows = [int(rows) for rows in args.database_rows.split(',') if rows.strip()]
+
+    selected = [case.strip() for case in args.cases.split(',') if case.strip()]
+    unknown = set(selected) - set(cases)
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(sorted(unknown))}")
+
+    report = RunReport(args.report)
+    with tempfile.TemporaryDirectory() as directory:
+        for case in cases:
+            if case in selected:
+                skipped = globals()[f"bench_{case}"](report, directory, args)
+                if skipped:
+                    print(f"{case}: skipped ({skipped})")
+
+    print()
+    print(f"{'stage':28s} {'wall s':>8s} {'cpu s':>8s} {'peak MB':>8s}  throughput")
+    for record in report.records:
+        print(f"{record['stage']:28s} {record['wall_seconds']:8.3f} {record['cpu_seconds']:8.3f} {record['peak_rss_mb']:8.0f}  "
+              f"{record['in_per_second']:,.1f} {record['unit_in']}/s in, {record['out_per_second']:,.1f} {record['unit_out']}/s out")
+    print()
+
+    if args.update_baseline:
+        # keep the baseline entries of cases this run skipped or did not select
+        stored = {}
+        if os.path.exists(args.baseline):
+            stored = list(load_runs(args.baseline).values())[-1]
+        stored.update({record['stage']: record for record in report.records})
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w') as file:
+            for record in stored.values():
+                file.write(json.dumps({**record, 'run': report.run}) + '\n')
+        print(f"baseline written to {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}; run with --update-baseline first")
+        return
+    failures = check_baseline(report.records, list(load_runs(args.baseline).values())[-1], args.regression_threshold)
+    print(f"{failures} failure(s) against {args.baseline}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Pipeline'))
+
+from extract_pdf import remove_table_text, table_cell_remover
+
+words = [
+    "climate", "emissions", "energy", "employees", "waste", "water", "policy", "board",
+    "governance", "training", "the", "company", "reduced", "increased", "our", "in",
+    "year", "total", "sites", "suppliers", "and", "of", "per", "cent", "reporting",
+]
+labels = [
+    "Scope 1 emissions", "Scope 2 emissions", "Energy consumption", "Water withdrawal",
+    "Hazardous waste", "Employees", "Female managers", "Work accidents", "Training hours",
+]
+units = ["t CO2e", "MWh", "m3", "t", "%", "FTE", "hours", "EUR m"]
+
+
+def remove_table_text_sequential(text, tables):
+    # the original cell-by-cell implementation, kept as the reference
+    for table in tables:
+        for _, row in table.iterrows():
+            for cell in row:
+                if isinstance(cell, str):
+                    text = text.replace(cell, '')
+    return text
+
+
+def make_tables(n_cells, rng):
+    cells = []
+    for i in range(n_cells):
+        kind = i % 3
+        if kind == 0:
+            cells.append(f"{rng.choice(labels)} {i}")
+        elif kind == 1:
+            cells.append(f"{rng.randint(1, 99999):,} {rng.choice(units)}")
+        else:
+            cells.append(f"{rng.randint(2015, 2024)}/{i}")
+    # tabula returns a mix of string and numeric cells
+    tables = []
+    for start in range(0, n_cells, 40):
+        chunk = cells[start:start + 40]
+        rows = [chunk[j:j + 4] + [float(j)] for j in range(0, len(chunk), 4)]
+        tables.append(pd.DataFrame(rows))
+    return tables, cells
+
+
+def make_document(n_pages, cells, rng, sentences_per_page=30):
+    pages = []
+    for page_number in range(n_pages):
+        parts = []
+        for _ in range(sentences_per_page):
+            sentence = " ".join(rng.choice(words) for _ in range(rng.randint(8, 20)))
+            parts.append(sentence.capitalize() + ".")
+            if rng.random() < 0.15:
+                parts.append(rng.choice(cells))
+        pages.append(" ".join(parts) + " ")
+    return pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark remove_table_text against the cell-by-cell loop.")
+    parser.add_argument('--pages', type=int, default=500)
+    parser.add_argument('--cells', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    tables, cells = make_tables(args.cells, rng)
+    pages = make_document(args.pages, cells, rng)
+    text = "".join(pages)
+    print(f"document: {args.pages} pages, {len(text):,} characters, {len(cells)} string cells")
+
+    start = time.perf_counter()
+    expected = remove_table_text_sequential(text, tables)
+    sequential_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = remove_table_text(text, tables)
+    single_pass_seconds = time.perf_counter() - start
+
+    print(f"cell-by-cell replace: {sequential_seconds:8.3f} s")
+    print(f"remover:              {single_pass_seconds:8.3f} s  ({sequential_seconds / single_pass_seconds:.1f}x)")
+    print(f"identical output:     {result == expected}")
+
+    # page by page, as iter_pages removes them; each page only loops over the cells it contains
+    start = time.perf_counter()
+    expected_pages = []
+    for page in pages:
+        for cell in cells:
+            page = page.replace(cell, '')
+        expected_pages.append(page)
+    sequential_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    remover = table_cell_remover(tables)
+    result_pages = [remover.remove(page) for page in pages]
+    single_pass_seconds = time.perf_counter() - start
+    looped = sum(len(remover.occurring(page)) for page in pages)
+    print(f"per page, cell-by-cell: {sequential_seconds:6.3f} s")
+    print(f"per page, remover:      {single_pass_seconds:6.3f} s  ({sequential_seconds / single_pass_seconds:.1f}x, "
+          f"{looped / len(pages):.1f} of {len(set(cells))} cells per page)")
+    print(f"identical output:     {result_pages == expected_pages}")
+    # a cell split by a page break is only removed from the whole document
+    print(f"same as whole document: {''.join(result_pages) == result}")
+    if result != expected or result_pages != expected_pages:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
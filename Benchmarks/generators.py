@@ -0,0 +1,245 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+benchmarks_directory = os.path.dirname(os.path.abspath(__file__))
+indicator_aliases_path = os.path.join(benchmarks_directory, '..', 'Dashboards', 'esg_indicator_aliases.csv')
+# the shipped sample database; only its header is used, for the real column set
+database_sample_path = os.path.join(benchmarks_directory, '..', 'Dashboards', 'database.csv')
+
+# words of report prose: ESG keywords of the extractor and filler without any
+esg_words = [
+    "climate", "emissions", "energy", "employees", "waste", "water", "policy", "governance",
+    "training", "scope 1", "scope 2", "scope 3", "human rights", "bribery", "whistleblowing",
+    "accidents", "renewable", "health", "customers", "board members", "salary", "fines",
+]
+filler_words = [
+    "the", "company", "reduced", "increased", "our", "in", "year", "total", "sites", "suppliers",
+    "and", "of", "per", "cent", "tonnes", "group", "report", "business", "new", "plants",
+    "continued", "across", "segments", "revenue", "markets", "products", "this", "we", "by",
+]
+table_labels = [
+    "Scope 1 emissions", "Scope 2 emissions", "Energy consumption", "Water withdrawal",
+    "Hazardous waste", "Employees", "Female managers", "Work accidents", "Training hours",
+]
+table_units = ["t CO2e", "MWh", "m3", "t", "%", "FTE", "hours", "EUR m"]
+industries = ["Manufacturing", "Finance", "Energy", "Retail", "Technology", "Healthcare", "Transport", "Utilities"]
+
+
+def make_sentences(n, rng, esg_share=0.4):
+    """
+    Returns ``n`` report-like sentences; about ``esg_share`` of them contain an ESG keyword.
+
+    Args:
+        n (int): Number of sentences.
+        rng (np.random.Generator): Source of randomness.
+        esg_share (float): Share of sentences with at least one keyword.
+
+    Returns:
+        list: The sentences, capitalised and ending in a full stop.
+    """
+    lengths = rng.integers(6, 30, n)
+    has_keyword = rng.random(n) < esg_share
+    filler = rng.choice(filler_words, lengths.sum())
+    keywords = rng.choice(esg_words, n)
+    positions = (rng.random(n) * lengths).astype(int)
+    sentences = []
+    start = 0
+    for index, length in enumerate(lengths):
+        words = list(filler[start:start + length])
+        start += length
+        if has_keyword[index]:
+            words[positions[index]] = keywords[index]
+        sentences.append(" ".join(words).capitalize() + ".")
+    return sentences
+
+
+def make_report_pdf(path, pages, table_density, rng, sentences_per_page=24):
+    """
+    Writes a text-based PDF report with prose and ruled ESG tables, as ``00extract_pdf`` reads them.
+
+    Needs the optional ``fpdf2`` package.
+
+    Args:
+        path (str): The PDF to write.
+        pages (int): Number of pages.
+        table_density (float): Average number of tables per page; each table has a
+            header and 4 to 8 rows of label, two yearly values and a unit.
+        rng (np.random.Generator): Source of randomness.
+        sentences_per_page (int): Prose sentences per page, before the tables.
+
+    Returns:
+        dict: ``pages``, ``tables`` and ``sentences`` written.
+    """
+    from fpdf import FPDF
+
+    pdf = FPDF(format='A4')
+    pdf.set_auto_page_break(False)
+    pdf.set_font('Helvetica', size=9)
+    tables = 0
+    sentences = 0
+    for _ in range(pages):
+        pdf.add_page()
+        n_tables = min(rng.poisson(table_density), 2)
+        prose = make_sentences(sentences_per_page - 8 * n_tables, rng)
+        sentences += len(prose)
+        pdf.multi_cell(0, 4.5, " ".join(prose))
+        for _ in range(n_tables):
+            pdf.ln(4)
+            with pdf.table(col_widths=(50, 25, 25, 20), text_align='LEFT', width=120, align='LEFT') as table:
+                table.row(["Indicator", "2022", "2023", "Unit"])
+                for _ in range(rng.integers(4, 9)):
+                    table.row([str(rng.choice(table_labels)), f"{rng.integers(1, 99999):,}", f"{rng.integers(1, 99999):,}",
+                               str(rng.choice(table_units))])
+            tables += 1
+    pdf.output(path)
+    return {"pages": pages, "tables": tables, "sentences": sentences}
+
+
+def make_sentence_file(path, n_sentences, rng):
+    """
+    Writes an extractor output file (``<Company>_<Year>.txt``): the header lines and one sentence per line.
+    """
+    sentences = make_sentences(n_sentences, rng, esg_share=1.0)
+    with open(path, 'w') as file:
+        file.write(f"Total sentences in the PDF after removing tables: {n_sentences * 3}\n")
+        file.write("ESG-related sentences:\n")
+        for sentence in sentences:
+            file.write(f"{sentence}\n")
+    return sentences
+
+
+def company_names(n_companies):
+    # letters only, since replace_strings only reads letter company names from file names
+    names = []
+    for index in range(n_companies):
+        letters = ''
+        for _ in range(5):
+            index, letter = divmod(index, 26)
+            letters = chr(ord('a') + letter) + letters
+        names.append(f"Company{letters}")
+    return names
+
+
+def make_company_aliases(path, n_companies, rng):
+    """
+    Writes ``company_id_alias.csv`` for the companies of ``company_names``, plus as many unrelated aliases.
+    """
+    aliases = [name.lower() for name in company_names(n_companies)] + [f"other{index:06d}" for index in range(n_companies)]
+    pd.DataFrame({
+        'company_id': range(1, len(aliases) + 1),
+        'company_alias': aliases,
+        'industry': rng.choice(industries, len(aliases)),
+        'company_name': [f"{alias.capitalize()} SE" for alias in aliases],
+    }).to_csv(path, index=False, encoding='latin1')
+
+
+def make_llm_csvs(directory, n_companies, reports, rows_per_file, rng, first_year=2015):
+    """
+    Writes the CSVs of notebook 03 as ``<Company>_(IR|ESG)_EN_<year>.csv``, one per company and report.
+
+    The ``Year`` column holds one year, a comma-separated list of years or nothing.
+
+    Returns:
+        list: The paths written.
+    """
+    indicators = pd.read_csv(indicator_aliases_path)['indicator'].to_numpy()
+    paths = []
+    for company in company_names(n_companies):
+        for report in range(reports):
+            published_year = first_year + report
+            kind = rng.random(rows_per_file)
+            spans = rng.integers(2, 5, rows_per_file)
+            years = [str(published_year - 1) if value < 0.5
+                     else ', '.join(str(published_year - offset) for offset in range(span, 0, -1)) if value < 0.85
+                     else None
+                     for value, span in zip(kind, spans)]
+            path = os.path.join(directory, f"{company}_{rng.choice(['ESG', 'IR'])}_EN_{published_year}.csv")
+            pd.DataFrame({
+                'Input': make_sentences(rows_per_file, rng, esg_share=1.0),
+                'Category': rng.choice(list('ESG'), rows_per_file),
+                'Indicator': rng.choice(indicators, rows_per_file),
+                'Topic': 't',
+                'Trend': None,
+                'Units': rng.choice(np.array(['t', 'MWh', None], dtype=object), rows_per_file),
+                'Value': rng.choice([1.0, 2.5, np.nan], rows_per_file),
+                'Year': years,
+            }).to_csv(path, index=False)
+            paths.append(path)
+    return paths
+
+
+def make_esg_report(path, n_companies, reports, rng, first_year=2015):
+    """
+    Writes the extractor's ``esg_report.csv`` (sentence totals per report) for the companies of ``make_llm_csvs``.
+    """
+    companies = np.repeat(company_names(n_companies), reports)
+    pd.DataFrame({
+        'Company': [f"{company}_ESG_EN" for company in companies],
+        'Year': np.tile(np.arange(first_year, first_year + reports), n_companies),
+        'Total Sentences': rng.integers(500, 5000, len(companies)),
+        'ESG Sentences': rng.integers(50, 500, len(companies)),
+    }).to_csv(path, index=False)
+
+
+def database_columns():
+    """
+    The columns of ``database.csv``, in order, taken from the shipped sample.
+    """
+    return pd.read_csv(database_sample_path, nrows=0).columns.tolist()
+
+
+def make_database_csv(path, rows, seed=0, years=10, chunk_rows=100_000):
+    """
+    Writes a ``database.csv`` of about ``rows`` rows with the real column set, in bounded memory.
+
+    Rows are company-years (``years`` per company, in company order). Industries
+    grow with the square root of the number of companies (8 industries up to
+    64 companies, as in the real data; 100 for 10,000 companies), so both the
+    industry heatmaps and the per-industry company charts grow with the size. Each indicator column is
+    empty at its own rate, as in the real data, and the sum, total and score
+    columns are derived from the counts the way ``database.py`` does.
+
+    Args:
+        path (str): The CSV to write.
+        rows (int): Number of rows; rounded up to whole companies.
+        seed (int): Seed; the same seed and size give the same file.
+        years (int): Reports per company, ending in 2023.
+        chunk_rows (int): Rows generated and written at a time.
+
+    Returns:
+        int: The number of rows written.
+    """
+    rng = np.random.default_rng(seed)
+    columns = database_columns()
+    indicators = columns[columns.index('year') + 1:columns.index('qualitative_sentences')]
+    missing_rates = rng.beta(0.5, 1.2, len(indicators))
+    means = rng.gamma(1.5, 3, len(indicators))
+    n_companies = -(-rows // years)
+    n_industries = max(len(industries), round(n_companies ** 0.5))
+    industry_names = industries + [f"Industry {index:04d}" for index in range(len(industries), n_industries)]
+    company_industries = rng.choice(industry_names, n_companies)
+    companies_per_chunk = max(1, chunk_rows // years)
+    written = 0
+    for first in range(0, n_companies, companies_per_chunk):
+        company_index = np.repeat(np.arange(first, min(first + companies_per_chunk, n_companies)), years)
+        n = len(company_index)
+        counts = rng.poisson(means, (n, len(indicators))).astype(float)
+        counts[rng.random(counts.shape) < missing_rates] = np.nan
+        names = np.array(company_names(n_companies)[first:first + companies_per_chunk])
+        chunk = pd.DataFrame(counts, columns=indicators)
+        chunk.insert(0, 'company_id', company_index + 1)
+        chunk.insert(1, 'company', np.repeat(names, years))
+        chunk.insert(2, 'year', np.tile(np.arange(2024 - years, 2024), n // years))
+        chunk['qualitative_sentences'] = np.nansum(counts, axis=1)
+        chunk['quantitative_sentences'] = rng.binomial(chunk['qualitative_sentences'].astype(int), 0.3)
+        chunk['total sentences'] = rng.integers(500, 8000, n)
+        chunk['esg sentences'] = rng.integers(50, 600, n)
+        chunk['qualitative_score'] = chunk['qualitative_sentences'] / chunk['total sentences']
+        chunk['quantitative_score'] = chunk['quantitative_sentences'] / chunk['total sentences']
+        chunk['industry'] = company_industries[company_index]
+        chunk['company_name'] = [f"{name} SE" for name in chunk['company']]
+        chunk[columns].to_csv(path, mode='a' if written else 'w', header=not written, index=False)
+        written += n
+    return written
@@ -1,69 +1,57 @@
 # Import required libraries
-import pandas as pd
+import base64
+import gzip
+import json
+import os
 from flask import Flask
 import dash
+from dash import callback, clientside_callback
 from dash import dcc
 from dash import html
-from dash.dependencies import Input, Output, State
+from dash.dependencies import ClientsideFunction, Input, Output, State
+from esg_aggregates import company_series
+from esg_data import shared_database
+from esg_indicators import load_indicator_registry
 
-# Load the CSV file
-file_path = 'database.csv'
-df = pd.read_csv(file_path)
+# The shared database, loaded once per process; this page only reads it
+df = shared_database()
+
+# Indicators per category and their display names from the shared registry
+registry = load_indicator_registry()
+e_indicators = registry.by_category('E')
+s_indicators = registry.by_category('S')
+g_indicators = registry.by_category('G')
 
 # Extract the list of companies
 companies = df['company'].unique()
 
-# Load the alias CSV file
-alias_file_path = 'esg_indicator_aliases.csv'
-alias_df = pd.read_csv(alias_file_path)
-
-# Create a dictionary to map indicators to aliases
-indicator_to_alias = {alias.lower(): indicator for alias, indicator in zip(alias_df['Alias'], alias_df['indicator'])}
-
-# Define the indicators for each category
-e_indicators = [
-    "climate_change_mitigation", "decarbonisation", "financial_resources_allocated_for_esg",
-    "achieved_ghg_emission_reductions", "expected_ghg_emission_reductions", "total_energy_consumption",
-    "total_energy_consumption_from_fossil_sources", "total_energy_consumption_from_nuclear_sources",
-    "renewable_energy_production", "total_energy_consumption_from_renewable_sources", "scope_1", "scope_2",
-    "scope_3", "total_ghg_emissions", "emissions_to_air_by_pollutant", "emissions_to_water_by_pollutant",
-    "emissions_to_soil_by_pollutant", "total_amount_of_substances_of_concern_hazard_class",
-    "total_water_consumption", "total_water_recycled_and_reused", "policy_related_to_water_and_marine_resources",
-    "total_waste_generated", "total_amount_of_hazardous_waste", "total_amount_of_radioactive_waste"
-]
-
-s_indicators = [
-    "human_rights_policy_commitments_for_employees", "workplace_accident_prevention_policy",
-    "elimination_of_discrimination", "grievance_or_complaints_handling", "mitigate_negative_impacts_on_own_workforce",
-    "delivering_positive_impacts_for_own_workforce", "number_of_employees", "number_of_board_members",
-    "percentage_of_employees_at_top_management_level", "number_of_employees_under_30", "percentage_of_employees_under_30",
-    "number_of_employees_between_30_and_50", "percentage_of_employees_between_30_and_50", "number_of_employees_over_50",
-    "percentage_of_employees_over_50", "number_of_fatalities_in_own_workforce", "number_of_work_related_accidents",
-    "number_of_work_related_ill_health", "number_incidents_of_discrimination", "number_of_complaints_filed",
-    "number_of_severe_human_rights_issues", "amount_of_fines_for_severe_human_rights_issues",
-    "human_rights_policy_commitments_for_customers_and_end_users"
-]
-    
-g_indicators = [
-    "whistleblowing_protection", "policy_for_animal_welfare", "training_within_organisation_on_business_conduct",
-    "disclosure_on_corruption_and_bribery", "violation_of_anti_corruption_and_anti_bribery_laws",
-    "fines_paid_for_violation_of_anti_corruption_and_anti_bribery_laws", "financial_political_contributions",
-    "legal_proceedings_for_late_payments", "information_regarding_payment_practices"
-]
-
-# Combine all indicators
-all_indicators = e_indicators + s_indicators + g_indicators
-
 # Filter the indicators to only include those present in the CSV columns
-filtered_indicators = [ind for ind in all_indicators if ind in df.columns]
+filtered_indicators = [ind for ind in registry.columns if ind in df.columns]
+
+# Build the chart in the browser from series shipped once (ESG_FREQUENCY_CLIENTSIDE=1),
+# gzip-compressed in transit and in the page when ESG_FREQUENCY_GZIP=1
+clientside_charts = os.environ.get('ESG_FREQUENCY_CLIENTSIDE', '') not in ('', '0')
+compress_series = os.environ.get('ESG_FREQUENCY_GZIP', '') not in ('', '0')
 
-# Initialize the Flask app
-server = Flask(__name__)
+def company_series_store(compress=False):
+    """
+    Data for the clientside chart: every company's indicator series (see ``esg_aggregates.company_series``)
+    with the indicator names and categories for the legend, as JSON or as base64-encoded gzip of that JSON.
+    """
+    data = company_series(df, filtered_indicators)
+    data['indicators'] = filtered_indicators
+    data['names'] = [registry.label(ind) for ind in filtered_indicators]
+    data['categories'] = [registry.categories[ind] for ind in filtered_indicators]
+    if not compress:
+        return {'encoding': 'json', 'data': data}
+    text = json.dumps(data, separators=(',', ':'))
+    return {'encoding': 'gzip', 'data': base64.b64encode(gzip.compress(text.encode('utf-8'), compresslevel=6, mtime=0)).decode('ascii')}
 
-# Initialize the Dash app
-app = dash.Dash(__name__, server=server, external_stylesheets=['https://stackpath.bootstrapcdn.com/bootstrap/4.3.1/css/bootstrap.min.css'])
+# Part of the app layout rather than the page, so the browser receives it once per visit
+stores = [dcc.Store(id='company-series-store', data=company_series_store(compress_series))] if clientside_charts else []
 
-app.layout = html.Div([
+# Page layout, served by app.py or by the standalone app below
+layout = html.Div([
     html.Div([
         html.H1("ESG Indicator-Specific Sentence Analysis Dashboard", className="text-center mb-4"),
         
@@ -93,19 +81,13 @@ app.layout = html.Div([
         ], className="form-group"),
         
         html.Div([
-            html.Button('Submit', id='submit-button', n_clicks=0, className="btn btn-primary btn-lg btn-block mb-4"),
+            html.Button('Submit', id='frequency-submit-button', n_clicks=0, className="btn btn-primary btn-lg btn-block mb-4"),
         ], className="form-group text-center"),
         
         html.Div(id='graph-container', className="mt-4")
     ], className="container")
 ])
 
-@app.callback(
-    Output('graph-container', 'children'),
-    [Input('submit-button', 'n_clicks')],
-    [State('company-dropdown', 'value'),
-     State('indicator-type-dropdown', 'value')]
-)
 def update_graph(n_clicks, selected_company, indicator_type):
     if n_clicks > 0 and selected_company and indicator_type:
         filtered_df = df[df['company'] == selected_company]
@@ -119,22 +101,13 @@ def update_graph(n_clicks, selected_company, indicator_type):
         elif indicator_type == 'top_5_governance':
             indicators = [ind for ind in g_indicators if ind in filtered_indicators]
         
-        indicator_totals = filtered_df[indicators].sum().sort_values(ascending=False)
+        # stable sort: ties keep registry order, as in the clientside chart
+        indicator_totals = filtered_df[indicators].sum().sort_values(ascending=False, kind='stable')
         top_indicators = indicator_totals.index[:5]
 
         def get_indicator_with_category(indicator):
-            category = ""
-            if indicator in e_indicators:
-                category = "(E)"
-            elif indicator in s_indicators:
-                category = "(S)"
-            elif indicator in g_indicators:
-                category = "(G)"
-            
-            if indicator_type == 'top_5':
-                return f"{indicator_to_alias.get(indicator.lower(), indicator)} {category}"
-            else:
-                return f"{indicator_to_alias.get(indicator.lower(), indicator)}"
+            # Alias, with the category only when all categories are shown
+            return registry.label(indicator, with_category=indicator_type == 'top_5')
         
         figure = {
             'data': [
@@ -159,5 +132,29 @@ def update_graph(n_clicks, selected_company, indicator_type):
     else:
         return html.Div("Please select both a company and an indicator type, then click submit.", className="alert alert-warning")
 
+if clientside_charts:
+    # Same figure, built by assets/esg_frequency.js from the store without a request per click
+    clientside_callback(
+        ClientsideFunction(namespace='esg_frequency', function_name='update_graph'),
+        Output('graph-container', 'children'),
+        [Input('frequency-submit-button', 'n_clicks')],
+        [State('company-dropdown', 'value'),
+         State('indicator-type-dropdown', 'value'),
+         State('company-series-store', 'data')]
+    )
+else:
+    callback(
+        Output('graph-container', 'children'),
+        [Input('frequency-submit-button', 'n_clicks')],
+        [State('company-dropdown', 'value'),
+         State('indicator-type-dropdown', 'value')]
+    )(update_graph)
+
 if __name__ == '__main__':
-    app.run_server(debug=True)
+    # Initialize the Flask app
+    server = Flask(__name__)
+
+    # Initialize the Dash app
+    app = dash.Dash(__name__, server=server, external_stylesheets=['https://stackpath.bootstrapcdn.com/bootstrap/4.3.1/css/bootstrap.min.css'])
+    app.layout = html.Div(stores + [layout])
+    app.run(debug=True)
@@ -0,0 +1,46 @@
+import gc
+
+import dash
+import dash_bootstrap_components as dbc
+from dash import callback, dcc, html
+from dash.dependencies import Input, Output
+
+# Importing the pages loads the shared database and registry once and precomputes
+# each page's tables; with gunicorn --preload that happens before the workers fork
+import compare_heatmap
+import ESGIndicatorFrequecny
+import IndustryLeaders
+
+# URL path to (navigation title, page layout)
+pages = {
+    '/': ('ESG Heatmaps', compare_heatmap.layout),
+    '/leaders': ('Industry Leaders', IndustryLeaders.layout),
+    '/indicators': ('Indicator Frequency', ESGIndicatorFrequecny.layout),
+}
+
+app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP], suppress_callback_exceptions=True,
+                title="ESG Dashboards")
+server = app.server
+
+app.layout = html.Div([
+    dcc.Location(id='url'),
+    *ESGIndicatorFrequecny.stores,
+    dbc.NavbarSimple(
+        [dbc.NavItem(dbc.NavLink(title, href=path, active='exact')) for path, (title, _) in pages.items()],
+        brand="ESG Dashboards", color="light", className="mb-4"
+    ),
+    html.Div(id='page-content')
+])
+
+@callback(Output('page-content', 'children'), [Input('url', 'pathname')])
+def display_page(pathname):
+    # Unknown paths show the first page
+    return pages.get(pathname, pages['/'])[1]
+
+# Everything loaded so far lives as long as the server; moving it out of the garbage
+# collector's generations keeps collections in forked workers from writing to (and
+# so copying) the shared pages
+gc.freeze()
+
+if __name__ == '__main__':
+    app.run(debug=True)
@@ -0,0 +1,89 @@
+// Clientside version of ESGIndicatorFrequecny.update_graph, used when ESG_FREQUENCY_CLIENTSIDE is set.
+// The store holds every company's indicator series (esg_aggregates.company_series), so picking
+// the top 5 indicators and building the line chart needs no request to the server.
+
+const indicatorTypeCategories = {
+    top_5: null,
+    top_5_environmental: 'E',
+    top_5_social: 'S',
+    top_5_governance: 'G'
+};
+
+// the decoded series of the last store seen; a gzip store is decompressed only once
+let cachedStore = null;
+let cachedSeries = null;
+
+function decodeSeries(store) {
+    if (store !== cachedStore) {
+        cachedStore = store;
+        if (store.encoding === 'gzip') {
+            const bytes = Uint8Array.from(atob(store.data), character => character.charCodeAt(0));
+            const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+            cachedSeries = new Response(stream).json();
+        } else {
+            cachedSeries = Promise.resolve(store.data);
+        }
+    }
+    return cachedSeries;
+}
+
+function companyFigure(series, selectedCompany, indicatorType) {
+    const company = series.companies.indexOf(selectedCompany);
+    const start = company < 0 ? 0 : series.offsets[company];
+    const end = company < 0 ? 0 : series.offsets[company + 1];
+    const category = indicatorTypeCategories[indicatorType];
+
+    // indicator totals over the company's reports; empty cells count as 0
+    const totals = new Map();
+    series.indicators.forEach((indicator, index) => {
+        if (category === null || series.categories[index] === category) {
+            let total = 0;
+            for (let row = start; row < end; row++) {
+                total += series.values[index][row] || 0;
+            }
+            totals.set(index, total);
+        }
+    });
+    // Array.prototype.sort is stable, so ties keep registry order as on the server
+    const topIndicators = [...totals.keys()].sort((a, b) => totals.get(b) - totals.get(a)).slice(0, 5);
+
+    return {
+        data: topIndicators.map(index => ({
+            x: series.year.slice(start, end),
+            y: series.values[index].slice(start, end),
+            type: 'line',
+            name: category === null ? `${series.names[index]} (${series.categories[index]})` : series.names[index]
+        })),
+        layout: {
+            title: `${selectedCompany} ESG Indicators`,
+            xaxis: {
+                title: 'Year',
+                type: 'category',
+                categoryorder: 'category ascending'
+            },
+            yaxis: {title: 'ESG Indicator Frequency (Sentence Level)'}
+        }
+    };
+}
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    esg_frequency: {
+        update_graph: function (nClicks, selectedCompany, indicatorType, store) {
+            if (!(nClicks > 0 && selectedCompany && indicatorType && store)) {
+                return {
+                    namespace: 'dash_html_components',
+                    type: 'Div',
+                    props: {
+                        children: 'Please select both a company and an indicator type, then click submit.',
+                        className: 'alert alert-warning'
+                    }
+                };
+            }
+            return decodeSeries(store).then(series => ({
+                namespace: 'dash_core_components',
+                type: 'Graph',
+                props: {id: 'indicator-graph', figure: companyFigure(series, selectedCompany, indicatorType)}
+            }));
+        }
+    }
+});
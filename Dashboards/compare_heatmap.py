@@ -1,117 +1,79 @@
-import pandas as pd
 import dash
-from dash import dcc, html
+from dash import callback, dcc, html
 from dash.dependencies import Input, Output, State
-import seaborn as sns
-import matplotlib.pyplot as plt
-import io
-import base64
-
-# Load the CSV file
-file_path = 'database.csv'
-df = pd.read_csv(file_path)
-plt.switch_backend('Agg')
-
-# List of ESG indicators
-e_indicators = [
-    "climate_change_mitigation", "decarbonisation", "financial_resources_allocated_for_esg",
-    "achieved_ghg_emission_reductions", "expected_ghg_emission_reductions", "total_energy_consumption",
-    "total_energy_consumption_from_fossil_sources", "total_energy_consumption_from_nuclear_sources",
-    "renewable_energy_production", "total_energy_consumption_from_renewable_sources", "scope_1", "scope_2",
-    "scope_3", "total_ghg_emissions", "emissions_to_air_by_pollutant", "total_water_consumption",
-    "policy_related_to_water_and_marine_resources", "total_waste_generated", "total_amount_of_hazardous_waste"
-]
-
-s_indicators = [
-    "human_rights_policy_commitments_for_employees", "workplace_accident_prevention_policy",
-    "elimination_of_discrimination", "grievance_or_complaints_handling", "mitigate_negative_impacts_on_own_workforce",
-    "delivering_positive_impacts_for_own_workforce", "number_of_employees", "number_of_board_members",
-    "percentage_of_employees_at_top_management_level", "number_of_work_related_ill_health", 
-    "number_of_severe_human_rights_issues", "human_rights_policy_commitments_for_customers_and_end_users"
-]
-
-g_indicators = [
-    "whistleblowing_protection", "training_within_organisation_on_business_conduct",
-    "disclosure_on_corruption_and_bribery", "violation_of_anti_corruption_and_anti_bribery_laws",
-    "fines_paid_for_violation_of_anti_corruption_and_anti_bribery_laws", "legal_proceedings_for_late_payments"
-]
-
-# Filter the indicators to include only those that exist in the dataset
-e_indicators = [col for col in e_indicators if col in df.columns]
-s_indicators = [col for col in s_indicators if col in df.columns]
-g_indicators = [col for col in g_indicators if col in df.columns]
-
-# Fill NaN values with 0
-df[e_indicators] = df[e_indicators].fillna(0)
-df[s_indicators] = df[s_indicators].fillna(0)
-df[g_indicators] = df[g_indicators].fillna(0)
+from esg_aggregates import difference_matrix, prevalence_cube, prevalence_for_year
+from esg_data import database_version, shared_database
+from esg_figures import heatmap_image
+from esg_indicators import category_labels, load_indicator_registry
+from render_cache import shared_render_cache, warm_on_start
+
+# The shared database, loaded once per process; this page only reads it
+df = shared_database()
+
+# Indicators per category from the shared registry, only those that exist in the dataset
+registry = load_indicator_registry()
+e_indicators = registry.by_category('E', df.columns)
+s_indicators = registry.by_category('S', df.columns)
+g_indicators = registry.by_category('G', df.columns)
+
+# Share of reports mentioning each indicator per year and industry, computed once instead of per click
+# (an empty cell counts as not mentioned, so the shared frame needs no fillna)
+industry_prevalence = prevalence_cube(df, e_indicators + s_indicators + g_indicators)
 
 # Helper function to create heatmaps
 def generate_heatmap(data, title, yaxis_label=True):
-    plt.figure(figsize=(10, 7))  # Rescaled image size
-    sns.heatmap(data.set_index('industry').T, annot=True, cmap="YlGnBu", cbar=True, linewidths=.5)
-    plt.title(title, fontsize=16)
-    plt.xlabel("Industry", fontsize=12)
-    plt.ylabel("Indicators" if yaxis_label else "", fontsize=12)  # Control y-axis label
-
-    plt.xticks(rotation=45, ha='right')  # Rotate x-axis labels to avoid cutting off
-    plt.yticks(rotation=0)  # Ensure y-axis labels are horizontal
-    plt.tight_layout()  # Automatically adjust plot to ensure nothing is cut off
-
-    buf = io.BytesIO()
-    plt.savefig(buf, format="png")
-    plt.close()
-    buf.seek(0)
-    image_base64 = base64.b64encode(buf.read()).decode("utf-8")
-    return image_base64
+    return heatmap_image(data.set_index('industry').T, title, "Industry",
+                         "Indicators" if yaxis_label else "",  # Control y-axis label
+                         cmap="YlGnBu")
 
 def generate_difference_heatmap(data1, data2, title):
-    # Ensure that both datasets contain the same industries
-    all_industries = set(data1['industry']).union(set(data2['industry']))
-
-    # Add missing industries with zero values in data1
-    for industry in all_industries:
-        if industry not in data1['industry'].values:
-            missing_row = pd.DataFrame([[industry] + [0] * (data1.shape[1] - 1)], columns=data1.columns)
-            data1 = pd.concat([data1, missing_row], ignore_index=True)
-
-    # Add missing industries with zero values in data2
-    for industry in all_industries:
-        if industry not in data2['industry'].values:
-            missing_row = pd.DataFrame([[industry] + [0] * (data2.shape[1] - 1)], columns=data2.columns)
-            data2 = pd.concat([data2, missing_row], ignore_index=True)
-
-    # Ensure that the data is sorted by industry to align rows correctly
-    data1 = data1.sort_values('industry').reset_index(drop=True)
-    data2 = data2.sort_values('industry').reset_index(drop=True)
-
-    # Calculate the difference
-    diff_data = data2.set_index('industry') - data1.set_index('industry')
-
-    plt.figure(figsize=(10, 7))
-    sns.heatmap(diff_data.T, annot=True, cmap="coolwarm", cbar=True, linewidths=.5, vmin=-1, vmax=1)
-    plt.title(title, fontsize=16)
-    plt.xlabel("Industry", fontsize=12)
-    plt.ylabel("Indicators", fontsize=12)
-
-    plt.xticks(rotation=45, ha='right')
-    plt.yticks(rotation=0)
-    plt.tight_layout()
-
-    buf = io.BytesIO()
-    plt.savefig(buf, format="png")
-    plt.close()
-    buf.seek(0)
-    image_base64 = base64.b64encode(buf.read()).decode("utf-8")
-    return image_base64
-
-# Initialize Dash app with Bootstrap
-app = dash.Dash(__name__, external_stylesheets=['https://stackpath.bootstrapcdn.com/bootstrap/4.3.1/css/bootstrap.min.css'])
+    # Difference per industry; industries missing in one year count as zeros
+    diff_data = difference_matrix(data1, data2)
+
+    return heatmap_image(diff_data.T, title, "Industry", "Indicators", cmap="coolwarm", vmin=-1, vmax=1)
+
+# Rendered heatmaps, keyed by the dropdown choices and the database version, in the cache shared by all pages
+render_cache = shared_render_cache()
+data_version = database_version()
+categories = {
+    'environmental': (e_indicators, category_labels['E']),
+    'social': (s_indicators, category_labels['S']),
+    'governance': (g_indicators, category_labels['G']),
+}
+
+# (cache key, render function) of each heatmap
+def heatmap_job(year, category, yaxis_label):
+    indicators, label = categories[category]
+    return (('heatmap', data_version, int(year), category, yaxis_label),
+            lambda: generate_heatmap(prevalence_for_year(industry_prevalence, year, indicators),
+                                     f"Year {year} - {label} ESG Indicators by Industry", yaxis_label=yaxis_label))
+
+def difference_heatmap_job(year1, year2, category):
+    indicators, label = categories[category]
+    return (('difference', data_version, int(year1), int(year2), category),
+            lambda: generate_difference_heatmap(prevalence_for_year(industry_prevalence, year1, indicators),
+                                                prevalence_for_year(industry_prevalence, year2, indicators),
+                                                f"Difference in {label} ESG Indicators by Industry"))
+
+def render_heatmap(year, category, yaxis_label):
+    return render_cache.get_or_render(*heatmap_job(year, category, yaxis_label))
+
+def render_difference_heatmap(year1, year2, category):
+    return render_cache.get_or_render(*difference_heatmap_job(year1, year2, category))
 
 # Generate list of years for dropdown
 years = sorted(df['year'].unique())
 
-app.layout = html.Div([
+# Render every dropdown combination up front when ESG_WARM_RENDER_CACHE is set
+if warm_on_start:
+    for category in categories:
+        for year1 in years:
+            render_cache.warm([heatmap_job(year1, category, yaxis_label=True),
+                               heatmap_job(year1, category, yaxis_label=False)])
+            render_cache.warm(difference_heatmap_job(year1, year2, category) for year2 in years)
+
+# Page layout, served by app.py or by the standalone app below
+layout = html.Div([
     html.Div([
         html.H1("ESG Heatmap Dashboard", className="text-center mb-4"),
         
@@ -150,7 +112,7 @@ app.layout = html.Div([
         ], className="form-group"),
         
         html.Div([
-            html.Button('Submit', id='submit-button', n_clicks=0, className="btn btn-primary btn-lg btn-block mb-4"),
+            html.Button('Submit', id='heatmap-submit-button', n_clicks=0, className="btn btn-primary btn-lg btn-block mb-4"),
         ], className="form-group text-center"),
         
         html.Div([
@@ -167,43 +129,25 @@ app.layout = html.Div([
     ], className="container")
 ])
 
-@app.callback(
+@callback(
     [Output('heatmap1-image', 'src'),
      Output('heatmap2-image', 'src'),
      Output('difference-heatmap-image', 'src')],
-    [Input('submit-button', 'n_clicks')],
+    [Input('heatmap-submit-button', 'n_clicks')],
     [State('year1-dropdown', 'value'), State('year2-dropdown', 'value'), State('category-dropdown', 'value')]
 )
 def update_heatmaps(n_clicks, selected_year1, selected_year2, category):
     if n_clicks > 0:  # Only generate heatmap after clicking submit
-        # Filter data by selected years
-        df_year1 = df[df['year'] == selected_year1]
-        df_year2 = df[df['year'] == selected_year2]
-        
-        industry_prevalence_e1 = df_year1.groupby('industry')[e_indicators].apply(lambda x: (x > 0).mean()).reset_index()
-        industry_prevalence_s1 = df_year1.groupby('industry')[s_indicators].apply(lambda x: (x > 0).mean()).reset_index()
-        industry_prevalence_g1 = df_year1.groupby('industry')[g_indicators].apply(lambda x: (x > 0).mean()).reset_index()
-
-        industry_prevalence_e2 = df_year2.groupby('industry')[e_indicators].apply(lambda x: (x > 0).mean()).reset_index()
-        industry_prevalence_s2 = df_year2.groupby('industry')[s_indicators].apply(lambda x: (x > 0).mean()).reset_index()
-        industry_prevalence_g2 = df_year2.groupby('industry')[g_indicators].apply(lambda x: (x > 0).mean()).reset_index()
-
-        if category == 'environmental':
-            heatmap1 = generate_heatmap(industry_prevalence_e1, f"Year {selected_year1} - Environmental ESG Indicators by Industry", yaxis_label=True)
-            heatmap2 = generate_heatmap(industry_prevalence_e2, f"Year {selected_year2} - Environmental ESG Indicators by Industry", yaxis_label=False)
-            difference_heatmap = generate_difference_heatmap(industry_prevalence_e1, industry_prevalence_e2, "Difference in Environmental ESG Indicators by Industry")
-        elif category == 'social':
-            heatmap1 = generate_heatmap(industry_prevalence_s1, f"Year {selected_year1} - Social ESG Indicators by Industry", yaxis_label=True)
-            heatmap2 = generate_heatmap(industry_prevalence_s2, f"Year {selected_year2} - Social ESG Indicators by Industry", yaxis_label=False)
-            difference_heatmap = generate_difference_heatmap(industry_prevalence_s1, industry_prevalence_s2, "Difference in Social ESG Indicators by Industry")
-        elif category == 'governance':
-            heatmap1 = generate_heatmap(industry_prevalence_g1, f"Year {selected_year1} - Governance ESG Indicators by Industry", yaxis_label=True)
-            heatmap2 = generate_heatmap(industry_prevalence_g2, f"Year {selected_year2} - Governance ESG Indicators by Industry", yaxis_label=False)
-            difference_heatmap = generate_difference_heatmap(industry_prevalence_g1, industry_prevalence_g2, "Difference in Governance ESG Indicators by Industry")
-        
+        heatmap1 = render_heatmap(selected_year1, category, yaxis_label=True)
+        heatmap2 = render_heatmap(selected_year2, category, yaxis_label=False)
+        difference_heatmap = render_difference_heatmap(selected_year1, selected_year2, category)
+
         return f"data:image/png;base64,{heatmap1}", f"data:image/png;base64,{heatmap2}", f"data:image/png;base64,{difference_heatmap}"
     return None, None, None  # Don't display an image before the button is clicked
 
 if __name__ == '__main__':
-    app.run_server(debug=True)
+    # Initialize Dash app with Bootstrap
+    app = dash.Dash(__name__, external_stylesheets=['https://stackpath.bootstrapcdn.com/bootstrap/4.3.1/css/bootstrap.min.css'])
+    app.layout = layout
+    app.run(debug=True)
 
@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+
+
+def prevalence_cube(df, indicators):
+    """
+    Share of reports per (year, industry) that mention each indicator at least once.
+
+    This is the ``groupby('industry')[...].apply(lambda x: (x > 0).mean())`` of
+    ``compare_heatmap.py`` for every year and every indicator at once, so a callback
+    only has to slice it.
+
+    Args:
+        df (pd.DataFrame): The database with ``year``, ``industry`` and the indicator columns; empty cells count as not mentioned.
+        indicators (list): The indicator columns.
+
+    Returns:
+        pd.DataFrame: Indexed by ``(year, industry)``, one column per indicator.
+    """
+    mentioned = df[indicators] > 0
+    return mentioned.groupby([df['year'], df['industry']], observed=True).mean().sort_index()
+
+
+def prevalence_for_year(cube, year, indicators):
+    """
+    Returns one year of the cube in the layout the heatmap functions take: an ``industry`` column and the indicators.
+    """
+    if year not in cube.index.get_level_values('year'):
+        return pd.DataFrame(columns=['industry'] + list(indicators))
+    return cube.xs(year, level='year')[indicators].reset_index()
+
+
+def difference_matrix(data1, data2):
+    """
+    Change from ``data1`` to ``data2``, per industry and column.
+
+    Both frames have an ``industry`` column, as returned by ``prevalence_for_year``.
+    An industry missing from one of them counts as all zeros there.
+
+    Returns:
+        pd.DataFrame: ``data2 - data1`` indexed by the sorted union of industries.
+    """
+    data1 = data1.set_index('industry')
+    data2 = data2.set_index('industry')
+    industries = pd.Index(sorted(set(data1.index) | set(data2.index)), name='industry')
+    return data2.reindex(industries, fill_value=0) - data1.reindex(industries, fill_value=0)
+
+
+def year_over_year_differences(cube, years, indicators):
+    """
+    Differences between consecutive ``years`` of the prevalence cube, in one aligned subtraction.
+
+    Args:
+        cube (pd.DataFrame): The output of ``prevalence_cube``.
+        years (list): The years to compare, in order; each is compared with the one before it.
+        indicators (list): The indicator columns.
+
+    Returns:
+        pd.DataFrame: Indexed by ``(year, industry)`` for every year but the first and
+        every industry in the cube, so all years share one layout. Each year holds
+        ``difference_matrix`` of it and the year before, with zeros for industries
+        that are in neither.
+    """
+    industries = sorted(set(cube.index.get_level_values('industry')))
+    index = pd.MultiIndex.from_product([list(years), industries], names=['year', 'industry'])
+    values = cube[indicators].reindex(index, fill_value=0)
+    return (values - values.groupby(level='industry').shift()).drop(index=years[0], level='year')
+
+
+def company_esg_tables(df, e_indicators, s_indicators, g_indicators, min_years=3):
+    """
+    Average number of E, S and G indicators each company discloses, per industry.
+
+    Builds the table of ``IndustryLeaders.update_graph`` for every industry at once:
+    indicators with a value are counted per report, averaged per company, companies
+    with fewer than ``min_years`` reports are dropped and the rest are ranked by
+    their total.
+
+    Args:
+        df (pd.DataFrame): The database with ``industry``, ``company_name``, ``year`` and the indicator columns.
+        e_indicators (list): Environmental indicator columns.
+        s_indicators (list): Social indicator columns.
+        g_indicators (list): Governance indicator columns.
+        min_years (int): Minimum number of reports per company.
+
+    Returns:
+        dict: Industry to a DataFrame indexed by ``company_name`` with ``E``, ``S``,
+        ``G``, ``years_reported`` and ``Total``, best first.
+    """
+    counts = pd.DataFrame({
+        'industry': df['industry'],
+        'company_name': df['company_name'],
+        'year': df['year'],
+        'E': df[e_indicators].notnull().sum(axis=1),
+        'S': df[s_indicators].notnull().sum(axis=1),
+        'G': df[g_indicators].notnull().sum(axis=1),
+    })
+
+    company_totals = counts.groupby(['industry', 'company_name'], observed=True).agg(
+        E=('E', 'mean'),
+        S=('S', 'mean'),
+        G=('G', 'mean'),
+        years_reported=('year', 'count')
+    )
+
+    company_totals = company_totals[company_totals['years_reported'] >= min_years]
+
+    company_totals = company_totals.round(0).astype(int)
+
+    company_totals['Total'] = company_totals[['E', 'S', 'G']].sum(axis=1)
+    company_totals = company_totals.sort_values(by=['Total', 'E', 'years_reported'], ascending=[False, False, False])
+
+    return {industry: table.droplevel('industry')
+            for industry, table in company_totals.groupby(level='industry', observed=True, sort=False)}
+
+
+def empty_company_table():
+    return pd.DataFrame(columns=['E', 'S', 'G', 'years_reported', 'Total'], index=pd.Index([], name='company_name'))
+
+
+def company_series(df, indicators, company_column='company'):
+    """
+    Indicator time series of every company in a compact, column-oriented form for the browser.
+
+    The rows are grouped by company, keeping their order in ``df``, so the rows of the
+    ``i``-th company are ``offsets[i]`` up to ``offsets[i + 1]`` of ``year`` and of every
+    list in ``values``. Whole numbers are stored as integers and empty cells as ``None``
+    (``null`` in JSON).
+
+    Args:
+        df (pd.DataFrame): The database with the company column, ``year`` and the indicator columns.
+        indicators (list): The indicator columns, in the order of ``values``.
+        company_column (str): The column that names the company.
+
+    Returns:
+        dict: ``companies``, ``offsets``, ``year`` and ``values`` (one list per indicator), all JSON-serialisable.
+    """
+    codes, companies = pd.factorize(df[company_column].astype(str))
+    rows = df.iloc[np.argsort(codes, kind='stable')]
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=len(companies)))])
+
+    values = []
+    for indicator in indicators:
+        column = rows[indicator].astype('float64')
+        if (column.dropna() % 1 == 0).all():
+            column = column.astype('Int64')
+        values.append([None if pd.isna(value) else value for value in column.tolist()])
+
+    return {
+        'companies': companies.tolist(),
+        'offsets': offsets.tolist(),
+        'year': rows['year'].astype(int).tolist(),
+        'values': values,
+    }
@@ -0,0 +1,111 @@
+import functools
+import hashlib
+import os
+
+import pandas as pd
+
+from esg_indicators import load_indicator_registry
+
+# Database CSV file and the Parquet dataset written next to it by 07database
+database_path = 'database.csv'
+dataset_path = 'database_parquet'
+
+# Columns the pages read besides the indicators
+page_columns = ['company', 'company_name', 'year', 'industry']
+
+
+def read_dataset(path, columns=None):
+    """
+    Reads columns of the Parquet dataset.
+
+    Args:
+        path (str): The dataset directory written by ``07database``.
+        columns (list): Columns to read; ``None`` reads all of them. Columns the dataset does not have are skipped.
+
+    Returns:
+        pd.DataFrame: Text columns come back as categoricals.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    partitioning = 'hive'
+    schema_path = os.path.join(path, '_common_metadata')
+    if os.path.exists(schema_path):
+        # the declared schema gives the partition column its type back (e.g. int16 years)
+        schema = pq.read_schema(schema_path)
+        field = schema.field(schema.metadata[b'partition_by'].decode())
+        if pa.types.is_dictionary(field.type):
+            partitioning = ds.HivePartitioning.discover(infer_dictionary=True)
+        else:
+            partitioning = ds.partitioning(pa.schema([field]), flavor='hive')
+        columns = schema.names if columns is None else columns
+    dataset = ds.dataset(path, format='parquet', partitioning=partitioning)
+    if columns is not None:
+        columns = [column for column in columns if column in dataset.schema.names]
+
+    df = dataset.to_table(columns=columns).to_pandas()
+    # sorted categories so groupbys and unique() order text columns like database.csv did
+    for column in df.select_dtypes('category').columns:
+        df[column] = df[column].cat.reorder_categories(sorted(df[column].cat.categories))
+    return df
+
+
+def read_csv(path, columns=None):
+    # fallback for a plain database.csv: still reads only the requested columns
+    df = pd.read_csv(path, usecols=None if columns is None else lambda column: column in columns)
+    if columns is not None:
+        df = df[[column for column in columns if column in df.columns]]
+    return df
+
+
+def load_database(columns=None, directory=None):
+    """
+    Loads the dashboard data, from the Parquet dataset when there is one and from ``database.csv`` otherwise.
+
+    Args:
+        columns (list): The columns the dashboards use. Columns the database does not
+            have are left out, so indicator lists can be passed as they are.
+        directory (str): Where to look for the data; defaults to the working directory.
+
+    Returns:
+        pd.DataFrame: The selected columns.
+    """
+    directory = directory or ''
+    if os.path.isdir(os.path.join(directory, dataset_path)):
+        return read_dataset(os.path.join(directory, dataset_path), columns)
+    return read_csv(os.path.join(directory, database_path), columns)
+
+
+@functools.lru_cache(maxsize=None)
+def shared_database(directory=None):
+    """
+    The database columns the pages use, loaded once per process and shared by every dashboard page.
+
+    That is ``page_columns`` and the indicator columns of the registry; sentence
+    counts, scores and company IDs are not read. Pages treat the frame as read-only
+    and derive their own tables from it, so a server that loads it before forking
+    workers (``gunicorn --preload``) keeps a single copy in memory that the workers
+    share copy-on-write.
+    """
+    return load_database(list(dict.fromkeys(page_columns + load_indicator_registry(directory).columns)), directory=directory)
+
+
+def database_version(directory=None):
+    """
+    Short fingerprint of the data ``load_database`` reads, from file names, sizes and modification times.
+
+    Caches of derived results (e.g. rendered figures) include it in their keys, so
+    they are not served from an older database.
+    """
+    directory = directory or ''
+    path = os.path.join(directory, dataset_path)
+    if os.path.isdir(path):
+        paths = sorted(os.path.join(root, file) for root, _, files in os.walk(path) for file in files)
+    else:
+        paths = [os.path.join(directory, database_path)]
+    digest = hashlib.sha256()
+    for file_path in paths:
+        stat = os.stat(file_path)
+        digest.update(f"{os.path.relpath(file_path, directory or '.')}:{stat.st_size}:{stat.st_mtime_ns}\n".encode('utf-8'))
+    return digest.hexdigest()[:16]
@@ -0,0 +1,95 @@
+import base64
+import io
+
+import seaborn as sns
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+# Every figure is an explicit Figure on its own Agg canvas and is never registered with
+# pyplot, so concurrent callbacks do not share state and nothing is left open after a
+# request. Matplotlib caches fonts per thread, which keeps the text rendering safe too.
+
+
+def new_figure(figsize):
+    figure = Figure(figsize=figsize)
+    FigureCanvasAgg(figure)
+    return figure
+
+
+def figure_to_base64(figure):
+    buf = io.BytesIO()
+    figure.savefig(buf, format="png")
+    return base64.b64encode(buf.getvalue()).decode("utf-8")
+
+
+def rotate_tick_labels(ax):
+    for label in ax.get_xticklabels():
+        label.set_rotation(45)  # Rotate x-axis labels to avoid cutting off
+        label.set_horizontalalignment('right')
+    for label in ax.get_yticklabels():
+        label.set_rotation(0)  # Ensure y-axis labels are horizontal
+
+
+def heatmap_image(data, title, xlabel, ylabel, **heatmap_options):
+    """
+    Renders a seaborn heatmap of ``data`` (rows on the y axis) to a base64-encoded PNG.
+
+    Args:
+        data (pd.DataFrame): The values to plot.
+        title (str): The figure title.
+        xlabel (str): The x-axis label.
+        ylabel (str): The y-axis label; ``""`` leaves it empty.
+        **heatmap_options: Passed on to ``seaborn.heatmap`` (``cmap``, ``vmin``, ...).
+
+    Returns:
+        str: The PNG, base64-encoded.
+    """
+    figure = new_figure((10, 7))
+    ax = figure.add_subplot()
+    sns.heatmap(data, annot=True, cbar=True, linewidths=.5, ax=ax, **heatmap_options)
+    ax.set_title(title, fontsize=16)
+    ax.set_xlabel(xlabel, fontsize=12)
+    ax.set_ylabel(ylabel, fontsize=12)
+
+    rotate_tick_labels(ax)
+    figure.tight_layout()  # Automatically adjust plot to ensure nothing is cut off
+    return figure_to_base64(figure)
+
+
+def company_chart_image(company_totals, selected_industry, colors):
+    """
+    Renders the stacked E/S/G bar chart of ``IndustryLeaders.py`` to a base64-encoded PNG.
+
+    Args:
+        company_totals (pd.DataFrame): Indexed by company with ``E``, ``S`` and ``G`` columns, best first.
+        selected_industry (str): The industry named in the title.
+        colors (dict): Bar colours for ``E``, ``S`` and ``G``.
+
+    Returns:
+        str: The PNG, base64-encoded.
+    """
+    figure = new_figure((10, len(company_totals) * 0.3 + 2))  # Adjust the figure size dynamically based on the number of companies
+    ax = figure.add_subplot()
+    bar_width = 0.6  # Adjust the bar width to make the bars more compact
+    companies = company_totals.index
+
+    bars_E = ax.barh(companies, company_totals['E'], color=colors['E'], edgecolor='black', label='Environmental', height=bar_width)
+    bars_S = ax.barh(companies, company_totals['S'], left=company_totals['E'], color=colors['S'], edgecolor='black', label='Social', height=bar_width)
+    bars_G = ax.barh(companies, company_totals['G'], left=company_totals['E'] + company_totals['S'], color=colors['G'], edgecolor='black', label='Governance', height=bar_width)
+
+    ax.set_title(f'Average ESG Indicators Disclosed by Firms ({selected_industry})', pad=20)
+    ax.set_xlabel('Average Number of Indicators Disclosed')
+    ax.set_ylabel('Firms')
+    ax.grid(axis='x', linestyle='--', alpha=0.5)
+    ax.invert_yaxis()
+    ax.legend()
+
+    for bars in [bars_E, bars_S, bars_G]:
+        for bar in bars:
+            width = bar.get_width()
+            label_x_pos = bar.get_x() + width / 2
+            ax.text(label_x_pos, bar.get_y() + bar.get_height()/2, f'{int(width)}', ha='center', va='center', color='black')
+
+    figure.subplots_adjust(top=0.9)
+    figure.tight_layout(rect=[0, 0, 1, 0.95])
+    return figure_to_base64(figure)
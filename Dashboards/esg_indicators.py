@@ -0,0 +1,50 @@
+import functools
+import os
+
+import pandas as pd
+
+# Indicator display names and E/S/G categories, in dashboard order
+indicator_aliases_path = 'esg_indicator_aliases.csv'
+
+category_labels = {'E': 'Environmental', 'S': 'Social', 'G': 'Governance'}
+
+
+class IndicatorRegistry:
+    """
+    The ESG indicators every dashboard uses, read from ``esg_indicator_aliases.csv``.
+
+    Each row of the alias file is one indicator: its display name (``indicator``),
+    its database column (``Alias``, lower-cased here) and its category (``E``, ``S``
+    or ``G``). The dashboards take their indicator lists from here instead of
+    keeping their own, so they all agree on which indicators belong to a category.
+
+    Args:
+        aliases (pd.DataFrame): The alias file.
+    """
+
+    def __init__(self, aliases):
+        self.columns = aliases['Alias'].str.lower().tolist()
+        self.names = dict(zip(self.columns, aliases['indicator']))
+        self.categories = dict(zip(self.columns, aliases['category']))
+
+    def by_category(self, category, available=None):
+        """
+        Returns the indicator columns of ``category`` in file order, only those in ``available`` (e.g. ``df.columns``) if given.
+        """
+        return [column for column in self.columns
+                if self.categories[column] == category and (available is None or column in available)]
+
+    def label(self, column, with_category=False):
+        # display name for legends, e.g. "Scope 1 (E)"
+        name = self.names.get(column.lower(), column)
+        if with_category and column in self.categories:
+            return f"{name} ({self.categories[column]})"
+        return name
+
+
+@functools.lru_cache(maxsize=None)
+def load_indicator_registry(directory=None):
+    """
+    Reads the alias file from ``directory`` (the working directory by default), once per process.
+    """
+    return IndicatorRegistry(pd.read_csv(os.path.join(directory or '', indicator_aliases_path)))
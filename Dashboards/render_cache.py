@@ -0,0 +1,116 @@
+import functools
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+
+class RenderCache:
+    """
+    Size-bounded LRU cache for rendered figures (base64-encoded PNGs).
+
+    The dashboards render from a small set of dropdown choices, so a figure is keyed
+    by those choices plus the dataset version and rendered only once. The cache
+    evicts the least recently used images when it holds more than ``max_bytes``.
+    With a ``spill_directory`` the evicted images are written to disk and read back
+    on the next request instead of being rendered again, also across restarts.
+
+    Args:
+        max_bytes (int): Upper bound on the size of the images kept in memory.
+        spill_directory (str): Optional directory for evicted images.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, spill_directory=None):
+        self.max_bytes = max_bytes
+        self.spill_directory = spill_directory
+        if spill_directory:
+            os.makedirs(spill_directory, exist_ok=True)
+        self.images = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def spill_path(self, key):
+        return os.path.join(self.spill_directory, hashlib.sha256(repr(key).encode('utf-8')).hexdigest() + '.b64')
+
+    def get_or_render(self, key, render):
+        """
+        Returns the cached image for ``key``, calling ``render()`` only when it is in neither memory nor the spill directory.
+        """
+        with self.lock:
+            image = self.images.get(key)
+            if image is not None:
+                self.images.move_to_end(key)
+                self.hits += 1
+                return image
+
+        if self.spill_directory and os.path.exists(self.spill_path(key)):
+            with open(self.spill_path(key)) as file:
+                image = file.read()
+            with self.lock:
+                self.disk_hits += 1
+        else:
+            image = render()
+            with self.lock:
+                self.misses += 1
+        self.put(key, image)
+        return image
+
+    def put(self, key, image):
+        evicted = []
+        with self.lock:
+            if key in self.images:
+                self.size -= len(self.images.pop(key))
+            if len(image) <= self.max_bytes:
+                self.images[key] = image
+                self.size += len(image)
+            else:
+                evicted.append((key, image))
+            while self.size > self.max_bytes:
+                old_key, old_image = self.images.popitem(last=False)
+                self.size -= len(old_image)
+                evicted.append((old_key, old_image))
+        if self.spill_directory:
+            for old_key, old_image in evicted:
+                path = self.spill_path(old_key)
+                if not os.path.exists(path):
+                    temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                    with open(temporary_path, 'w') as file:
+                        file.write(old_image)
+                    os.replace(temporary_path, path)
+
+    def warm(self, jobs):
+        """
+        Renders ``(key, render)`` pairs ahead of the first request, e.g. every dropdown combination.
+        """
+        for key, render in jobs:
+            self.get_or_render(key, render)
+
+    def stats(self):
+        with self.lock:
+            return {"images": len(self.images), "bytes": self.size, "hits": self.hits,
+                    "disk_hits": self.disk_hits, "misses": self.misses}
+
+
+# render every dropdown combination when a dashboard starts
+warm_on_start = os.environ.get('ESG_WARM_RENDER_CACHE', '') not in ('', '0')
+
+
+def render_cache_from_environment():
+    """
+    Builds the dashboards' cache from ``ESG_RENDER_CACHE_MB`` (default 64) and ``ESG_RENDER_CACHE_DIR`` (no spill when unset).
+    """
+    max_bytes = int(float(os.environ.get('ESG_RENDER_CACHE_MB', 64)) * 1024 * 1024)
+    return RenderCache(max_bytes, os.environ.get('ESG_RENDER_CACHE_DIR') or None)
+
+
+@functools.lru_cache(maxsize=None)
+def shared_render_cache():
+    """
+    The render cache of this process, shared by every dashboard page so ``ESG_RENDER_CACHE_MB`` bounds them together.
+
+    Pages keep their keys apart with a figure name as the first element (e.g. ``'heatmap'``).
+    """
+    return render_cache_from_environment()
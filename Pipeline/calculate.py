@@ -0,0 +1,176 @@
+import argparse
+import os
+
+import pandas as pd
+
+key_columns = ['company_id', 'Company', 'Published Year']
+
+
+def load_lookups(lookup_file_path, company_id_lookup_file_path):
+    """
+    Reads the indicator alias and company alias files.
+
+    Returns:
+        tuple: ``(lookup_dict, company_id_lookup_dict)`` mapping lower-case indicator
+        names to aliases and lower-case company aliases to company IDs.
+    """
+    lookup_df = pd.read_csv(lookup_file_path)
+    company_id_lookup_df = pd.read_csv(company_id_lookup_file_path, encoding='ISO-8859-1')
+
+    lookup_df.columns = lookup_df.columns.str.strip()
+    company_id_lookup_df.columns = company_id_lookup_df.columns.str.strip()
+
+    lookup_df.rename(columns={'indicator': 'Indicator'}, inplace=True)
+    company_id_lookup_df.rename(columns={'company_alias': 'Company'}, inplace=True)
+
+    # Create lookup dictionaries
+    lookup_dict = pd.Series(lookup_df['Alias'].values, index=lookup_df['Indicator'].str.lower()).to_dict()
+    company_id_lookup_dict = pd.Series(company_id_lookup_df['company_id'].values, index=company_id_lookup_df['Company'].str.lower()).to_dict()
+    return lookup_dict, company_id_lookup_dict
+
+
+#  company IDs with partial matching
+def match_company_id(company_name, lookup_dict):
+    for alias, company_id in lookup_dict.items():
+        if alias in company_name.lower():
+            return company_id
+    return None
+
+
+class CompanyAliasIndex:
+    """
+    Substring index over the company aliases with the same result as ``match_company_id``.
+
+    ``match_company_id`` scans every alias for every row. The index keys the aliases
+    by their text and only looks up the substrings of a name that have one of the
+    alias lengths, keeping the alias that comes first in the lookup file when
+    several are contained in the name.
+
+    Args:
+        lookup_dict (dict): Lower-case company aliases to company IDs, in file order.
+    """
+
+    def __init__(self, lookup_dict):
+        self.aliases = {alias: (priority, company_id)
+                        for priority, (alias, company_id) in enumerate(lookup_dict.items())
+                        if isinstance(alias, str)}
+        self.lengths = sorted({len(alias) for alias in self.aliases})
+
+    def match(self, company_name):
+        name = company_name.lower()
+        best = None
+        for length in self.lengths:
+            for start in range(len(name) - length + 1):
+                hit = self.aliases.get(name[start:start + length])
+                if hit is not None and (best is None or hit[0] < best[0]):
+                    best = hit
+        return best[1] if best is not None else None
+
+    def resolve(self, companies):
+        """
+        Maps a Series of company names to company IDs, matching each distinct name once.
+        """
+        names = companies.str.lower()
+        matches = {name: self.match(name) for name in names.dropna().unique()}
+        return names.map(matches)
+
+
+def read_merged_csv(file_path):
+    df = pd.read_csv(file_path)
+
+    df.columns = df.columns.str.strip()
+
+    df.rename(columns={'published_year': 'Published Year'}, inplace=True)
+    return df
+
+
+def count_files(file_paths, lookup_dict, company_id_lookup_dict):
+    """
+    Counts the quantitative sentences and the sentences per indicator of several merged company CSVs.
+
+    All files are read and concatenated once and counted with one groupby per table.
+    The rows keep the per-file order of the notebook loop, and an indicator a file
+    never mentions stays empty for that file's rows, as the notebook's concatenation
+    of per-file pivot tables left it.
+
+    Args:
+        file_paths (list): The merged company CSVs, in output order.
+        lookup_dict (dict): Lower-case indicator names to aliases.
+        company_id_lookup_dict (dict): Lower-case company aliases to company IDs.
+
+    Returns:
+        tuple: ``(quantitative_counts, indicator_counts)`` DataFrames.
+    """
+    if not file_paths:
+        return pd.DataFrame(), pd.DataFrame()
+    frames = [read_merged_csv(file_path) for file_path in file_paths]
+    df = pd.concat(frames, keys=range(len(frames)), names=['file', None]).reset_index(level='file')
+
+    df['company_id'] = CompanyAliasIndex(company_id_lookup_dict).resolve(df['Company'])
+
+    df['Indicator'] = df['Indicator'].str.lower().map(lookup_dict)
+
+    df.dropna(subset=['company_id', 'Indicator'], inplace=True)
+
+    group_columns = ['file'] + key_columns
+
+    df['quantitative_sentences'] = (df['Value'].notna() & df['Units'].notna()).astype(int)
+
+    quantitative_counts = df.groupby(group_columns)['quantitative_sentences'].sum().reset_index()
+
+    indicator_counts = df.groupby(group_columns + ['Indicator']).size().reset_index(name='Count')
+
+    pivot_table = indicator_counts.pivot_table(index=group_columns, columns='Indicator', values='Count', fill_value=0)
+
+    # columns in order of first appearance, each file's own columns sorted as its pivot table was
+    indicators_per_file = indicator_counts.groupby('file')['Indicator'].unique()
+    indicator_columns = list(dict.fromkeys(
+        indicator for indicators in indicators_per_file for indicator in sorted(indicators)))
+    row_files = pivot_table.index.get_level_values('file')
+    for indicator in indicator_columns:
+        mentioned = row_files.isin(indicator_counts.loc[indicator_counts['Indicator'] == indicator, 'file'])
+        if not mentioned.all():
+            pivot_table[indicator] = pivot_table[indicator].where(mentioned)
+
+    pivot_table = pivot_table.reset_index()[key_columns + indicator_columns]
+    pivot_table.columns.name = None
+
+    return quantitative_counts.drop(columns='file'), pivot_table
+
+
+def count_file(file_path, lookup_dict, company_id_lookup_dict):
+    """
+    Counts the quantitative sentences and the sentences per indicator of one merged company CSV.
+
+    Returns:
+        tuple: ``(quantitative_counts, pivot_table)`` DataFrames.
+    """
+    return count_files([file_path], lookup_dict, company_id_lookup_dict)
+
+
+def calculate(input_folder_path, lookup_file_path, company_id_lookup_file_path, quantitative_output_file_path, indicator_output_file_path):
+    lookup_dict, company_id_lookup_dict = load_lookups(lookup_file_path, company_id_lookup_file_path)
+
+    file_paths = [os.path.join(input_folder_path, filename)
+                  for filename in os.listdir(input_folder_path) if filename.endswith('.csv')]
+
+    all_quantitative_counts, all_indicator_counts = count_files(file_paths, lookup_dict, company_id_lookup_dict)
+
+    all_quantitative_counts.to_csv(quantitative_output_file_path, index=False)
+    all_indicator_counts.to_csv(indicator_output_file_path, index=False)
+
+    print("The indicator counts have been saved to:", indicator_output_file_path)
+    print("The quantitative sentence counts have been saved to:", quantitative_output_file_path)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Count indicator and quantitative sentences per company and year.")
+    parser.add_argument('input_folder_path', help="folder with the merged company CSVs")
+    parser.add_argument('lookup_file_path', help="esg_indicator_aliases.csv")
+    parser.add_argument('company_id_lookup_file_path', help="company_id_alias.csv")
+    parser.add_argument('quantitative_output_file_path')
+    parser.add_argument('indicator_output_file_path')
+    args = parser.parse_args()
+
+    calculate(args.input_folder_path, args.lookup_file_path, args.company_id_lookup_file_path,
+              args.quantitative_output_file_path, args.indicator_output_file_path)
@@ -0,0 +1,334 @@
+import argparse
+import itertools
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from instrumentation import peak_memory_mb
+
+
+def clean_company_name(name):
+    name = name.replace('_ESG_EN', '').replace('_IR_EN', '')
+    name = name.replace('_', ' ')
+    return name
+
+
+def add_qualitative_sum(indicator_file_path, output_file_path):
+    """
+    Adds the ``qualitative_sentences`` total over all indicator columns (06helper).
+    """
+    df = pd.read_csv(indicator_file_path)
+
+    columns_to_sum = df.columns[df.columns.get_loc('Published Year') + 1:]
+
+    df['qualitative_sentences'] = df[columns_to_sum].sum(axis=1, numeric_only=True)
+
+    df.to_csv(output_file_path, index=False)
+
+    print(f"Updated file saved to {output_file_path}")
+
+
+def rename_columns(df):
+    df.columns = [col.lower() for col in df.columns]  # Convert all column names to lowercase
+    if 'published year' in df.columns:
+        df = df.rename(columns={'published year': 'year'})
+    return df
+
+
+def database_schema(df):
+    """
+    Declares the Parquet schema of ``database.csv``.
+
+    Years are int16, company IDs int32, text columns (company, industry, company
+    name) are dictionary-encoded so they load as categoricals, and all indicator
+    counts, sentence totals and scores are float32. Missing counts stay missing.
+    """
+    fields = []
+    for column in df.columns:
+        if column == 'year':
+            field_type = pa.int16()
+        elif column == 'company_id':
+            field_type = pa.int32()
+        elif pd.api.types.is_numeric_dtype(df[column]):
+            field_type = pa.float32()
+        else:
+            field_type = pa.dictionary(pa.int32(), pa.string())
+        fields.append(pa.field(column, field_type))
+    return pa.schema(fields)
+
+
+def write_dataset(df, dataset_path, partition_by='year'):
+    """
+    Writes the database as a Parquet dataset with one directory per ``partition_by`` value.
+
+    The full schema and the partition column are also written to ``_common_metadata``
+    so readers get the declared type of the partition column and the column order back.
+
+    Args:
+        df (pd.DataFrame): The database, as written to ``database.csv``.
+        dataset_path (str): The dataset directory; it is replaced if it exists.
+        partition_by (str): ``year`` or ``industry``.
+    """
+    write_dataset_parts([df], dataset_path, partition_by)
+
+
+def write_dataset_parts(parts, dataset_path, partition_by='year'):
+    """
+    Like ``write_dataset`` for a database that arrives in parts, e.g. one per join partition.
+
+    The schema is declared from the first part; the parts are streamed into one file
+    per partition directory and need not fit in memory together.
+    """
+    parts = iter(parts)
+    first_part = next(parts)
+    schema = database_schema(first_part)
+
+    def batches():
+        for part in itertools.chain([first_part], parts):
+            yield from pa.Table.from_pandas(part, schema=schema, preserve_index=False).to_batches()
+
+    if os.path.exists(dataset_path):
+        shutil.rmtree(dataset_path)
+    ds.write_dataset(batches(), dataset_path, schema=schema, format='parquet',
+                     partitioning=ds.partitioning(pa.schema([schema.field(partition_by)]), flavor='hive'),
+                     basename_template='part-{i}.parquet')
+    pq.write_metadata(schema.with_metadata({'partition_by': partition_by}), os.path.join(dataset_path, '_common_metadata'))
+
+    print(f"Parquet dataset saved to {dataset_path}")
+
+
+# explicit join key; esg_report.csv has no company_id and joins on the rest of it
+key_columns = ['company_id', 'company', 'year']
+text_columns = ['company', 'industry', 'company_name']
+
+
+def column_dtype(column):
+    # fixed dtypes, so every chunk and partition reads and prints the same way; counts are
+    # pinned per input by input_dtypes
+    if column in ('company_id', 'year'):
+        return 'Int64'
+    if column in text_columns:
+        return str
+    return 'float64'
+
+
+def input_dtypes(path, columns, chunk_rows, **kwargs):
+    """
+    Fixes the dtype of every column of an input CSV from its first chunk.
+
+    Key and text columns get the dtype from ``column_dtype``. A count column is
+    ``Int64`` if it reads as integers in the first chunk and ``float64`` otherwise,
+    so integer counts print as ``12`` rather than ``12.0`` and every later chunk and
+    partition is read with the same dtype.
+
+    Args:
+        path (str): The CSV file.
+        columns (dict): Its columns to database names, as returned by ``input_columns``.
+        chunk_rows (int): Rows per chunk.
+        **kwargs: Passed on to ``pd.read_csv``.
+
+    Returns:
+        dict: Database column name to dtype.
+    """
+    fixed = {column: column_dtype(name) for column, name in columns.items() if column_dtype(name) != 'float64'}
+    first_chunk = pd.read_csv(path, nrows=chunk_rows, usecols=list(columns), dtype=fixed, **kwargs)
+    return {name: fixed.get(column, 'Int64' if pd.api.types.is_integer_dtype(first_chunk[column]) else 'float64')
+            for column, name in columns.items()}
+
+
+def spill_schema(dtypes):
+    """
+    Declares the Parquet schema of the spilled input chunks from the input's dtypes.
+
+    Every chunk file of an input gets the same schema, so a chunk whose text column
+    is empty is not written with the null type that the other chunks cannot be read with.
+
+    Args:
+        dtypes (dict): Database column name to dtype, as returned by ``input_dtypes``.
+    """
+    types = {'Int64': pa.int64(), 'float64': pa.float64(), str: pa.string()}
+    return pa.schema([pa.field(column, types[dtype]) for column, dtype in dtypes.items()])
+
+
+def write_spill(rows, path, schema):
+    """
+    Writes one spilled chunk of an input with the schema from ``spill_schema``.
+    """
+    pq.write_table(pa.Table.from_pandas(rows, schema=schema, preserve_index=False), path)
+
+
+def input_columns(path):
+    """
+    Maps the header of an input CSV to the database column names (lower case, ``year``).
+    """
+    columns = pd.read_csv(path, nrows=0).columns
+    return dict(zip(columns, rename_columns(pd.DataFrame(columns=columns)).columns))
+
+
+def read_input(path, columns, chunk_rows, clean_names=False, dtypes=None, **kwargs):
+    """
+    Yields the chunks of one input CSV with database column names and dtypes.
+
+    Args:
+        path (str): The CSV file.
+        columns (dict): Its columns to database names, as returned by ``input_columns``.
+        chunk_rows (int): Rows per chunk.
+        clean_names (bool): Clean the company names of ``esg_report.csv`` (``Aixtron_ESG_EN`` to ``Aixtron``).
+        dtypes (dict): Database column name to dtype, e.g. from ``input_dtypes``. Defaults to ``column_dtype``.
+        **kwargs: Passed on to ``pd.read_csv``.
+    """
+    dtypes = {column: (dtypes or {}).get(name, column_dtype(name)) for column, name in columns.items()}
+    for chunk in pd.read_csv(path, dtype=dtypes, chunksize=chunk_rows, **kwargs):
+        chunk = chunk.rename(columns=columns)
+        if clean_names:
+            chunk['company'] = chunk['company'].map(clean_company_name)
+        yield chunk
+
+
+def company_boundaries(inputs, n_partitions, chunk_rows):
+    """
+    Splits the sorted company names of all inputs into ``n_partitions`` ranges of about the same number of companies.
+
+    Routing rows by company range instead of a hash keeps every company-year in one
+    partition and lets the partitions be written one after another in key order.
+    """
+    companies = set()
+    for path, columns, clean_names, _ in inputs:
+        company_column = next(column for column, name in columns.items() if name == 'company')
+        for chunk in read_input(path, {company_column: 'company'}, chunk_rows, clean_names, usecols=[company_column]):
+            companies.update(chunk['company'].dropna())
+    companies = sorted(companies)
+    n_partitions = max(1, min(n_partitions, len(companies)))
+    return np.array([companies[len(companies) * index // n_partitions] for index in range(1, n_partitions)], dtype=object)
+
+
+def merge_partition(indicator_counts_df, quantitative_counts_df, esg_report_df, lookup_df):
+    """
+    Joins one partition of the inputs on the key columns, adds the scores and attaches the company lookup.
+    """
+    merged_df = indicator_counts_df
+    for right_df in [quantitative_counts_df, esg_report_df]:
+        on = [column for column in key_columns if column in right_df.columns]
+        merged_df = merged_df.merge(right_df, on=on, how='outer', suffixes=('', '_duplicate'))
+
+    main_df = merged_df.loc[:, ~merged_df.columns.str.endswith('_duplicate')]
+    main_df = main_df.sort_values(['company', 'year'], kind='stable')
+
+    main_df['qualitative_score'] = main_df['qualitative_sentences'] / main_df['total sentences']
+    main_df['quantitative_score'] = main_df['quantitative_sentences'] / main_df['total sentences']
+
+    return main_df.merge(lookup_df, on='company_id', how='left')
+
+
+def build_database(indicator_counts_path, quantitative_counts_path, esg_report_path, lookup_file_path, output_file_path,
+                   dataset_path=None, partition_by='year', chunk_rows=100_000, partition_bytes=32 * 1024 * 1024):
+    """
+    Joins the indicator counts, quantitative counts, sentence totals and the company lookup into ``database.csv``.
+
+    The inputs are joined on ``(company_id, company, year)`` without holding them in
+    memory at once: they are read in chunks of ``chunk_rows`` and spilled into
+    partitions by company range (about ``partition_bytes`` of input each), then each
+    partition is joined, gets its industry and company name from the lookup and is
+    appended to ``database.csv`` and the Parquet dataset. Both are written once, in
+    ``(company, year)`` order.
+
+    Args:
+        indicator_counts_path (str): ``indicator_counts_with_sum.csv``.
+        quantitative_counts_path (str): ``quantitative_counts.csv``.
+        esg_report_path (str): ``esg_report.csv`` from the extraction stage.
+        lookup_file_path (str): ``company_id_alias.csv`` with ``industry`` and ``company_name``.
+        output_file_path (str): Where to write ``database.csv``.
+        dataset_path (str): Also write a partitioned Parquet dataset here (see ``write_dataset``).
+        partition_by (str): The dataset's partition column, ``year`` or ``industry``.
+        chunk_rows (int): Rows read from an input at a time.
+        partition_bytes (int): Input bytes per join partition; bounds the memory of the join.
+
+    Returns:
+        dict: ``rows``, ``partitions``, ``seconds``, ``rows_per_second`` and ``peak_memory_mb`` of the run.
+    """
+    start = time.perf_counter()
+    inputs = []
+    for path in [indicator_counts_path, quantitative_counts_path, esg_report_path]:
+        columns = input_columns(path)
+        inputs.append((path, columns, path == esg_report_path, input_dtypes(path, columns, chunk_rows)))
+    input_bytes = sum(os.path.getsize(path) for path, _, _, _ in inputs)
+    boundaries = company_boundaries(inputs, -(-input_bytes // partition_bytes), chunk_rows)
+    n_partitions = len(boundaries) + 1
+
+    lookup_columns = {'company_id': 'company_id', 'industry': 'industry', 'company_name': 'company_name'}
+    lookup_df = pd.concat(read_input(lookup_file_path, lookup_columns, chunk_rows, usecols=list(lookup_columns), encoding='latin1'))
+
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(output_file_path))) as spill_directory:
+        # spill every input into its partitions, one Parquet file per chunk and partition
+        for input_index, (path, columns, clean_names, dtypes) in enumerate(inputs):
+            schema = spill_schema(dtypes)
+            for chunk_index, chunk in enumerate(read_input(path, columns, chunk_rows, clean_names, dtypes)):
+                partitions = np.searchsorted(boundaries, chunk['company'].fillna('').to_numpy(dtype=object), side='right')
+                for partition, rows in chunk.groupby(partitions, sort=False):
+                    spill_path = os.path.join(spill_directory, f"{input_index}.{partition}")
+                    os.makedirs(spill_path, exist_ok=True)
+                    write_spill(rows, os.path.join(spill_path, f"{chunk_index}.parquet"), schema)
+
+        def database_parts():
+            for partition in range(n_partitions):
+                frames = []
+                for input_index, (_, _, _, dtypes) in enumerate(inputs):
+                    spill_path = os.path.join(spill_directory, f"{input_index}.{partition}")
+                    if os.path.isdir(spill_path):
+                        frames.append(pd.read_parquet(spill_path))
+                    else:
+                        frames.append(pd.DataFrame({name: pd.Series(dtype=dtype) for name, dtype in dtypes.items()}))
+                yield merge_partition(*frames, lookup_df)
+
+        rows = 0
+        with open(output_file_path, 'w', newline='') as file:
+            def written_parts():
+                nonlocal rows
+                for index, part in enumerate(database_parts()):
+                    part.to_csv(file, header=index == 0, index=False)
+                    rows += len(part)
+                    yield part
+
+            if dataset_path is None:
+                for _ in written_parts():
+                    pass
+            else:
+                write_dataset_parts(written_parts(), dataset_path, partition_by)
+
+    print(f"File saved successfully to {output_file_path}")
+
+    seconds = time.perf_counter() - start
+    stats = {'rows': rows, 'partitions': n_partitions, 'seconds': seconds,
+             'rows_per_second': rows / seconds if seconds else float('nan'), 'peak_memory_mb': peak_memory_mb()}
+    print(f"{rows} rows from {n_partitions} partition(s) in {seconds:.2f} s ({stats['rows_per_second']:,.0f} rows/s), "
+          f"peak memory {stats['peak_memory_mb']:.0f} MB")
+    return stats
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Build database.csv from the calculated counts.")
+    parser.add_argument('indicator_counts_path', help="indicator_counts.csv")
+    parser.add_argument('quantitative_counts_path', help="quantitative_counts.csv")
+    parser.add_argument('esg_report_path', help="esg_report.csv")
+    parser.add_argument('lookup_file_path', help="company_id_alias.csv")
+    parser.add_argument('output_file_path', help="database.csv")
+    parser.add_argument('--with-sum-path', default=None,
+                        help="where to write indicator_counts_with_sum.csv (default: next to indicator_counts.csv)")
+    parser.add_argument('--parquet-path', default=None, help="also write a partitioned Parquet dataset to this directory")
+    parser.add_argument('--partition-by', default='year', choices=['year', 'industry'])
+    parser.add_argument('--chunk-rows', type=int, default=100_000, help="rows read from an input at a time")
+    parser.add_argument('--partition-mb', type=float, default=32, help="input megabytes per join partition; memory use is roughly 10-20 times this")
+    args = parser.parse_args()
+
+    with_sum_path = args.with_sum_path or args.indicator_counts_path.replace('.csv', '_with_sum.csv')
+    add_qualitative_sum(args.indicator_counts_path, with_sum_path)
+    build_database(with_sum_path, args.quantitative_counts_path, args.esg_report_path,
+                   args.lookup_file_path, args.output_file_path, args.parquet_path, args.partition_by,
+                   args.chunk_rows, int(args.partition_mb * 1024 * 1024))
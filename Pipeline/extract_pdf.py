@@ -0,0 +1,460 @@
+import argparse
+import logging
+import os
+import re
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+import pdfplumber
+import tabula
+
+from text_matching import KeywordMatcher, StringRemover
+
+# logging
+logging.getLogger("org.apache.pdfbox").setLevel(logging.ERROR)
+
+#  keywords
+esg_keywords = [
+    "climate", "mitigation", "decarbonisation", "carbon", "ghg", "emission",
+    "energy", "fuels", "fossil", "nuclear", "renewable", "scope 1", "scope 2",
+    "scope 3", "pollution", "air", "water", "soil", "hazard", "concern", "recycle",
+    "marine", "waste", "wastage", "hazardous", "danger", "dangerous", "radioactive",
+    "human rights", "policy", "employee", "employees", "worker", "workers", "staff",
+    "workplace", "accident", "accidents", "eliminate", "discriminate", "discrimination",
+    "grievance", "grievances", "complaint", "complaints",
+    "mitigate", "workforce", "board members", "male", "female", "management",
+    "percent", "percentage", "number", "fatal", "fatalities", "death", "injury", "ill",
+    "illness", "health", "life", "fine", "penalty", "penalties", "fines", "customer",
+    "customers", "end users", "consumer", "consumers", "public", "society",
+    "whistleblowing", "whistleblower", "whistle", "animal", "welfare", "training",
+    "workshops", "business ethics", "business conduct", "disclosure", "corruption",
+    "bribery", "favor", "illegal", "violate", "violation", "law", "laws", "anti-corruption",
+    "anti-bribery", "anticorruption", "antibribery", "politics", "political", "finance",
+     "contribution", "contributions", "payment", "wages",
+    "salary", "esg", "environment", "social", "governance", "mental-health", "holiday",
+    "bonus"
+]
+
+#  pattern for matching ESG-related keywords
+keywords_pattern = re.compile(r'\b(?:' + '|'.join(re.escape(keyword) for keyword in esg_keywords) + r')\b', re.IGNORECASE)
+
+#  the same matches in one prefix-factored pass, with the IDs of the keywords found
+keyword_matcher = KeywordMatcher(esg_keywords)
+
+sentence_endings = re.compile(r'(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\?|\!)\s')
+
+filename_pattern = re.compile(r'^(.*?)_(\d{4})\.pdf$')
+
+manifest_columns = ["File", "Status", "Error", "Total Sentences", "ESG Sentences", "Pages", "Seconds"]
+
+def table_cell_remover(tables):
+    """
+    Compiles one remover for every string cell of the tabula tables.
+
+    Args:
+        tables (list): A list of DataFrames containing table content.
+
+    Returns:
+        StringRemover: The remover, with the cells in table order, or None if the
+        tables contain no string cells.
+    """
+    cells = [cell for table in tables for cell in table.to_numpy().ravel() if isinstance(cell, str) and cell]
+    return StringRemover(cells) if cells else None
+
+
+def remove_table_text(text, tables):
+    """
+    Remove text lines that match table content.
+
+    The result is that of the old cell-by-cell ``str.replace`` loop, but the loop
+    only runs over the cells found in the text (see ``StringRemover``).
+
+    Args:
+        text (str): The extracted text from the PDF.
+        tables (list): A list of DataFrames containing table content.
+
+    Returns:
+        str: The cleaned text with table content removed.
+    """
+    remover = table_cell_remover(tables)
+    if remover is None:
+        return text
+    return remover.remove(text)
+
+
+def read_tables(pdf_path):
+    """
+    Reads all tables of a PDF with a single tabula call.
+
+    Args:
+        pdf_path (str): The file path to the PDF.
+
+    Returns:
+        list: A list of DataFrames containing table content.
+    """
+    return tabula.read_pdf(pdf_path, pages='all', multiple_tables=True)
+
+
+def iter_pages(pdf_path, table_remover=None, counts=None):
+    """
+    Yields the text of each page with table content removed.
+
+    Pages are released as soon as their text has been taken, so pdfplumber does
+    not keep the layout of the whole report in memory.
+
+    Args:
+        pdf_path (str): The file path to the PDF.
+        table_remover (StringRemover): Remover from ``table_cell_remover``, or None.
+        counts (dict): Optional; its ``pages`` count is incremented for every page.
+
+    Yields:
+        str: One chunk per page, newlines replaced by spaces and ending in a space.
+    """
+    with pdfplumber.open(pdf_path) as pdf:
+        for page in pdf.pages:
+            page_text = page.extract_text()
+            if page_text:
+                chunk = page_text.replace('\n', ' ') + " "
+            else:
+                chunk = f"Page {page.page_number}: No text found. "
+            page.close()
+            if counts is not None:
+                counts["pages"] = counts.get("pages", 0) + 1
+            if table_remover is not None:
+                chunk = table_remover.remove(chunk)
+            yield chunk
+
+
+def iter_sentences(chunks):
+    """
+    Splits a stream of text chunks into stripped, non-empty sentences.
+
+    The unfinished sentence at the end of a chunk is carried over to the next one,
+    so the result is the same as splitting the concatenated text.
+
+    Args:
+        chunks (iterable): Text chunks in document order.
+
+    Yields:
+        str: The sentences in document order.
+    """
+    carry = ""
+    for chunk in chunks:
+        pieces = sentence_endings.split(carry + chunk)
+        carry = pieces.pop()
+        for piece in pieces:
+            sentence = piece.strip()
+            if sentence:
+                yield sentence
+    sentence = carry.strip()
+    if sentence:
+        yield sentence
+
+
+def iter_keyword_sentences(sentences, counts):
+    """
+    Yields the sentences containing an ESG keyword.
+
+    Sentences are kept exactly where ``keywords_pattern`` finds a match, but the
+    keyword matcher also tells which keywords occur, for the hit histogram.
+
+    Args:
+        sentences (iterable): All sentences of a report.
+        counts (dict): Updated in place with ``total_sentences``, ``esg_sentences``,
+            ``keyword_hits`` (occurrences per keyword ID) and ``keyword_sentences``
+            (sentences containing each keyword ID).
+
+    Yields:
+        str: The ESG keyword sentences in document order.
+    """
+    counts["total_sentences"] = 0
+    counts["esg_sentences"] = 0
+    counts["keyword_hits"] = keyword_hits = [0] * len(esg_keywords)
+    counts["keyword_sentences"] = keyword_sentences = [0] * len(esg_keywords)
+    for sentence in sentences:
+        counts["total_sentences"] += 1
+        keyword_ids = keyword_matcher.find(sentence)
+        if keyword_ids:
+            counts["esg_sentences"] += 1
+            for keyword_id in keyword_ids:
+                keyword_hits[keyword_id] += 1
+            for keyword_id in set(keyword_ids):
+                keyword_sentences[keyword_id] += 1
+            yield sentence
+
+
+def keyword_histogram_path(output_file_path):
+    """
+    The keyword histogram next to a report's text file: ``<Company>_<Year>.keywords.csv``.
+    """
+    return os.path.splitext(output_file_path)[0] + '.keywords.csv'
+
+
+def keyword_histogram(counts):
+    """
+    Builds the keyword hit histogram of one report.
+
+    Args:
+        counts (dict): Counts filled in by ``iter_keyword_sentences``.
+
+    Returns:
+        pd.DataFrame: One row per keyword with ``Keyword ID``, ``Keyword``, ``Hits``
+        (occurrences) and ``Sentences`` (ESG sentences containing the keyword).
+    """
+    return pd.DataFrame({
+        "Keyword ID": range(len(esg_keywords)),
+        "Keyword": esg_keywords,
+        "Hits": counts["keyword_hits"],
+        "Sentences": counts["keyword_sentences"],
+    })
+
+
+def extract_report(pdf_path):
+    """
+    Parses a PDF once and returns everything the later stages need from it.
+
+    Tabula and pdfplumber are each run a single time per file, and the sentence
+    count and the ESG keyword sentences are both taken from the same cleaned text.
+    Table cells are removed page by page.
+
+    Args:
+        pdf_path (str): The file path to the PDF.
+
+    Returns:
+        dict: ``sentences`` (list of ESG keyword sentences), ``total_sentences`` (int),
+        ``tables`` (list of DataFrames found by tabula) and ``keyword_histogram``
+        (DataFrame from ``keyword_histogram``).
+
+    Raises:
+        Exception: Whatever tabula or pdfplumber raise for an unreadable file.
+    """
+    tables = read_tables(pdf_path)
+    pages = iter_pages(pdf_path, table_cell_remover(tables))
+    counts = {}
+    keyword_sentences = list(iter_keyword_sentences(iter_sentences(pages), counts))
+
+    return {
+        "sentences": keyword_sentences,
+        "total_sentences": counts["total_sentences"],
+        "tables": tables,
+        "keyword_histogram": keyword_histogram(counts),
+    }
+
+
+def write_report(pdf_path, output_file_path):
+    """
+    Streams the ESG keyword sentences of a PDF into its text file.
+
+    Sentences are written while the pages are read, so memory use depends on the
+    page size rather than the report size. They go to a ``.part`` file first
+    because the total sentence count in the header is only known at the end.
+    The keyword hit histogram is written next to the text file
+    (``keyword_histogram_path``).
+
+    Args:
+        pdf_path (str): The file path to the PDF.
+        output_file_path (str): The path of the text file to write.
+
+    Returns:
+        dict: ``total_sentences``, ``esg_sentences`` and ``pages`` counts, and the
+        per-keyword ``keyword_hits`` and ``keyword_sentences``.
+    """
+    part_path = output_file_path + '.part'
+    counts = {"pages": 0}
+    try:
+        pages = iter_pages(pdf_path, table_cell_remover(read_tables(pdf_path)), counts)
+        with open(part_path, 'w') as part_file:
+            for sentence in iter_keyword_sentences(iter_sentences(pages), counts):
+                part_file.write(f"{sentence}\n")
+
+        with open(output_file_path, 'w') as output_file, open(part_path) as part_file:
+            output_file.write(f"Total sentences in the PDF after removing tables: {counts['total_sentences']}\n")
+            output_file.write("ESG-related sentences:\n")
+            shutil.copyfileobj(part_file, output_file)
+        keyword_histogram(counts).to_csv(keyword_histogram_path(output_file_path), index=False)
+    finally:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+    return counts
+
+
+def extract_text_from_pdf(pdf_path, report=None):
+    """
+    Extracts text from a PDF file, removes table-like structures, and returns sentences containing ESG-related keywords.
+
+    Callers that also need ``count_total_sentences`` can call ``extract_report``
+    once and pass its result to both, so the PDF is parsed a single time.
+
+    Args:
+        pdf_path (str): The file path to the PDF.
+        report (dict): A precomputed ``extract_report(pdf_path)``. Parsed here if not given.
+
+    Returns:
+        list: A list of sentences containing ESG-related keywords.
+    """
+    try:
+        if report is None:
+            report = extract_report(pdf_path)
+        return report["sentences"]
+    except Exception as e:
+        logging.error(f"An error occurred while processing {pdf_path}: {e}")
+        return []
+
+
+def count_total_sentences(pdf_path, report=None):
+    """
+    Counts the total number of sentences in the PDF after removing table content.
+
+    Args:
+        pdf_path (str): The file path to the PDF.
+        report (dict): A precomputed ``extract_report(pdf_path)``. Parsed here if not given.
+
+    Returns:
+        int: The total number of sentences in the PDF.
+    """
+    try:
+        if report is None:
+            report = extract_report(pdf_path)
+        return report["total_sentences"]
+    except Exception as e:
+        logging.error(f"An error occurred while processing {pdf_path}: {e}")
+        return 0
+
+
+def process_pdf(pdf_path, output_directory):
+    """
+    Extracts one PDF and writes its text file. Runs inside a pool worker.
+
+    Args:
+        pdf_path (str): The file path to the PDF.
+        output_directory (str): The directory to save the text file in.
+
+    Returns:
+        dict: One manifest row. ``Status`` is ``ok`` or ``failed``; failures carry
+        the exception text in ``Error`` instead of raising.
+    """
+    filename = os.path.basename(pdf_path)
+    start = time.perf_counter()
+    try:
+        output_file_path = os.path.join(output_directory, f"{os.path.splitext(filename)[0]}.txt")
+        counts = write_report(pdf_path, output_file_path)
+    except Exception as e:
+        logging.error(f"An error occurred while processing {pdf_path}: {e}")
+        return {
+            "File": filename,
+            "Status": "failed",
+            "Error": f"{type(e).__name__}: {e}",
+            "Total Sentences": None,
+            "ESG Sentences": None,
+            "Pages": None,
+            "Seconds": round(time.perf_counter() - start, 3),
+        }
+    return {
+        "File": filename,
+        "Status": "ok",
+        "Error": "",
+        "Total Sentences": counts["total_sentences"],
+        "ESG Sentences": counts["esg_sentences"],
+        "Pages": counts["pages"],
+        "Seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def process_pdfs(input_directory, output_directory, csv_file_path, workers=None, manifest_path=None):
+    """
+    Process all PDF files in the input directory, extracting ESG-related sentences and counting total sentences.
+    Save the results in a CSV file.
+
+    Files are spread over a process pool; each PDF is parsed once. Rows are appended
+    to the CSV as files finish, and every file (including failures) is recorded in
+    a manifest CSV.
+
+    Args:
+        input_directory (str): The directory containing PDF files to process.
+        output_directory (str): The directory to save the results.
+        csv_file_path (str): The file path to the CSV file for storing the results.
+        workers (int): Number of worker processes. ``None`` uses all CPUs, ``1`` runs in-process.
+        manifest_path (str): Where to write the manifest. Defaults to
+            ``extraction_manifest.csv`` in the output directory.
+
+    Returns:
+        pd.DataFrame: The manifest, one row per PDF in the input directory.
+    """
+    if not os.path.exists(output_directory):
+        os.makedirs(output_directory)
+    if manifest_path is None:
+        manifest_path = os.path.join(output_directory, 'extraction_manifest.csv')
+
+    # Prepare the CSV file
+    if not os.path.exists(csv_file_path):
+        df = pd.DataFrame(columns=["Company", "Year", "Total Sentences", "ESG Sentences"])
+        df.to_csv(csv_file_path, index=False)
+
+    jobs = {}
+    manifest_rows = []
+    for filename in sorted(os.listdir(input_directory)):
+        if filename.endswith('.pdf'):
+            # Extract firm name and year from filename
+            match = filename_pattern.match(filename)
+            if match:
+                jobs[filename] = (match.group(1), match.group(2))
+            else:
+                logging.warning(f"Filename {filename} does not match the expected pattern.")
+                manifest_rows.append({
+                    "File": filename,
+                    "Status": "skipped",
+                    "Error": "Filename does not match <Company>_<Year>.pdf",
+                    "Total Sentences": None,
+                    "ESG Sentences": None,
+                    "Pages": None,
+                    "Seconds": 0.0,
+                })
+
+    def record(row):
+        manifest_rows.append(row)
+        if row["Status"] == "ok":
+            company_name, year = jobs[row["File"]]
+            new_row = {
+                "Company": company_name,
+                "Year": year,
+                "Total Sentences": row["Total Sentences"],
+                "ESG Sentences": row["ESG Sentences"]
+            }
+            pd.DataFrame([new_row]).to_csv(csv_file_path, mode='a', header=False, index=False)
+        logging.info(f"Processed {row['File']} ({row['Status']})")
+
+    paths = [os.path.join(input_directory, filename) for filename in jobs]
+    if workers == 1:
+        for pdf_path in paths:
+            record(process_pdf(pdf_path, output_directory))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(process_pdf, pdf_path, output_directory) for pdf_path in paths]
+            for future in as_completed(futures):
+                record(future.result())
+
+    manifest = pd.DataFrame(manifest_rows, columns=manifest_columns).sort_values("File", ignore_index=True)
+    manifest = manifest.astype({"Total Sentences": "Int64", "ESG Sentences": "Int64", "Pages": "Int64"})
+    manifest.to_csv(manifest_path, index=False)
+
+    failed = manifest[manifest["Status"] != "ok"]
+    if not failed.empty:
+        logging.warning(f"{len(failed)} of {len(manifest)} PDFs were not extracted, see {manifest_path}")
+    return manifest
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Extract ESG sentences from a directory of PDF reports.")
+    parser.add_argument('input_directory')
+    parser.add_argument('output_directory')
+    parser.add_argument('csv_file_path')
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all CPUs)")
+    parser.add_argument('--manifest', default=None, help="manifest CSV path")
+    args = parser.parse_args()
+
+    process_pdfs(args.input_directory, args.output_directory, args.csv_file_path,
+                 workers=args.workers, manifest_path=args.manifest)
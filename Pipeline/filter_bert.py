@@ -0,0 +1,228 @@
+import argparse
+import os
+
+import numpy as np
+import torch
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+from score_cache import ScoreCache
+
+model_name = "nbroad/ESG-BERT"
+max_length = 512
+
+
+def load_model(name=model_name, revision=None, num_threads=None):
+    """
+    Loads the ESG-BERT tokenizer and classifier for CPU inference.
+
+    Args:
+        name (str): Hugging Face model id or local checkpoint directory.
+        revision (str): Optional model revision (branch, tag or commit).
+        num_threads (int): Intra-op threads for torch. ``None`` keeps the torch default.
+
+    Returns:
+        tuple: ``(tokenizer, model)`` with the model in eval mode.
+    """
+    if num_threads:
+        torch.set_num_threads(num_threads)
+    tokenizer = AutoTokenizer.from_pretrained(name, revision=revision)
+    model = AutoModelForSequenceClassification.from_pretrained(name, revision=revision)
+    model.eval()
+    return tokenizer, model
+
+
+def load_sentences(file_path):
+    with open(file_path, 'r') as file:
+        sentences = file.readlines()
+    return [sentence.strip() for sentence in sentences]
+
+
+def get_esg_score(sentence, tokenizer, model):
+    inputs = tokenizer(sentence, return_tensors="pt", truncation=True, padding=True, max_length=max_length)
+    with torch.no_grad():
+        outputs = model(**inputs)
+    logits = outputs.logits
+    probabilities = torch.nn.functional.softmax(logits, dim=-1)
+    return probabilities.numpy()
+
+
+def make_batches(lengths, batch_size=32, bucket_width=1):
+    """
+    Groups sentence indices into batches of similar token length.
+
+    Indices are sorted by length and cut into buckets of ``bucket_width`` tokens;
+    a batch never spans two buckets. With the default width of 1 every batch holds
+    sentences of exactly the same length, so no padding is needed at all.
+
+    Args:
+        lengths (list): Token length of each sentence.
+        batch_size (int): Maximum number of sentences per batch.
+        bucket_width (int): Width of a length bucket in tokens.
+
+    Yields:
+        list: Sentence indices of one batch.
+    """
+    batch = []
+    bucket = None
+    for index in sorted(range(len(lengths)), key=lengths.__getitem__):
+        index_bucket = lengths[index] // bucket_width
+        if batch and (index_bucket != bucket or len(batch) == batch_size):
+            yield batch
+            batch = []
+        bucket = index_bucket
+        batch.append(index)
+    if batch:
+        yield batch
+
+
+def score_batches(sentences, tokenizer, model, batch_size=32, bucket_width=1):
+    """
+    Computes the ESG-BERT class probabilities for many sentences in batches.
+
+    Sentences are tokenised once, bucketed by token length and run through the
+    model under ``torch.inference_mode``. If a batch fails, its sentences are
+    retried one by one; sentences that still fail get a row of NaN.
+
+    Args:
+        sentences (list): The sentences to score.
+        tokenizer: The tokenizer returned by ``load_model``.
+        model: The classifier returned by ``load_model``.
+        batch_size (int): Maximum number of sentences per forward pass.
+        bucket_width (int): Width of a length bucket in tokens, see ``make_batches``.
+
+    Returns:
+        np.ndarray: Probabilities of shape ``(len(sentences), num_labels)`` in input order.
+    """
+    probabilities = np.full((len(sentences), model.config.num_labels), np.nan, dtype=np.float32)
+    if not sentences:
+        return probabilities
+
+    encodings = tokenizer(sentences, truncation=True, max_length=max_length)
+    lengths = [len(input_ids) for input_ids in encodings["input_ids"]]
+
+    with torch.inference_mode():
+        for batch in make_batches(lengths, batch_size, bucket_width):
+            try:
+                features = [{key: encodings[key][index] for key in encodings.keys()} for index in batch]
+                inputs = tokenizer.pad(features, return_tensors="pt")
+                logits = model(**inputs).logits
+                probabilities[batch] = torch.nn.functional.softmax(logits, dim=-1).numpy()
+            except Exception:
+                for index in batch:
+                    try:
+                        probabilities[index] = get_esg_score(sentences[index], tokenizer, model)[0]
+                    except Exception as e:
+                        print(f"Error processing sentence: {sentences[index]}\nError: {e}")
+    return probabilities
+
+
+def score_sentences(sentences, tokenizer, model, batch_size=32, bucket_width=1, cache=None):
+    """
+    Returns the ESG-BERT class probabilities of sentences, scoring each distinct sentence once.
+
+    With a ``ScoreCache`` only sentences the cache has not seen reach the model,
+    and their scores are added to the cache.
+
+    Args:
+        sentences (list): The sentences to score.
+        tokenizer: The tokenizer returned by ``load_model``.
+        model: The classifier returned by ``load_model``.
+        batch_size (int): Maximum number of sentences per forward pass.
+        bucket_width (int): Width of a length bucket in tokens, see ``make_batches``.
+        cache (ScoreCache): Optional persistent score cache.
+
+    Returns:
+        np.ndarray: Probabilities of shape ``(len(sentences), num_labels)`` in input order.
+    """
+    probabilities = np.full((len(sentences), model.config.num_labels), np.nan, dtype=np.float32)
+    missing = range(len(sentences))
+    if cache is not None and sentences:
+        cached = cache.get_many(sentences)
+        for index, vector in cached.items():
+            probabilities[index] = vector
+        missing = [index for index in missing if index not in cached]
+
+    positions = {}
+    for index in missing:
+        positions.setdefault(sentences[index], []).append(index)
+    unique_sentences = list(positions)
+    scores = score_batches(unique_sentences, tokenizer, model, batch_size, bucket_width)
+    for sentence, vector in zip(unique_sentences, scores):
+        probabilities[positions[sentence]] = vector
+
+    if cache is not None and unique_sentences:
+        cache.put_many(unique_sentences, scores)
+    return probabilities
+
+
+def filter_sentences(sentences, tokenizer, model, threshold=0.80, batch_size=32, bucket_width=1, cache=None):
+    """
+    Keeps the sentences whose highest ESG-BERT class probability reaches the threshold.
+
+    Args:
+        sentences (list): The sentences to filter.
+        tokenizer: The tokenizer returned by ``load_model``.
+        model: The classifier returned by ``load_model``.
+        threshold (float): Minimum class probability for a sentence to be kept.
+        batch_size (int): Maximum number of sentences per forward pass.
+        bucket_width (int): Width of a length bucket in tokens, see ``make_batches``.
+        cache (ScoreCache): Optional persistent score cache. With a warm cache a
+            new threshold needs no model calls at all.
+
+    Returns:
+        list: The kept sentences in input order.
+    """
+    probabilities = score_sentences(sentences, tokenizer, model, batch_size, bucket_width, cache)
+    esg_scores = probabilities.max(axis=1)
+    return [sentence for sentence, esg_score in zip(sentences, esg_scores) if esg_score >= threshold]
+
+
+def process_directory(input_dir, output_dir, threshold=0.80, tokenizer=None, model=None, batch_size=32, bucket_width=1,
+                      cache=None):
+    if tokenizer is None or model is None:
+        tokenizer, model = load_model()
+
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    for filename in os.listdir(input_dir):
+        if filename.endswith(".txt"):
+            input_file_path = os.path.join(input_dir, filename)
+            output_file_path = os.path.join(output_dir, filename)
+
+            sentences = load_sentences(input_file_path)
+
+            filtered_sentences = filter_sentences(sentences, tokenizer, model, threshold, batch_size, bucket_width, cache)
+
+            with open(output_file_path, 'w') as file:
+                for sentence in filtered_sentences:
+                    file.write(sentence + '\n')
+
+            print(f"Filtered sentences saved to {output_file_path}")
+
+    if cache is not None:
+        stats = cache.stats()
+        print(f"Score cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.1%}), "
+              f"{stats['evictions']} evicted, {stats['entries']} entries")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Keep the sentences ESG-BERT classifies with high confidence.")
+    parser.add_argument('input_dir')
+    parser.add_argument('output_dir')
+    parser.add_argument('--threshold', type=float, default=0.80)
+    parser.add_argument('--model', default=model_name, help="model id or local checkpoint directory")
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--bucket-width', type=int, default=1, help="length bucket width in tokens")
+    parser.add_argument('--threads', type=int, default=None, help="torch intra-op threads")
+    parser.add_argument('--revision', default=None, help="model revision, also part of the cache key")
+    parser.add_argument('--cache', default=None, help="SQLite score cache file")
+    parser.add_argument('--cache-size', type=int, default=1_000_000, help="maximum cached sentences")
+    args = parser.parse_args()
+
+    tokenizer, model = load_model(args.model, revision=args.revision, num_threads=args.threads)
+    cache = ScoreCache(args.cache, args.model, args.revision, args.cache_size) if args.cache else None
+    process_directory(args.input_dir, args.output_dir, args.threshold, tokenizer, model,
+                      batch_size=args.batch_size, bucket_width=args.bucket_width, cache=cache)
+    if cache is not None:
+        cache.close()
@@ -0,0 +1,297 @@
+import argparse
+import collections
+import contextlib
+import cProfile
+import json
+import logging
+import os
+import platform
+import signal
+import sys
+import time
+
+# run report metrics compared by the CLI; True where a higher value is a regression
+compared_metrics = {
+    "wall_seconds": True,
+    "cpu_seconds": True,
+    "children_cpu_seconds": True,
+    "peak_rss_mb": True,
+    "in_per_second": False,
+    "out_per_second": False,
+}
+
+
+def peak_memory_mb():
+    """
+    Peak resident set size of this process in MB.
+
+    Reads ``VmHWM`` on Linux, since ``ru_maxrss`` also counts the parent's memory when
+    the process was started by fork and exec; elsewhere falls back to ``ru_maxrss``
+    (not available on Windows).
+    """
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return float('nan')
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def children_peak_memory_mb():
+    # largest peak RSS of any finished child process (pool workers), since the process started
+    try:
+        import resource
+    except ImportError:
+        return float('nan')
+    return resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def reset_peak_memory():
+    """
+    Resets the peak RSS of this process to its current RSS, so ``peak_memory_mb`` measures from here.
+
+    Returns:
+        bool: Whether the reset worked (Linux only, through ``/proc/self/clear_refs``).
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as clear_refs:
+            clear_refs.write('5')
+        return True
+    except OSError:
+        return False
+
+
+class StackSampler:
+    """
+    Samples the Python stack of the main thread on ``SIGPROF`` every ``interval`` seconds of CPU time.
+
+    Much cheaper than cProfile, so the timings in the report stay close to an
+    unprofiled run. ``dump`` writes the samples in the collapsed-stack format
+    (``file:function;file:function count``) that flame graph tools read.
+
+    Args:
+        interval (float): CPU seconds between samples.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.samples = collections.Counter()
+
+    def _sample(self, signum, frame):
+        stack = []
+        while frame is not None:
+            stack.append(f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_name}")
+            frame = frame.f_back
+        self.samples[';'.join(reversed(stack))] += 1
+
+    def enable(self):
+        self._previous = signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def disable(self):
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        signal.signal(signal.SIGPROF, self._previous)
+
+    def dump(self, path):
+        with open(path, 'w') as file:
+            for stack, count in self.samples.most_common():
+                file.write(f"{stack} {count}\n")
+
+
+class RunReport:
+    """
+    Measures pipeline stages and appends one JSON line per stage to a run report.
+
+    Each stage record holds wall time, CPU time of this process and of the worker
+    processes that finished during the stage, peak RSS, the items that went in and
+    came out (e.g. pages in, sentences out) and both as throughput per second. The
+    first line of a run records the command line and the machine. Reports from
+    several runs can share one file; ``compare_runs`` compares two of them.
+
+    Args:
+        path (str): The JSON-lines file to append to, or ``None`` to only log the records.
+        profile (str): ``cprofile`` or ``sample`` to dump a profile of every stage, or ``None``.
+        profile_dir (str): Where the profiles go (``<run>-<stage>.prof`` or ``.folded``).
+            Defaults to the report's directory.
+    """
+
+    def __init__(self, path=None, profile=None, profile_dir=None):
+        self.path = path
+        self.profile = profile
+        self.profile_dir = profile_dir or (os.path.dirname(os.path.abspath(path)) if path else os.getcwd())
+        self.run = time.strftime('%Y%m%dT%H%M%S') + f"-{os.getpid()}"
+        self.records = []
+        if profile == 'sample' and not hasattr(signal, 'setitimer'):
+            logging.warning("sampling needs signal.setitimer, which this platform lacks; stages are not profiled")
+            self.profile = None
+        if self.profile:
+            os.makedirs(self.profile_dir, exist_ok=True)
+        self._write({
+            "type": "run",
+            "run": self.run,
+            "started": time.strftime('%Y-%m-%dT%H:%M:%S'),
+            "argv": sys.argv,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        })
+
+    def _write(self, record):
+        if self.path is None:
+            return
+        with open(self.path, 'a') as file:
+            file.write(json.dumps(record) + '\n')
+
+    @contextlib.contextmanager
+    def stage(self, name, unit_in, unit_out):
+        """
+        Measures the code in the ``with`` block as stage ``name``.
+
+        Args:
+            name (str): The stage name.
+            unit_in (str): What the stage consumes, e.g. ``pages``.
+            unit_out (str): What the stage produces, e.g. ``sentences``.
+
+        Yields:
+            dict: ``in`` and ``out`` item counts for the block to fill in. Other keys
+            the block adds are copied into the record.
+        """
+        counts = {"in": 0, "out": 0}
+        peak_reset = reset_peak_memory()
+        profiler = None
+        if self.profile == 'cprofile':
+            profiler = cProfile.Profile()
+        elif self.profile == 'sample':
+            profiler = StackSampler()
+        start_times = os.times()
+        start = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield counts
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            wall_seconds = time.perf_counter() - start
+            end_times = os.times()
+            record = {
+                "type": "stage",
+                "run": self.run,
+                "stage": name,
+                "wall_seconds": wall_seconds,
+                "cpu_seconds": (end_times.user + end_times.system) - (start_times.user + start_times.system),
+                "children_cpu_seconds": ((end_times.children_user + end_times.children_system)
+                                         - (start_times.children_user + start_times.children_system)),
+                "peak_rss_mb": peak_memory_mb(),
+                # without a reset the peak is the process's since it started
+                "peak_rss_scope": "stage" if peak_reset else "process",
+                "children_peak_rss_mb": children_peak_memory_mb(),
+                "unit_in": unit_in,
+                "items_in": counts["in"],
+                "in_per_second": counts["in"] / wall_seconds if wall_seconds else None,
+                "unit_out": unit_out,
+                "items_out": counts["out"],
+                "out_per_second": counts["out"] / wall_seconds if wall_seconds else None,
+            }
+            # anything else the block stored, e.g. a result fingerprint
+            record.update({key: value for key, value in counts.items() if key not in ("in", "out")})
+            if profiler is not None:
+                extension = 'prof' if self.profile == 'cprofile' else 'folded'
+                record["profile"] = os.path.join(self.profile_dir, f"{self.run}-{name}.{extension}")
+                if self.profile == 'cprofile':
+                    profiler.dump_stats(record["profile"])
+                else:
+                    profiler.dump(record["profile"])
+            self.records.append(record)
+            self._write(record)
+            logging.info(f"[{name}] {wall_seconds:.2f} s wall, {record['cpu_seconds'] + record['children_cpu_seconds']:.2f} s CPU, "
+                         f"peak {record['peak_rss_mb']:.0f} MB, {counts['in']:g} {unit_in} in, {counts['out']:g} {unit_out} out")
+
+
+def load_runs(path):
+    """
+    Reads a run report.
+
+    Returns:
+        dict: Run id to ``{stage name: stage record}``, in the order the runs were written.
+    """
+    runs = {}
+    with open(path) as file:
+        for line in file:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            stages = runs.setdefault(record["run"], {})
+            if record["type"] == "stage":
+                stages[record["stage"]] = record
+    return runs
+
+
+def compare_runs(base, new, threshold=0.10, min_seconds=0.1):
+    """
+    Compares the stages two runs have in common.
+
+    Args:
+        base (dict): ``{stage name: stage record}`` of the baseline run.
+        new (dict): The same for the run to check.
+        threshold (float): Relative change that counts as a regression, e.g. 0.10 for 10 %.
+        min_seconds (float): Stages shorter than this in both runs are too noisy to judge.
+
+    Returns:
+        list: One dict per stage and metric with ``stage``, ``metric``, ``base``, ``new``,
+        ``change`` (relative, ``None`` if the baseline is 0) and ``regression``.
+    """
+    rows = []
+    for stage, base_record in base.items():
+        new_record = new.get(stage)
+        if new_record is None:
+            continue
+        judged = max(base_record["wall_seconds"], new_record["wall_seconds"]) >= min_seconds
+        for metric, higher_is_worse in compared_metrics.items():
+            base_value, new_value = base_record.get(metric), new_record.get(metric)
+            if base_value is None or new_value is None:
+                continue
+            change = (new_value - base_value) / base_value if base_value else None
+            regression = judged and change is not None and (change > threshold if higher_is_worse else change < -threshold)
+            rows.append({"stage": stage, "metric": metric, "base": base_value, "new": new_value,
+                         "change": change, "regression": regression})
+    return rows
+
+
+def pick_run(runs, run_id, path):
+    if not runs:
+        raise ValueError(f"{path} holds no runs")
+    if run_id is None:
+        return list(runs.values())[-1]
+    if run_id not in runs:
+        raise ValueError(f"{path} has no run {run_id}, only {', '.join(runs)}")
+    return runs[run_id]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare two pipeline run reports stage by stage; exits with 1 on a regression.")
+    parser.add_argument('base_report', help="JSON-lines report of the baseline run")
+    parser.add_argument('new_report', help="JSON-lines report of the run to check")
+    parser.add_argument('--base-run', default=None, help="run id in the base report (default: the last run)")
+    parser.add_argument('--new-run', default=None, help="run id in the new report (default: the last run)")
+    parser.add_argument('--threshold', type=float, default=0.10, help="relative change that counts as a regression")
+    parser.add_argument('--min-seconds', type=float, default=0.1, help="ignore stages shorter than this in both runs")
+    args = parser.parse_args()
+
+    base = pick_run(load_runs(args.base_report), args.base_run, args.base_report)
+    new = pick_run(load_runs(args.new_report), args.new_run, args.new_report)
+    rows = compare_runs(base, new, args.threshold, args.min_seconds)
+    print(f"{'stage':12s} {'metric':15s} {'base':>12s} {'new':>12s} {'change':>8s}")
+    for row in rows:
+        change = f"{row['change']:+.1%}" if row['change'] is not None else "n/a"
+        flag = "  REGRESSION" if row['regression'] else ""
+        print(f"{row['stage']:12s} {row['metric']:15s} {row['base']:12.3f} {row['new']:12.3f} {change:>8s}{flag}")
+    regressions = sum(row['regression'] for row in rows)
+    print(f"{regressions} regression(s) above {args.threshold:.0%}")
+    sys.exit(1 if regressions else 0)
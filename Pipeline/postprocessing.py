@@ -0,0 +1,139 @@
+import argparse
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from glob import glob
+
+import pandas as pd
+
+filename_pattern = re.compile(r'(.*?)_(IR|ESG)_EN_(\d{4})\.csv')
+
+
+def expand_rows(df, year_col, default_year=None):
+    """
+    Returns one row per year listed in ``year_col`` (e.g. ``"2020, 2021"``), with the years as ints.
+
+    Tokens that are not a four-digit year are dropped. A row without any valid year
+    gets ``default_year``, or is dropped if that is ``None``.
+
+    Args:
+        df (pd.DataFrame): The LLM output rows.
+        year_col (str): The comma-separated year column; it moves to the last column.
+        default_year (int): The year for rows without a valid year.
+
+    Returns:
+        pd.DataFrame: The expanded rows, in the original row order.
+    """
+    years = df[year_col].astype(str).str.split(',').explode().str.strip()
+    years = pd.to_numeric(years, errors='coerce')
+    years = years.where((years % 1 == 0) & years.between(1000, 9999))
+
+    # rows without a valid year keep their first token, which gets the default year
+    has_year = years.notna().groupby(level=0).transform('any')
+    years = years[years.notna() | (~has_year & ~years.index.duplicated())].fillna(default_year).dropna()
+
+    df = df.drop(columns=year_col).loc[years.index]
+    df[year_col] = years.astype(int).to_numpy()
+    return df
+
+
+def parse_filename(file_path):
+    """
+    Returns ``(company_name, year)`` for an LLM output CSV, or ``(None, None)``
+    if the name does not follow ``<Company>_(IR|ESG)_EN_<year>.csv``.
+    """
+    match = filename_pattern.match(os.path.basename(file_path))
+    if match:
+        return match.group(1), int(match.group(3))
+    return None, None
+
+
+def read_llm_csv(file_path):
+    """
+    Reads one LLM output CSV and adds the company, the published year and one row per reported year.
+
+    Args:
+        file_path (str): A ``<Company>_(IR|ESG)_EN_<year>.csv`` file.
+
+    Returns:
+        pd.DataFrame: The expanded rows.
+    """
+    company_name, year_from_filename = parse_filename(file_path)
+
+    df = pd.read_csv(file_path)
+
+    df['Company'] = company_name
+
+    df['published_year'] = year_from_filename
+
+    # missing or unreadable years fall back to the year in the filename
+    df = expand_rows(df, 'Year', year_from_filename)
+    return df
+
+
+def group_files_by_company(csv_files):
+    """
+    Returns a dict mapping each company name to its CSV files, skipping files with unexpected names.
+    """
+    company_files = {}
+    for file_path in csv_files:
+        company_name, _ = parse_filename(file_path)
+        if company_name is None:
+            print(f"Filename doesn't match the expected pattern: {os.path.basename(file_path)}")
+            continue
+        company_files.setdefault(company_name, []).append(file_path)
+    return company_files
+
+
+def merge_company(file_paths, output_file_path):
+    """
+    Merges the LLM output CSVs of one company into a single CSV and returns its number of rows.
+    """
+    merged_df = pd.concat([read_llm_csv(file_path) for file_path in file_paths], ignore_index=True)
+    merged_df.to_csv(output_file_path, index=False)
+    print(f"Merged CSV file saved successfully: {output_file_path}")
+    return len(merged_df)
+
+
+def merge_companies(jobs, workers=None):
+    """
+    Runs ``merge_company`` for every company, one company per task.
+
+    Each worker reads one company's files and writes its CSV as soon as they are
+    read, so only the companies in progress are held in memory.
+
+    Args:
+        jobs (list): ``(file_paths, output_file_path)`` per company.
+        workers (int): Worker processes. ``None`` uses all CPUs, ``1`` runs in-process.
+
+    Yields:
+        tuple: ``(file_paths, output_file_path, rows)`` once a company's CSV is written, in job order.
+    """
+    if workers == 1:
+        for file_paths, output_file_path in jobs:
+            yield file_paths, output_file_path, merge_company(file_paths, output_file_path)
+    elif jobs:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            rows = executor.map(merge_company, *zip(*jobs), chunksize=max(1, len(jobs) // 256))
+            for (file_paths, output_file_path), company_rows in zip(jobs, rows):
+                yield file_paths, output_file_path, company_rows
+
+
+def process_folder(input_folder_path, output_folder_path, workers=None):
+    csv_files = glob(os.path.join(input_folder_path, '*.csv'))
+    os.makedirs(output_folder_path, exist_ok=True)
+
+    jobs = [(file_paths, os.path.join(output_folder_path, f'{company_name}.csv'))
+            for company_name, file_paths in group_files_by_company(csv_files).items()]
+    for _ in merge_companies(jobs, workers):
+        pass
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Merge the LLM output CSVs into one CSV per company.")
+    parser.add_argument('input_folder_path')
+    parser.add_argument('output_folder_path')
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all CPUs)")
+    args = parser.parse_args()
+
+    process_folder(args.input_folder_path, args.output_folder_path, args.workers)
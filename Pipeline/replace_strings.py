@@ -0,0 +1,262 @@
+import argparse
+import os
+import re
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+year_patterns = {
+    "this": r'\bthis year\b',
+    "next": r'\bnext year\b',
+    "last": r'\blast year\b|\bprevious year\b',
+}
+suffix_pattern = r'\b(AG|AG’s|GmbH)\b'
+
+# literal text the patterns above can match, used to detect overlaps with a company name;
+# "AG’s" is left out because the "AG" branch always matches first
+replaced_phrases = ["this year", "next year", "last year", "previous year", "ag", "gmbh"]
+
+word_character = re.compile(r'\w')
+
+
+def can_overlap(company_name):
+    """
+    Tells whether a company name could overlap a year phrase or corporate suffix.
+
+    The single-pass normaliser matches all patterns against the original line. That
+    only equals the old one-substitution-after-another result when a phrase can never
+    start inside a company name or a company name inside a phrase, and when the
+    name starts and ends with a word character like ``Company`` does, so ``\\b``
+    boundaries around it are unchanged by the replacement.
+    """
+    name = company_name.lower()
+    if not (word_character.match(name[:1]) and word_character.match(name[-1:])):
+        return True
+    for phrase in replaced_phrases:
+        for start in range(1, len(phrase)):
+            tail = phrase[start:]
+            # a name inside the phrase, or a name running past the phrase end at a word boundary
+            if tail.startswith(name):
+                return True
+            if name.startswith(tail) and not word_character.match(name[len(tail)]):
+                return True
+    return False
+
+
+class TextNormaliser:
+    """
+    Replaces the company name, relative year references and corporate suffixes of one report.
+
+    All substitutions of ``replace_text`` are compiled into one pattern per
+    (company, year) and applied in a single pass with a replacement dispatch on the
+    matched group. Company names that could overlap one of the other patterns (see
+    ``can_overlap``) fall back to the precompiled substitutions in their original
+    order, so the output is always the same as before.
+
+    Args:
+        company_name (str): The company name to replace with ``Company``.
+        year (int): The report year that ``this/next/last year`` refer to.
+    """
+
+    def __init__(self, company_name, year):
+        self.company_name = company_name
+        self.year = year
+        self.replacements = {
+            "company": 'Company',
+            "this": str(year),
+            "next": str(year + 1),
+            "last": str(year - 1),
+            "suffix": '',
+        }
+        self.single_pass = not can_overlap(company_name)
+        # the lookahead on the possible first letters lets the scan skip most positions
+        # without trying every alternative, which is what makes one pass beat five
+        first_letters = sorted({phrase[0] for phrase in replaced_phrases} | {company_name[:1]})
+        self.pattern = re.compile(
+            f"(?=[{''.join(re.escape(letter) for letter in first_letters)}])"
+            f"(?:(?P<company>{re.escape(company_name)})"
+            + "".join(f"|(?P<{name}>{pattern})" for name, pattern in year_patterns.items())
+            + f"|(?P<suffix>{suffix_pattern.replace('(', '(?:')}))",
+            flags=re.IGNORECASE,
+        )
+        self.steps = [(re.compile(re.escape(company_name), flags=re.IGNORECASE), 'Company')]
+        self.steps += [(re.compile(pattern, flags=re.IGNORECASE), self.replacements[name])
+                       for name, pattern in year_patterns.items()]
+        self.steps.append((re.compile(suffix_pattern, flags=re.IGNORECASE), ''))
+        self.previous_year = re.compile(r'\bprevious year\b', flags=re.IGNORECASE)
+        self.next_year = self.steps[2][0]
+        self.last_year = self.steps[3][0]
+
+    def dispatch(self, match):
+        return self.replacements[match.lastgroup]
+
+    def normalise(self, text):
+        """
+        Applies all substitutions to a line or to a block of whole lines (no pattern spans a newline).
+        """
+        if self.single_pass:
+            return self.pattern.sub(self.dispatch, text)
+        for pattern, replacement in self.steps:
+            text = pattern.sub(replacement, text)
+        return text
+
+    def report_line(self, line, file_path):
+        # the notebook printed every line with a relative year reference
+        updated_line = self.steps[0][0].sub('Company', line)
+        if self.previous_year.search(updated_line):
+            print(f'Found "previous year" in {file_path}: {line.strip()}')
+        if self.next_year.search(updated_line):
+            print(f'Found "next year" in {file_path}: {line.strip()}')
+        if self.last_year.search(updated_line):
+            print(f'Found "last year or previous year" in {file_path}: {line.strip()}')
+
+    def normalise_file(self, file_path, output_file_path, verbose=False, block_size=1 << 16):
+        """
+        Streams a text file through the normaliser into ``output_file_path``.
+
+        Args:
+            file_path (str): The text file to clean.
+            output_file_path (str): Where to write the result; must differ from ``file_path``.
+            verbose (bool): Print the lines with relative year references, as the notebook did.
+            block_size (int): Approximate number of characters read per block of lines.
+        """
+        with open(file_path, 'r') as file, open(output_file_path, 'w') as output_file:
+            for lines in iter(lambda: file.readlines(block_size), []):
+                if verbose:
+                    for line in lines:
+                        self.report_line(line, file_path)
+                output_file.write(self.normalise(''.join(lines)))
+
+
+@lru_cache(maxsize=1024)
+def get_normaliser(company_name, year):
+    return TextNormaliser(company_name, year)
+
+
+def replace_text(file_path, company_name, year, output_file_path=None):
+    """
+    Replaces the company name and relative year references in a text file.
+
+    Args:
+        file_path (str): The text file to clean.
+        company_name (str): The company name to replace with ``Company``.
+        year (int): The report year that ``this/next/last year`` refer to.
+        output_file_path (str): Where to write the result. ``None`` rewrites the file in place.
+    """
+    normaliser = get_normaliser(company_name, year)
+    if output_file_path is None or os.path.abspath(output_file_path) == os.path.abspath(file_path):
+        output_file_path = file_path
+        temporary_path = file_path + '.tmp'
+        normaliser.normalise_file(file_path, temporary_path, verbose=True)
+        os.replace(temporary_path, file_path)
+    else:
+        normaliser.normalise_file(file_path, output_file_path, verbose=True)
+    print(f'Updated {output_file_path} with company name and year references.')
+
+
+def remove_corporate_suffixes(text):
+
+    return re.sub(suffix_pattern, '', text, flags=re.IGNORECASE)
+
+
+def parse_filename(filename):
+    """
+    Returns ``(company_name, year)`` from ``<Company>_..._<year>.txt``, or ``(None, None)``.
+    """
+    base_name = os.path.basename(filename)
+    match = re.match(r'([A-Za-z]+)_.*_(\d{4})\.txt$', base_name)
+    if match:
+        company_name = match.group(1)
+
+        company_name = re.sub(r'([a-z])([A-Z])', r'\1 \2', company_name)
+        year = int(match.group(2))
+        return company_name, year
+    return None, None
+
+
+def get_company_name_and_year_from_filename(filename):
+
+    company_name, year = parse_filename(filename)
+    if company_name:
+        print(f'Filename: {filename} -> Company Name: {company_name}, Year: {year}')
+        return company_name, year
+    print(f'Filename: {filename} -> Unable to extract company name and year')
+    return None, None
+
+
+def clean_file(file_path, output_file_path, verbose=False):
+    """
+    Cleans one text file into ``output_file_path``. Files whose name does not
+    carry a company and year are copied unchanged.
+    """
+    company_name, year = parse_filename(file_path)
+    if company_name and year:
+        get_normaliser(company_name, year).normalise_file(file_path, output_file_path, verbose)
+    else:
+        shutil.copyfile(file_path, output_file_path)
+    return output_file_path
+
+
+def clean_files(jobs, workers=None):
+    """
+    Runs ``clean_file`` for every job, one file per task.
+
+    Args:
+        jobs (list): ``(file_path, output_file_path)`` per file.
+        workers (int): Worker processes. ``None`` uses all CPUs, ``1`` runs in-process.
+
+    Yields:
+        tuple: ``(file_path, output_file_path)`` once a file is cleaned, in job order.
+    """
+    if workers == 1:
+        for file_path, output_file_path in jobs:
+            clean_file(file_path, output_file_path)
+            yield file_path, output_file_path
+    elif jobs:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            done = executor.map(clean_file, *zip(*jobs), chunksize=max(1, len(jobs) // 256))
+            for (file_path, _), output_file_path in zip(jobs, done):
+                yield file_path, output_file_path
+
+
+def process_directory(directory, output_directory=None, workers=None):
+    """
+    Cleans every text file below ``directory``.
+
+    Args:
+        directory (str): The directory with the extracted text files.
+        output_directory (str): Where to write the cleaned files, keeping the
+            sub-directory layout. ``None`` rewrites the files in place, one by one.
+        workers (int): Worker processes for the separate-output mode. ``None`` uses
+            all CPUs, ``1`` runs in-process.
+    """
+    # Traverse the directory and process each text file
+    jobs = []
+    for root, dirs, files in os.walk(directory):
+        for file in files:
+            if file.endswith('.txt'):
+                file_path = os.path.join(root, file)
+                if output_directory is None:
+                    company_name, year = get_company_name_and_year_from_filename(file)
+                    if company_name and year:
+                        replace_text(file_path, company_name, year)
+                    continue
+                output_file_path = os.path.join(output_directory, os.path.relpath(file_path, directory))
+                os.makedirs(os.path.dirname(output_file_path), exist_ok=True)
+                jobs.append((file_path, output_file_path))
+
+    for _ in clean_files(jobs, workers):
+        pass
+    if output_directory is not None:
+        print(f'Cleaned {len(jobs)} files into {output_directory}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Replace company names and relative years in extracted text files.")
+    parser.add_argument('directory')
+    parser.add_argument('output_directory', nargs='?', default=None,
+                        help="write cleaned files here instead of rewriting them in place")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all CPUs)")
+    args = parser.parse_args()
+
+    process_directory(args.directory, args.output_directory, args.workers)
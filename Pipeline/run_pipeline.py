@@ -0,0 +1,401 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from instrumentation import RunReport
+
+stages = ["extract", "replace", "filter", "postprocess", "calculate", "database"]
+
+# what each stage consumes and produces, for the run report
+stage_units = {
+    "extract": ("pages", "sentences"),
+    "replace": ("MB", "files"),
+    "filter": ("sentences", "sentences"),
+    "postprocess": ("files", "rows"),
+    "calculate": ("files", "rows"),
+    "database": ("files", "rows"),
+}
+
+manifest_version = 1
+
+
+def file_hash(path, stat_cache):
+    """
+    Returns the SHA-256 of a file, reusing the cached hash while size and mtime are unchanged.
+    """
+    stat = os.stat(path)
+    signature = [stat.st_size, stat.st_mtime_ns]
+    cached = stat_cache.get(path)
+    if cached and cached[0] == signature:
+        return cached[1]
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    stat_cache[path] = [signature, digest.hexdigest()]
+    return digest.hexdigest()
+
+
+def params_hash(params):
+    return hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def load_manifest(path):
+    if os.path.exists(path):
+        with open(path) as file:
+            manifest = json.load(file)
+        if manifest.get("version") == manifest_version:
+            return manifest
+    return {"version": manifest_version, "files": {}, "stages": {stage: {} for stage in stages}}
+
+
+def save_manifest(manifest, path):
+    temporary_path = path + '.tmp'
+    with open(temporary_path, 'w') as file:
+        json.dump(manifest, file, indent=1, sort_keys=True)
+    os.replace(temporary_path, path)
+
+
+class Runner:
+    """
+    Runs the pipeline stages and rebuilds only outputs whose inputs or parameters changed.
+
+    Every output is recorded in the manifest with the content hashes of the files
+    it was built from and a hash of the stage parameters. An output is rebuilt when
+    it is missing or either hash differs; outputs whose inputs disappeared are deleted.
+
+    Args:
+        args (argparse.Namespace): The parsed command line.
+    """
+
+    def __init__(self, args):
+        for name in ['work_dir', 'pdf_dir', 'llm_dir', 'indicator_aliases', 'company_aliases', 'score_cache',
+                     'report', 'profile_dir']:
+            if getattr(args, name):
+                setattr(args, name, os.path.abspath(getattr(args, name)))
+        self.args = args
+        self.work_dir = args.work_dir
+        self.manifest_path = os.path.join(self.work_dir, 'manifest.json')
+        self.manifest = load_manifest(self.manifest_path)
+        self.directories = {
+            "extract": os.path.join(self.work_dir, 'output_texts'),
+            "replace": os.path.join(self.work_dir, 'cleaned_texts'),
+            "filter": os.path.join(self.work_dir, 'filtered_texts'),
+            "postprocess": os.path.join(self.work_dir, 'merged'),
+            "calculate": os.path.join(self.work_dir, 'calculated'),
+            "database": os.path.join(self.work_dir, 'db'),
+        }
+        for directory in self.directories.values():
+            os.makedirs(directory, exist_ok=True)
+        self._model = None
+        self.report = RunReport(args.report, args.profile, args.profile_dir)
+
+    def hash(self, path):
+        return file_hash(path, self.manifest["files"])
+
+    def is_fresh(self, stage, output, inputs, params):
+        entry = self.manifest["stages"][stage].get(output)
+        return (
+            not self.args.force
+            and entry is not None
+            and entry["inputs"] == inputs
+            and entry["params"] == params_hash(params)
+            and all(os.path.exists(path) for path in entry["outputs"])
+        )
+
+    def record(self, stage, output, inputs, params, outputs, extra=None):
+        self.manifest["stages"][stage][output] = {
+            "inputs": inputs,
+            "params": params_hash(params),
+            "outputs": outputs,
+            "extra": extra or {},
+        }
+
+    def prune(self, stage, keep):
+        """
+        Drops manifest entries and output files of a stage that are not in ``keep``.
+        """
+        entries = self.manifest["stages"][stage]
+        for output in sorted(set(entries) - set(keep)):
+            for path in entries[output]["outputs"]:
+                if os.path.exists(path):
+                    os.remove(path)
+            del entries[output]
+            logging.info(f"[{stage}] removed {output}, its input is gone")
+
+    def save(self):
+        # forget hashes of files that no longer exist
+        self.manifest["files"] = {path: value for path, value in self.manifest["files"].items() if os.path.exists(path)}
+        save_manifest(self.manifest, self.manifest_path)
+
+    def text_files(self, stage):
+        directory = self.directories[stage]
+        return {filename: os.path.join(directory, filename)
+                for filename in sorted(os.listdir(directory)) if filename.endswith('.txt')}
+
+    # extract → replace → filter
+
+    def run_extract(self, counts):
+        from extract_pdf import esg_keywords, filename_pattern, keyword_histogram_path, process_pdf
+
+        output_directory = self.directories["extract"]
+        params = {"keywords": esg_keywords}
+        todo = []
+        keep = []
+        for filename in sorted(os.listdir(self.args.pdf_dir)):
+            if not filename.endswith('.pdf') or not filename_pattern.match(filename):
+                continue
+            pdf_path = os.path.join(self.args.pdf_dir, filename)
+            output = f"{os.path.splitext(filename)[0]}.txt"
+            inputs = {pdf_path: self.hash(pdf_path)}
+            keep.append(output)
+            if not self.is_fresh("extract", output, inputs, params):
+                todo.append((pdf_path, output, inputs))
+        self.prune("extract", keep)
+
+        logging.info(f"[extract] {len(todo)} of {len(keep)} PDFs to extract")
+        if todo:
+            with ProcessPoolExecutor(max_workers=self.args.workers) as executor:
+                rows = executor.map(process_pdf, [pdf_path for pdf_path, _, _ in todo],
+                                    [output_directory] * len(todo))
+                for (pdf_path, output, inputs), row in zip(todo, rows):
+                    if row["Status"] != "ok":
+                        logging.error(f"[extract] {row['File']} failed: {row['Error']}")
+                        continue
+                    counts["in"] += row["Pages"]
+                    counts["out"] += row["ESG Sentences"]
+                    match = filename_pattern.match(os.path.basename(pdf_path))
+                    output_path = os.path.join(output_directory, output)
+                    self.record("extract", output, inputs, params, [output_path, keyword_histogram_path(output_path)], {
+                        "Company": match.group(1),
+                        "Year": match.group(2),
+                        "Total Sentences": row["Total Sentences"],
+                        "ESG Sentences": row["ESG Sentences"],
+                    })
+                    self.save()
+
+        rows = [entry["extra"] for _, entry in sorted(self.manifest["stages"]["extract"].items())]
+        esg_report = pd.DataFrame(rows, columns=["Company", "Year", "Total Sentences", "ESG Sentences"])
+        esg_report.to_csv(os.path.join(self.directories["database"], 'esg_report.csv'), index=False)
+
+    def run_replace(self, counts):
+        from replace_strings import clean_files
+
+        output_directory = self.directories["replace"]
+        params = {}
+        todo = []
+        keep = []
+        for filename, input_path in self.text_files("extract").items():
+            inputs = {input_path: self.hash(input_path)}
+            keep.append(filename)
+            if not self.is_fresh("replace", filename, inputs, params):
+                todo.append((filename, inputs))
+        self.prune("replace", keep)
+
+        jobs = [(list(inputs)[0], os.path.join(output_directory, filename)) for filename, inputs in todo]
+        for (filename, inputs), (input_path, output_path) in zip(todo, clean_files(jobs, self.args.workers)):
+            self.record("replace", filename, inputs, params, [output_path])
+            counts["in"] += os.path.getsize(input_path) / 1024 / 1024
+            counts["out"] += 1
+        self.save()
+        logging.info(f"[replace] cleaned {len(todo)} of {len(keep)} text files")
+
+    def load_model(self):
+        if self._model is None:
+            from filter_bert import load_model
+            from score_cache import ScoreCache
+
+            tokenizer, model = load_model(self.args.model, revision=self.args.revision, num_threads=self.args.threads)
+            cache = None
+            if self.args.score_cache:
+                cache = ScoreCache(self.args.score_cache, self.args.model, self.args.revision)
+            self._model = (tokenizer, model, cache)
+        return self._model
+
+    def run_filter(self, counts):
+        output_directory = self.directories["filter"]
+        params = {"threshold": self.args.threshold, "model": self.args.model, "revision": self.args.revision}
+        keep = []
+        done = 0
+        for filename, input_path in self.text_files("replace").items():
+            inputs = {input_path: self.hash(input_path)}
+            keep.append(filename)
+            if self.is_fresh("filter", filename, inputs, params):
+                continue
+            # torch is only imported when something has to be scored
+            from filter_bert import filter_sentences, load_sentences
+
+            tokenizer, model, cache = self.load_model()
+            sentences = load_sentences(input_path)
+            filtered_sentences = filter_sentences(sentences, tokenizer, model, self.args.threshold,
+                                                  self.args.batch_size, cache=cache)
+            counts["in"] += len(sentences)
+            counts["out"] += len(filtered_sentences)
+            output_path = os.path.join(output_directory, filename)
+            with open(output_path, 'w') as file:
+                for sentence in filtered_sentences:
+                    file.write(sentence + '\n')
+            self.record("filter", filename, inputs, params, [output_path])
+            self.save()
+            done += 1
+        self.prune("filter", keep)
+        self.save()
+        logging.info(f"[filter] filtered {done} of {len(keep)} text files")
+
+    # postprocess → calculate → database, starting from the LLM output CSVs of notebook 03
+
+    def run_postprocess(self, counts):
+        from postprocessing import group_files_by_company, merge_companies
+
+        output_directory = self.directories["postprocess"]
+        csv_files = sorted(os.path.join(self.args.llm_dir, filename)
+                           for filename in os.listdir(self.args.llm_dir) if filename.endswith('.csv'))
+        params = {}
+        todo = []
+        keep = []
+        for company_name, file_paths in group_files_by_company(csv_files).items():
+            output = f"{company_name}.csv"
+            inputs = {path: self.hash(path) for path in file_paths}
+            keep.append(output)
+            if not self.is_fresh("postprocess", output, inputs, params):
+                todo.append((output, inputs))
+        self.prune("postprocess", keep)
+
+        jobs = [(list(inputs), os.path.join(output_directory, output)) for output, inputs in todo]
+        for (output, inputs), (file_paths, output_path, rows) in zip(todo, merge_companies(jobs, self.args.workers)):
+            self.record("postprocess", output, inputs, params, [output_path])
+            counts["in"] += len(file_paths)
+            counts["out"] += rows
+        self.save()
+        logging.info(f"[postprocess] merged {len(todo)} of {len(keep)} companies")
+
+    def run_calculate(self, counts):
+        from calculate import count_file, load_lookups
+
+        output_directory = self.directories["calculate"]
+        merged_directory = self.directories["postprocess"]
+        params = {
+            "indicator_aliases": self.hash(self.args.indicator_aliases),
+            "company_aliases": self.hash(self.args.company_aliases),
+        }
+        lookups = None
+        keep = []
+        done = 0
+        for filename in sorted(os.listdir(merged_directory)):
+            if not filename.endswith('.csv'):
+                continue
+            input_path = os.path.join(merged_directory, filename)
+            inputs = {input_path: self.hash(input_path)}
+            keep.append(filename)
+            if self.is_fresh("calculate", filename, inputs, params):
+                continue
+            if lookups is None:
+                lookups = load_lookups(self.args.indicator_aliases, self.args.company_aliases)
+            quantitative_counts, pivot_table = count_file(input_path, *lookups)
+            stem = os.path.splitext(filename)[0]
+            outputs = [os.path.join(output_directory, f"{stem}.quantitative.csv"),
+                       os.path.join(output_directory, f"{stem}.indicators.csv")]
+            quantitative_counts.to_csv(outputs[0], index=False)
+            pivot_table.to_csv(outputs[1], index=False)
+            self.record("calculate", filename, inputs, params, outputs)
+            counts["in"] += 1
+            counts["out"] += len(pivot_table)
+            done += 1
+        self.prune("calculate", keep)
+        self.save()
+        logging.info(f"[calculate] counted {done} of {len(keep)} companies")
+
+        # the per-company counts are small, so the combined files are always rewritten
+        entries = [entry for _, entry in sorted(self.manifest["stages"]["calculate"].items())]
+        quantitative_counts = [pd.read_csv(entry["outputs"][0]) for entry in entries]
+        indicator_counts = [pd.read_csv(entry["outputs"][1]) for entry in entries]
+        db_directory = self.directories["database"]
+        (pd.concat(quantitative_counts, ignore_index=True) if quantitative_counts else pd.DataFrame()).to_csv(
+            os.path.join(db_directory, 'quantitative_counts.csv'), index=False)
+        (pd.concat(indicator_counts, ignore_index=True) if indicator_counts else pd.DataFrame()).to_csv(
+            os.path.join(db_directory, 'indicator_counts.csv'), index=False)
+
+    def run_database(self, counts):
+        from database import add_qualitative_sum, build_database
+
+        db_directory = self.directories["database"]
+        paths = {name: os.path.join(db_directory, f"{name}.csv")
+                 for name in ['indicator_counts', 'quantitative_counts', 'esg_report']}
+        inputs = {path: self.hash(path) for path in paths.values()}
+        inputs[self.args.company_aliases] = self.hash(self.args.company_aliases)
+        output_path = os.path.join(db_directory, 'database.csv')
+        dataset_path = os.path.join(db_directory, 'database_parquet')
+        params = {"partition_by": "year"}
+        if self.is_fresh("database", 'database.csv', inputs, params):
+            logging.info("[database] database.csv is up to date")
+            return
+        with_sum_path = os.path.join(db_directory, 'indicator_counts_with_sum.csv')
+        add_qualitative_sum(paths['indicator_counts'], with_sum_path)
+        stats = build_database(with_sum_path, paths['quantitative_counts'], paths['esg_report'],
+                               self.args.company_aliases, output_path, dataset_path, params["partition_by"])
+        counts["in"] += len(inputs)
+        counts["out"] += stats["rows"]
+        self.record("database", 'database.csv', inputs, params, [output_path, with_sum_path, dataset_path])
+        self.save()
+
+    def run(self, selected):
+        for stage in stages:
+            if stage in selected:
+                with self.report.stage(stage, *stage_units[stage]) as counts:
+                    getattr(self, f"run_{stage}")(counts)
+        if self._model is not None and self._model[2] is not None:
+            self._model[2].close()
+        self.save()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run the ESG pipeline incrementally: only outputs whose inputs or parameters changed are rebuilt.")
+    parser.add_argument('--work-dir', required=True, help="holds the manifest and every stage output")
+    parser.add_argument('--stages', default=",".join(stages),
+                        help=f"comma-separated subset of {','.join(stages)} (default: all)")
+    parser.add_argument('--force', action='store_true', help="ignore the manifest and rebuild everything")
+    parser.add_argument('--pdf-dir', help="extract: directory with <Company>_<Year>.pdf reports")
+    parser.add_argument('--workers', type=int, default=None, help="extract/replace/postprocess: worker processes")
+    parser.add_argument('--model', default="nbroad/ESG-BERT", help="filter: model id or checkpoint")
+    parser.add_argument('--revision', default=None, help="filter: model revision")
+    parser.add_argument('--threshold', type=float, default=0.80, help="filter: minimum class probability")
+    parser.add_argument('--batch-size', type=int, default=32, help="filter: sentences per forward pass")
+    parser.add_argument('--threads', type=int, default=None, help="filter: torch intra-op threads")
+    parser.add_argument('--score-cache', default=None, help="filter: SQLite score cache file")
+    parser.add_argument('--llm-dir', help="postprocess: LLM output CSVs written by notebook 03")
+    parser.add_argument('--indicator-aliases', help="calculate: esg_indicator_aliases.csv")
+    parser.add_argument('--company-aliases', help="calculate/database: company_id_alias.csv")
+    parser.add_argument('--report', default=None,
+                        help="append a JSON-lines run report (time, CPU, peak memory, throughput per stage) to this file")
+    parser.add_argument('--profile', choices=['cprofile', 'sample'], default=None,
+                        help="dump a cProfile or a sampled collapsed-stack profile of every stage")
+    parser.add_argument('--profile-dir', default=None, help="where the profiles go (default: next to the report)")
+    args = parser.parse_args()
+
+    selected = [stage.strip() for stage in args.stages.split(',') if stage.strip()]
+    unknown = set(selected) - set(stages)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+    required = {
+        "extract": ["pdf_dir"],
+        "postprocess": ["llm_dir"],
+        "calculate": ["indicator_aliases", "company_aliases"],
+        "database": ["company_aliases"],
+    }
+    for stage in selected:
+        for name in required.get(stage, []):
+            if getattr(args, name) is None:
+                parser.error(f"--{name.replace('_', '-')} is required for the {stage} stage")
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    Runner(args).run(selected)
+
+
+if __name__ == '__main__':
+    main()
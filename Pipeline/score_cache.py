@@ -0,0 +1,136 @@
+import hashlib
+import sqlite3
+import time
+
+import numpy as np
+
+# SQLite limits the number of "?" parameters per statement
+query_chunk_size = 500
+
+
+def normalise_sentence(sentence):
+    """
+    Collapses whitespace. BERT tokenisation splits on whitespace, so this never changes a score.
+    """
+    return " ".join(sentence.split())
+
+
+class ScoreCache:
+    """
+    Persistent SQLite cache of ESG-BERT probability vectors.
+
+    Entries are keyed by a SHA-256 of the model name, the model revision and the
+    normalised sentence, so boilerplate repeated across reports and years is only
+    scored once per model. The cache holds at most ``max_entries`` vectors; when
+    it grows beyond that the least recently used entries are evicted. The entry
+    count is read once when the cache is opened and then kept up to date from the
+    rows each insert and delete changes.
+
+    Args:
+        path (str): SQLite database file, created if missing.
+        model_name (str): Model id or checkpoint path the scores come from.
+        revision (str): Model revision; use a new one whenever the weights change.
+        max_entries (int): Size bound of the cache.
+    """
+
+    def __init__(self, path, model_name, revision=None, max_entries=1_000_000):
+        self.path = path
+        self.model_name = model_name
+        self.revision = revision or ""
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS scores ("
+            "key BLOB PRIMARY KEY, probabilities BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS scores_last_used ON scores (last_used)")
+        self.connection.commit()
+        self.entries = self.connection.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+
+    def key(self, sentence):
+        text = "\0".join([self.model_name, self.revision, normalise_sentence(sentence)])
+        return hashlib.sha256(text.encode('utf-8')).digest()
+
+    def get_many(self, sentences):
+        """
+        Looks up the cached probability vectors of many sentences.
+
+        Args:
+            sentences (list): The sentences to look up.
+
+        Returns:
+            dict: Maps the index of every cached sentence to its probability vector.
+        """
+        keys = [self.key(sentence) for sentence in sentences]
+        found = {}
+        unique_keys = list(dict.fromkeys(keys))
+        for start in range(0, len(unique_keys), query_chunk_size):
+            chunk = unique_keys[start:start + query_chunk_size]
+            rows = self.connection.execute(
+                f"SELECT key, probabilities FROM scores WHERE key IN ({','.join('?' * len(chunk))})", chunk
+            )
+            for key, probabilities in rows:
+                found[key] = np.frombuffer(probabilities, dtype=np.float32)
+
+        now = time.time()
+        self.connection.executemany("UPDATE scores SET last_used = ? WHERE key = ?", [(now, key) for key in found])
+        self.connection.commit()
+
+        cached = {index: found[key] for index, key in enumerate(keys) if key in found}
+        self.hits += len(cached)
+        self.misses += len(keys) - len(cached)
+        return cached
+
+    def put_many(self, sentences, probabilities):
+        """
+        Stores probability vectors and evicts the least recently used entries over the size bound.
+
+        Args:
+            sentences (list): The scored sentences.
+            probabilities (np.ndarray): One probability vector per sentence. Rows
+                containing NaN (failed sentences) are not stored.
+        """
+        now = time.time()
+        rows = [
+            (self.key(sentence), np.asarray(vector, dtype=np.float32).tobytes(), now)
+            for sentence, vector in zip(sentences, probabilities)
+            if not np.isnan(vector).any()
+        ]
+        inserted = self.connection.executemany("INSERT OR IGNORE INTO scores VALUES (?, ?, ?)", rows).rowcount
+        self.entries += inserted
+        if inserted < len(rows):
+            # some keys were already stored (or repeated in this batch); overwrite them as INSERT OR REPLACE did
+            self.connection.executemany("UPDATE scores SET probabilities = ?, last_used = ? WHERE key = ?",
+                                        [(vector, used, key) for key, vector, used in rows])
+
+        excess = self.entries - self.max_entries
+        if excess > 0:
+            evicted = self.connection.execute(
+                "DELETE FROM scores WHERE key IN (SELECT key FROM scores ORDER BY last_used LIMIT ?)", (excess,)
+            ).rowcount
+            self.entries -= evicted
+            self.evictions += evicted
+        self.connection.commit()
+
+    def __len__(self):
+        return self.entries
+
+    def stats(self):
+        """
+        Returns:
+            dict: ``hits``, ``misses``, ``hit_rate``, ``evictions`` and ``entries``.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self),
+        }
+
+    def close(self):
+        self.connection.close()
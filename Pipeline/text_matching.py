@@ -0,0 +1,185 @@
+import itertools
+import re
+
+# deepest nesting of factored branches; beyond it a branch is a plain alternation, since both
+# this module and the regex parser recurse once per level
+max_alternation_depth = 100
+
+
+def _group_key(char, ignorecase):
+    return char.casefold() if ignorecase else char
+
+
+def _common_prefix_length(strings, ignorecase):
+    shortest = min(len(string) for string in strings)
+    length = 0
+    while length < shortest and len({_group_key(string[length], ignorecase) for string in strings}) == 1:
+        length += 1
+    return length
+
+
+def _alternation(strings, ignorecase, depth=0):
+    # strings are suffixes in priority order; "" means "stop here"
+    alternatives = []
+    segment = []
+
+    def flush():
+        groups = {}
+        for string in segment:
+            groups.setdefault(_group_key(string[0], ignorecase), []).append(string)
+        for group in groups.values():
+            if len(group) == 1:
+                alternatives.append(re.escape(group[0]))
+            elif depth >= max_alternation_depth:
+                alternatives.append('(?:' + '|'.join(re.escape(string) for string in group) + ')')
+            else:
+                # the whole shared prefix at once, so long common prefixes cost one level
+                length = _common_prefix_length(group, ignorecase)
+                head = group[0][:length]
+                alternatives.append(re.escape(head) + _alternation([string[length:] for string in group], ignorecase, depth + 1))
+        segment.clear()
+
+    for string in strings:
+        if string:
+            segment.append(string)
+        else:
+            flush()
+            alternatives.append('')
+    flush()
+
+    if len(alternatives) == 1:
+        return alternatives[0]
+    return '(?:' + '|'.join(alternatives) + ')'
+
+
+def alternation_pattern(strings, ignorecase=False):
+    """
+    Builds a prefix-factored regex equivalent to ``'|'.join(map(re.escape, strings))``.
+
+    Strings sharing a first character are merged into one branch, recursively, so the
+    regex engine tests one branch per distinct character instead of every string at
+    every text position. Branch priority is kept: alternatives are only merged when
+    no shorter string listed in between could have matched first, so the pattern
+    picks the same match as the plain alternation in any surrounding context
+    (e.g. inside ``\\b...\\b``). A shared prefix of any length takes one level of
+    nesting; below ``max_alternation_depth`` levels branches are not factored further.
+
+    Args:
+        strings (list): The literal strings, in priority order. Empty strings are ignored.
+        ignorecase (bool): Whether the pattern will be compiled with ``re.IGNORECASE``.
+
+    Returns:
+        str: The regex source, or an empty string if there is nothing to match.
+    """
+    strings = [string for string in strings if string]
+    if not strings:
+        return ''
+    return _alternation(strings, ignorecase)
+
+
+class StringRemover:
+    """
+    Removes literal strings from text, with the result of one ``str.replace(string, '')`` per string in order.
+
+    A string that does not occur leaves the text unchanged, so the loop only has to
+    run over the strings that do. One regex pass with a prefix-factored pattern
+    (``alternation_pattern``) finds them, instead of one scan of the text per
+    string. A removal can join up a string that did not occur before, so the text
+    around every cut is searched again.
+
+    Args:
+        strings (list): The strings to remove, in removal order; repeats are kept
+            and empty strings are ignored.
+    """
+
+    def __init__(self, strings):
+        self.strings = [string for string in strings if string]
+        unique = list(dict.fromkeys(self.strings))
+        self.max_length = max((len(string) for string in unique), default=0)
+        # the longest string starting at each position; the others starting there are its prefixes
+        source = alternation_pattern(sorted(unique, key=len, reverse=True))
+        self._longest_pattern = re.compile('(?=(' + source + '))') if source else None
+        found = set(unique)
+        self._prefixes = {string: [string[:end] for end in range(1, len(string) + 1) if string[:end] in found]
+                          for string in unique}
+
+    def occurring(self, text):
+        """
+        Returns the set of strings that occur in ``text``, overlapping occurrences included.
+        """
+        occurring = set()
+        if self._longest_pattern is not None:
+            for longest in set(self._longest_pattern.findall(text)):
+                occurring.update(self._prefixes[longest])
+        return occurring
+
+    def remove(self, text):
+        """
+        Returns ``text`` with the strings removed, as the sequential ``str.replace`` loop would.
+        """
+        occurring = self.occurring(text)
+        for string in self.strings:
+            if string not in occurring:
+                continue
+            pieces = text.split(string)
+            if len(pieces) == 1:
+                continue
+            text = ''.join(pieces)
+            # where the cuts land in the text after the removal
+            for cut in dict.fromkeys(itertools.accumulate(len(piece) for piece in pieces[:-1])):
+                occurring.update(self.occurring(text[max(0, cut - self.max_length + 1):cut + self.max_length - 1]))
+        return text
+
+
+class KeywordMatcher:
+    """
+    Finds which keywords occur in a text as whole words, ignoring case, in one regex pass.
+
+    A text has a match exactly where ``\\b(?:k1|k2|...)\\b`` compiled with
+    ``re.IGNORECASE`` would find one. The keywords are compiled into a single
+    prefix-factored pattern (``alternation_pattern``) inside a lookahead, so every
+    keyword occurrence is reported, including ones inside a longer keyword
+    (``corruption`` in ``anti-corruption``). Where several keywords match at the same
+    position, only the one listed first is reported. With ASCII keywords, ASCII
+    text is lowercased and matched with a case-sensitive pattern, which is faster
+    than ``re.IGNORECASE`` and gives the same matches. Other text goes through the
+    ``re.IGNORECASE`` pattern, so case matching still follows the regex rules.
+
+    Args:
+        keywords (list): The keywords. A keyword's ID is its index in this list.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+        self.ids = {}
+        for keyword_id, keyword in enumerate(self.keywords):
+            if keyword:
+                self.ids.setdefault(keyword.lower(), keyword_id)
+        self._ascii = all(keyword.isascii() for keyword in self.keywords)
+        lowered = [keyword.lower() for keyword in self.keywords]
+        self._folded_pattern = re.compile(r'(?=\b(' + alternation_pattern(lowered) + r')\b)')
+        self._pattern = re.compile(r'(?=\b(' + alternation_pattern(self.keywords, ignorecase=True) + r')\b)', re.IGNORECASE)
+
+    def _keyword_id(self, text):
+        keyword_id = self.ids.get(text.lower())
+        if keyword_id is None:
+            # a case match that lower() does not map back, e.g. the long s in "ſcope 1"
+            keyword_id = next(keyword_id for keyword_id, keyword in enumerate(self.keywords)
+                              if keyword and re.fullmatch(re.escape(keyword), text, re.IGNORECASE))
+        return keyword_id
+
+    def find(self, text):
+        """
+        Returns the IDs of the keywords in ``text``.
+
+        Args:
+            text (str): The text to search, e.g. one sentence.
+
+        Returns:
+            list: One keyword ID per occurrence, in text order; empty if there is none.
+        """
+        if not self.ids:
+            return []
+        if self._ascii and text.isascii():
+            return [self.ids[match] for match in self._folded_pattern.findall(text.lower())]
+        return [self._keyword_id(match) for match in self._pattern.findall(text)]
@@ -0,0 +1,51 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Pipeline'))
+
+from database import build_database, column_dtype, input_columns, input_dtypes, spill_schema, write_spill
+
+
+def test_spill_chunk_with_empty_text_column(tmp_path):
+    # the first chunk of a partition has no company names at all
+    schema = spill_schema({'company_id': 'Int64', 'company': str, 'year': 'Int64', 'climate': 'float64'})
+    write_spill(pd.DataFrame({'company_id': pd.array([None], dtype='Int64'), 'company': pd.Series([None], dtype=object),
+                              'year': pd.array([2021], dtype='Int64'), 'climate': [3.0]}), tmp_path / '0.parquet', schema)
+    write_spill(pd.DataFrame({'company_id': pd.array([1], dtype='Int64'), 'company': ['A'],
+                              'year': pd.array([2020], dtype='Int64'), 'climate': [1.0]}), tmp_path / '1.parquet', schema)
+    spilled = pd.read_parquet(tmp_path)
+    assert spilled['company'].isna().tolist() == [True, False]
+    assert spilled['year'].tolist() == [2021, 2020]
+    assert str(spilled['company_id'].dtype) == str(pd.Series(dtype=column_dtype('company_id')).dtype)
+
+
+def test_build_database_with_chunks_without_company(tmp_path):
+    # with two rows per chunk, the second chunk of the indicator counts has no company names
+    pd.DataFrame({'company_id': [1, 2, None, None], 'Company': ['A', 'B', None, None], 'Published Year': [2020, 2020, 2021, 2021],
+                  'climate': [1, 2, 3, 4], 'qualitative_sentences': [1, 2, 3, 4]}).to_csv(tmp_path / 'indicator_counts.csv', index=False)
+    pd.DataFrame({'company_id': [1, 2], 'Company': ['A', 'B'], 'Published Year': [2020, 2020],
+                  'quantitative_sentences': [5, 6]}).to_csv(tmp_path / 'quantitative_counts.csv', index=False)
+    pd.DataFrame({'Company': ['A_ESG_EN', 'B_IR_EN'], 'Year': [2020, 2020], 'Total Sentences': [10, 20],
+                  'ESG Sentences': [1, 2]}).to_csv(tmp_path / 'esg_report.csv', index=False)
+    pd.DataFrame({'company_id': [1, 2], 'company_alias': ['a', 'b'], 'industry': ['X', 'Y'],
+                  'company_name': ['A SE', 'B SE']}).to_csv(tmp_path / 'company_id_alias.csv', index=False, encoding='latin1')
+    outputs = {}
+    for chunk_rows in [2, 100]:
+        output_path = tmp_path / f'database_{chunk_rows}.csv'
+        build_database(tmp_path / 'indicator_counts.csv', tmp_path / 'quantitative_counts.csv', tmp_path / 'esg_report.csv',
+                       tmp_path / 'company_id_alias.csv', output_path, chunk_rows=chunk_rows)
+        outputs[chunk_rows] = pd.read_csv(output_path)
+    assert len(outputs[2]) == 4
+    # integer counts stay integers
+    assert (tmp_path / 'database_2.csv').read_text().splitlines()[1].startswith('1,A,2020,1,1,5,10,1,')
+    pd.testing.assert_frame_equal(outputs[2], outputs[100])
+
+
+def test_input_dtypes_pins_integer_counts(tmp_path):
+    path = tmp_path / 'quantitative_counts.csv'
+    pd.DataFrame({'company_id': [1, None], 'Company': ['A', None], 'Published Year': [2020, 2021],
+                  'quantitative_sentences': [5, 6], 'climate': [1.0, 2.5]}).to_csv(path, index=False)
+    assert input_dtypes(path, input_columns(path), 1) == {'company_id': 'Int64', 'company': str, 'year': 'Int64',
+                                                          'quantitative_sentences': 'Int64', 'climate': 'float64'}
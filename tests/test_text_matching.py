@@ -0,0 +1,71 @@
+import os
+import random
+import re
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Pipeline'))
+
+from text_matching import StringRemover, alternation_pattern
+
+
+def remove_sequentially(text, strings):
+    # the old cell-by-cell table removal
+    for string in strings:
+        text = text.replace(string, '')
+    return text
+
+
+def plain_pattern(strings):
+    return '|'.join(re.escape(string) for string in strings if string)
+
+
+def test_long_shared_prefix_cells():
+    # e.g. two long footnote cells that only differ at the end
+    prefix = "Figures exclude joint ventures and discontinued operations; " * 25
+    cells = [prefix + "2022", prefix + "2023", "Scope 1"]
+    assert len(prefix) >= 1500
+    text = f"Before {cells[1]} between {cells[0]} and Scope 1 after"
+    pattern = re.compile(alternation_pattern(cells))
+    assert pattern.sub('', text) == re.compile(plain_pattern(cells)).sub('', text) == "Before  between  and  after"
+
+
+def test_nested_prefixes_beyond_depth_limit():
+    # every string a prefix of the next: one nesting level per string
+    strings = ["a" * length for length in range(1, 1500)] + ["b" * length for length in range(1500, 0, -1)]
+    text = "a" * 2000 + " " + "b" * 20 + " ab"
+    pattern = re.compile(alternation_pattern(strings))
+    assert pattern.findall(text) == re.compile(plain_pattern(strings)).findall(text)
+
+
+def test_same_matches_as_plain_alternation():
+    rng = random.Random(0)
+    for _ in range(500):
+        strings = ["".join(rng.choice("abAB -") for _ in range(rng.randint(0, 6))) for _ in range(rng.randint(1, 8))]
+        text = "".join(rng.choice("abAB -") for _ in range(40))
+        for flags, ignorecase in [(0, False), (re.IGNORECASE, True)]:
+            factored = re.compile(r'\b(?:' + alternation_pattern(strings, ignorecase) + r')\b', flags)
+            plain = re.compile(r'\b(?:' + plain_pattern(strings) + r')\b', flags)
+            if plain.pattern == r'\b(?:)\b':
+                continue
+            assert [match.span() for match in factored.finditer(text)] == [match.span() for match in plain.finditer(text)]
+
+
+def test_overlapping_cells_removed_as_sequential_loop():
+    cells = ["0.5", "10"]
+    assert StringRemover(cells).remove("Total 10.5 t") == remove_sequentially("Total 10.5 t", cells) == "Total 1 t"
+    # "ab" only appears once "x" is cut out
+    cells = ["x", "ab"]
+    assert StringRemover(cells).remove("a x axb") == remove_sequentially("a x axb", cells) == "a  "
+
+
+def test_occurring_includes_overlapping_occurrences():
+    remover = StringRemover(["2023", "12", "1", "10", "absent"])
+    assert remover.occurring("In 12023 and 10") == {"2023", "12", "1", "10"}
+
+
+def test_same_output_as_sequential_loop():
+    rng = random.Random(0)
+    for _ in range(20000):
+        cells = ["".join(rng.choice("0.15 ab") for _ in range(rng.randint(0, 4))) for _ in range(rng.randint(1, 6))]
+        text = "".join(rng.choice("0.15 ab") for _ in range(rng.randint(0, 30)))
+        assert StringRemover(cells).remove(text) == remove_sequentially(text, cells), (cells, text)